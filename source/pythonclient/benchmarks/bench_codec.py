@@ -0,0 +1,345 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+Microbenchmarks of the encoding of every request and the decoding of every
+incoming msg, at several server versions.
+For each msg it measures the time per msg (the best of a few runs, in ns) and
+the peak memory allocated while handling one msg (traced by tracemalloc).
+
+decode: raw msg (size prefix stripped) -> comm.read_fields() ->
+    Decoder.interpret() -> wrapper callback (a no-op). The msgs are
+    synthetic: for each IN msgId of Decoder.msgId2handleInfo, the shortest
+    msg made only of "1" fields which goes through interpret() without error
+    and reaches a callback. Real msgs can be used instead with --replay: the
+    1st msg of each msgId of a recording (see ibapi.recorder).
+encode: EClient request -> framed msg handed to the Connection (a no-op).
+    The requests are called with default args: 1, 1., False, "", [] and
+    default Contract/Order/... objects. The requests not supported at a
+    server version are left out.
+
+The results are written as JSON, so that the runs of different commits can
+be compared, eg:
+    PYTHONPATH=. python3 benchmarks/bench_codec.py --output before.json
+    (change things)
+    PYTHONPATH=. python3 benchmarks/bench_codec.py --output after.json --compare before.json
+"""
+
+import argparse
+import datetime
+import gc
+import inspect
+import json
+import logging
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from ibapi import comm
+from ibapi.client import EClient
+from ibapi.decoder import Decoder, code_names
+from ibapi.message import IN
+from ibapi.recorder import Replay
+from ibapi.server_versions import (MIN_CLIENT_VER, MIN_SERVER_VER_ORDER_CONTAINER,
+                                   MAX_CLIENT_VER)
+from ibapi.wrapper import EWrapper
+
+
+DEFAULT_VERSIONS = (MIN_CLIENT_VER, MIN_SERVER_VER_ORDER_CONTAINER, MAX_CLIENT_VER)
+MAX_SAMPLE_FIELDS = 400
+N_RUNS = 5
+N_ALLOC_RUNS = 10
+
+IN_NAMES = {msgId: name for (name, msgId) in vars(IN).items() if not name.startswith("_")}
+
+
+def count_call(self, *args):
+    self.nCalls += 1
+
+
+# every callback is a no-op which only counts the calls
+BenchWrapper = type("BenchWrapper", (EWrapper, ), dict(
+    {name: count_call for (name, _) in inspect.getmembers(EWrapper, inspect.isfunction)
+     if not name.startswith("_")}, nCalls=0))
+
+
+class NullConnection:
+    def __init__(self):
+        self.lastMsg = None
+
+    def isConnected(self):
+        return True
+
+    def sendMsg(self, msg):
+        self.lastMsg = msg
+
+
+def time_op(op, duration) -> float:
+    """ ns per call of op: the loop size is grown until one run lasts
+    duration/N_RUNS, then the best of N_RUNS runs """
+
+    runDuration = duration / N_RUNS * 1e9
+    nLoops = 1
+    while True:
+        startTime = time.perf_counter_ns()
+        for _ in range(nLoops):
+            op()
+        elapsed = time.perf_counter_ns() - startTime
+        if elapsed >= runDuration or nLoops >= 1 << 20:
+            break
+        nLoops *= 2
+
+    best = elapsed
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(N_RUNS - 1):
+            startTime = time.perf_counter_ns()
+            for _ in range(nLoops):
+                op()
+            best = min(best, time.perf_counter_ns() - startTime)
+    finally:
+        if gcEnabled:
+            gc.enable()
+    return best / nLoops
+
+
+def alloc_op(op) -> int:
+    """ peak bytes allocated by one call of op, the lowest of N_ALLOC_RUNS
+    (the 1st calls may fill caches) """
+
+    tracemalloc.start()
+    try:
+        op()
+        best = None
+        for _ in range(N_ALLOC_RUNS):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            op()
+            peak = tracemalloc.get_traced_memory()[1] - before
+            best = peak if best is None else min(best, peak)
+    finally:
+        tracemalloc.stop()
+    return best
+
+
+def make_raw_msg(msgId, nFields) -> bytes:
+    return comm.make_field(msgId).encode() + b"1\0" * nFields
+
+
+def try_decode(decoder, msg) -> bool:
+    wrapper = decoder.wrapper
+    wrapper.nCalls = 0
+    try:
+        decoder.interpret(comm.read_fields(msg))
+    except Exception:
+        return False
+    return wrapper.nCalls > 0
+
+
+def synthetic_msgs(decoder) -> dict:
+    """ msgId -> shortest synthetic msg which decodes """
+    msgs = {}
+    for msgId in sorted(decoder.msgId2handleInfo):
+        for nFields in range(1, MAX_SAMPLE_FIELDS):
+            msg = make_raw_msg(msgId, nFields)
+            if try_decode(decoder, msg):
+                msgs[msgId] = msg
+                break
+    return msgs
+
+
+def recorded_msgs(replay, decoder) -> dict:
+    """ msgId -> 1st msg of the recording with that msgId which decodes """
+    msgs = {}
+    for (_, msg) in replay.frames():
+        msgId = int(msg[:msg.find(b"\0")])
+        if msgId not in msgs and try_decode(decoder, msg):
+            msgs[msgId] = msg
+    return msgs
+
+
+def bench_decode(serverVersion, duration, nameFilter, replay=None, alloc=True) -> dict:
+    decoder = Decoder(BenchWrapper(), serverVersion)
+    msgs = recorded_msgs(replay, decoder) if replay is not None else synthetic_msgs(decoder)
+
+    results = {}
+    for (msgId, msg) in sorted(msgs.items()):
+        name = IN_NAMES.get(msgId, str(msgId))
+        if nameFilter is not None and not nameFilter.search(name):
+            continue
+        op = lambda: decoder.interpret(comm.read_fields(msg))
+        results[name] = {"ns": round(time_op(op, duration), 1),
+                         "allocBytes": alloc_op(op) if alloc else None,
+                         "fields": msg.count(b"\0")}
+    return results
+
+
+def request_args(meth) -> list:
+    """ default args of the bound method meth """
+    args = []
+    for param in inspect.signature(meth).parameters.values():
+        ann = param.annotation
+        if param.default is not param.empty:
+            args.append(param.default)
+        elif ann is bool:
+            args.append(False)
+        elif ann in (int, float):
+            args.append(ann(1))
+        elif inspect.isclass(ann):
+            args.append(ann())
+        else:
+            raise TypeError("no default value for %s of %s" % (param.name, meth.__name__))
+    return args
+
+
+def requests() -> list:
+    """ the EClient methods which send a msg """
+    return [name for (name, meth) in inspect.getmembers(EClient, inspect.isfunction)
+            if not name.startswith("_") and name not in ("connect", "sendMsg")
+            and "sendMsg" in code_names(meth.__code__)]
+
+
+def bench_encode(serverVersion, duration, nameFilter, alloc=True) -> dict:
+    client = EClient(BenchWrapper())
+    client.conn = NullConnection()
+    client.connState = EClient.CONNECTED
+    client.serverVersion_ = serverVersion
+    client.clientId = 0
+
+    results = {}
+    for name in requests():
+        if nameFilter is not None and not nameFilter.search(name):
+            continue
+        meth = getattr(client, name)
+        args = request_args(meth)
+        client.conn.lastMsg = None
+        try:
+            meth(*args)
+        except Exception:
+            continue
+        if client.conn.lastMsg is None:
+            continue  # not supported at this server version
+        op = lambda: meth(*args)
+        results[name] = {"ns": round(time_op(op, duration), 1),
+                         "allocBytes": alloc_op(op) if alloc else None,
+                         "bytes": len(client.conn.lastMsg)}
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(versions=DEFAULT_VERSIONS, duration=0.05, nameFilter=None, replay=None,
+        alloc=True) -> dict:
+    if type(nameFilter) is str:
+        nameFilter = re.compile(nameFilter)
+
+    # the msgs tried while looking for the synthetic samples log errors
+    logging.disable(logging.CRITICAL)
+    try:
+        results = {"meta": {"python": sys.version.split()[0],
+                            "platform": platform.platform(),
+                            "commit": git_commit(),
+                            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                            "duration": duration},
+                   "decode": {}, "encode": {}}
+        if replay is not None:
+            versions = (replay.serverVersion, )
+        for serverVersion in versions:
+            results["decode"][str(serverVersion)] = bench_decode(serverVersion, duration,
+                                                                 nameFilter, replay, alloc)
+            results["encode"][str(serverVersion)] = bench_encode(serverVersion, duration,
+                                                                 nameFilter, alloc)
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def compare(new, old) -> list:
+    """ returns the (section, serverVersion, name, old ns, new ns, ratio)
+    of the msgs benched in both runs, the slowest down first """
+
+    rows = []
+    for section in ("decode", "encode"):
+        for (serverVersion, newResults) in new[section].items():
+            oldResults = old.get(section, {}).get(serverVersion, {})
+            for (name, newResult) in newResults.items():
+                oldResult = oldResults.get(name)
+                if oldResult is None:
+                    continue
+                rows.append((section, serverVersion, name, oldResult["ns"], newResult["ns"],
+                             newResult["ns"] / oldResult["ns"]))
+    rows.sort(key=lambda row: -row[5])
+    return rows
+
+
+def print_results(results):
+    for section in ("decode", "encode"):
+        for (serverVersion, sectionResults) in results[section].items():
+            print("%s @ server version %s" % (section, serverVersion))
+            for (name, result) in sectionResults.items():
+                print("    %-40s %10.1f ns %8s B" % (name, result["ns"],
+                                                     result["allocBytes"]))
+
+
+def print_comparison(rows, threshold) -> int:
+    nRegressions = 0
+    for (section, serverVersion, name, oldNs, newNs, ratio) in rows:
+        regression = ratio > 1. + threshold
+        nRegressions += regression
+        print("%s %-6s %4s %-40s %10.1f -> %10.1f ns  x%.2f" % (
+            "!" if regression else " ", section, serverVersion, name, oldNs, newNs, ratio))
+    print("%d regressions over %d%%" % (nRegressions, threshold * 100))
+    return nRegressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="encode/decode microbenchmarks")
+    parser.add_argument("--versions", default=",".join(map(str, DEFAULT_VERSIONS)),
+                        help="comma separated server versions")
+    parser.add_argument("--duration", type=float, default=0.05,
+                        help="seconds spent timing each msg")
+    parser.add_argument("--filter", default=None, help="regex on the msg/request names")
+    parser.add_argument("--replay", default=None,
+                        help="recording to take the msgs to decode from")
+    parser.add_argument("--noAlloc", action="store_true", help="skip the allocation tracing")
+    parser.add_argument("--output", default=None, help="JSON file to write the results to")
+    parser.add_argument("--compare", default=None, help="JSON file of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slow down ratio reported as a regression by --compare")
+    args = parser.parse_args()
+
+    replay = Replay(args.replay) if args.replay else None
+    results = run(tuple(int(version) for version in args.versions.split(",")),
+                  args.duration, args.filter, replay, not args.noAlloc)
+    if replay is not None:
+        replay.close()
+        results["meta"]["replay"] = args.replay
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        nRegressions = print_comparison(compare(results, old), args.threshold)
+        sys.exit(1 if nRegressions else 0)
+
+    print_results(results)
+
+
+if "__main__" == __name__:
+    main()
@@ -0,0 +1,214 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+"""
+asyncio flavour of the EClient.
+The socket is handled by an asyncio.Protocol which frames the incoming
+packets as they are received and has the Decoder call the EWrapper methods
+right away from the event loop: there is no EReader thread and no Queue.
+All the requests of the EClient are available unchanged; only connect() and
+run() become coroutines. The options of the EReader thread, the Queue and the
+EWriter thread do not apply: their setters raise ValueError when asked to
+enable them.
+"""
+
+import asyncio
+import socket
+import logging
+
+from ibapi import comm
+from ibapi.client import EClient
+from ibapi.common import *  # @UnusedWildImport
+from ibapi.errors import *  # @UnusedWildImport
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncConnection(asyncio.Protocol):
+    """ stands in for Connection: the requests only need sendMsg(),
+    isConnected(), disconnect() and close() """
+
+    def __init__(self, client):
+        self.client = client
+        self.transport = None
+        self.buf = bytearray()
+
+    def connection_made(self, transport):
+        logger.debug("connection made")
+        self.transport = transport
+
+    def data_received(self, data):
+        logger.debug("data received, size %d", len(data))
+        self.buf += data
+        view = memoryview(self.buf)
+        (msgs, start) = comm.read_msgs_from(view, 0, len(self.buf))
+        view.release()
+        del self.buf[:start]
+
+        for msg in msgs:
+            if not self.isConnected():
+                break
+            self.client.onMsg(msg)
+
+    def connection_lost(self, exc):
+        logger.debug("connection lost %s", exc)
+        self.transport = None
+        self.client.onConnectionLost()
+
+    def isConnected(self):
+        return self.transport is not None
+
+    def sendMsg(self, msg):
+        if not self.isConnected():
+            logger.debug("sendMsg attempted while not connected")
+            return 0
+        self.transport.write(msg)
+        return len(msg)
+
+    def disconnect(self):
+        if self.transport is not None:
+            logger.debug("disconnecting")
+            self.transport.close()
+            self.transport = None
+
+    def close(self):
+        # no selector nor wakeup pair, the event loop does the waiting
+        pass
+
+
+class AsyncEClient(EClient):
+    def __init__(self, wrapper):
+        EClient.__init__(self, wrapper)
+        self.handshakeDone = None
+        self.connectionLost = None
+
+    def notSupported(self, setter, enabled, reason):
+        if enabled:
+            raise ValueError("%s() is not supported by the AsyncEClient: %s"
+                             % (setter, reason))
+
+    def setReaderBufferSize(self, bufSize: int):
+        self.notSupported("setReaderBufferSize", bufSize > 0,
+                          "the event loop reads the socket")
+
+    def setMsgBatchSize(self, maxBatchSize: int):
+        self.notSupported("setMsgBatchSize", maxBatchSize > 0,
+                          "the msgs are not queued")
+
+    def setEventDriven(self, eventDriven: bool):
+        self.notSupported("setEventDriven", eventDriven,
+                          "the event loop already waits on the socket")
+
+    def setUseWriter(self, useWriter: bool):
+        self.notSupported("setUseWriter", useWriter,
+                          "the transport already buffers the requests")
+
+    def setConflation(self, conflation: bool):
+        self.notSupported("setConflation", conflation, "the msgs are not queued")
+
+    def setPriorityLanes(self, priorityLanes: bool):
+        self.notSupported("setPriorityLanes", priorityLanes, "the msgs are not queued")
+
+    def setSessionManager(self, sessionManager):
+        self.notSupported("setSessionManager", sessionManager is not None,
+                          "the event loop reads the socket")
+
+    def setRecordFile(self, recordFile: str):
+        self.notSupported("setRecordFile", recordFile, "the msgs are not read by an EReader")
+
+    async def connect(self, host, port, clientId, socketOptions=None):
+        """Same as EClient.connect() but must be awaited from the event loop
+        that will then run the EWrapper callbacks. The read size of the
+        socketOptions is not used, the event loop does the reading."""
+
+        self.host = host
+        self.port = port
+        self.clientId = clientId
+        logger.debug("Connecting to %s:%d w/ id:%d", self.host, self.port, self.clientId)
+
+        loop = asyncio.get_running_loop()
+        self.handshakeDone = loop.create_future()
+        self.connectionLost = loop.create_future()
+        try:
+            if socketOptions is None:
+                (_, self.conn) = await loop.create_connection(
+                    lambda: AsyncConnection(self), self.host, self.port)
+            else:
+                sock = await self.openSocket(loop, socketOptions)
+                (_, self.conn) = await loop.create_connection(
+                    lambda: AsyncConnection(self), sock=sock)
+        except OSError:
+            if self.wrapper:
+                self.wrapper.error(NO_VALID_ID, CONNECT_FAIL.code(), CONNECT_FAIL.msg())
+            logger.info("could not connect")
+            self.reset()
+            return
+
+        self.setConnState(EClient.CONNECTING)
+        self.decoder = self.makeDecoder()
+        self.conn.sendMsg(self.handshakeMsg())
+
+        await self.handshakeDone
+        if not self.conn or not self.conn.isConnected():
+            logger.warning('Disconnected; resetting connection')
+            return
+
+        logger.info("sent startApi")
+        self.startApi()
+        self.wrapper.connectAck()
+
+    async def openSocket(self, loop, socketOptions):
+        """ the socket options are set before connecting, as for the
+        Connection of EClient """
+        sock = socket.socket()
+        try:
+            socketOptions.apply(sock)
+            sock.setblocking(False)
+            await loop.sock_connect(sock, (self.host, self.port))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    async def run(self):
+        """Waits until the connection is closed, the msgs are processed as
+        they arrive by the event loop."""
+
+        try:
+            if self.connectionLost is not None:
+                await self.connectionLost
+        finally:
+            self.disconnect()
+
+    def onMsg(self, msg):
+        if self.connState == EClient.CONNECTING:
+            self.onHandshakeMsg(msg)
+        elif not self.processMsgs((msg, )):
+            self.disconnect()
+
+    def onHandshakeMsg(self, msg):
+        fields = comm.read_fields(msg)
+        # sometimes I get news before the server version
+        if len(fields) != 2:
+            self.decoder.interpret(fields)
+            return
+
+        (server_version, conn_time) = fields
+        server_version = int(server_version)
+        logger.debug("ANSWER Version:%d time:%s", server_version, conn_time)
+        self.connTime = conn_time
+        self.serverVersion_ = server_version
+        self.decoder.setServerVersion(self.serverVersion())
+
+        self.setConnState(EClient.CONNECTED)
+        self.handshakeDone.set_result(None)
+
+    def onConnectionLost(self):
+        if self.handshakeDone is not None and not self.handshakeDone.done():
+            self.handshakeDone.set_result(None)
+        if self.connectionLost is not None and not self.connectionLost.done():
+            self.connectionLost.set_result(None)
+        self.disconnect()
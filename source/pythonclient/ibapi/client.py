@@ -16,16 +16,17 @@ import logging
 import queue
 import socket
 
-from ibapi import (decoder, reader, comm)
+from ibapi import (decoder, reader, writer, comm, columnar, executor, recorder)
 from ibapi.connection import Connection
+from ibapi.msg_queue import MsgQueue
 from ibapi.message import OUT
 from ibapi.common import *  # @UnusedWildImport
 from ibapi.contract import Contract
 from ibapi.order import Order
 from ibapi.execution import ExecutionFilter
 from ibapi.scanner import ScannerSubscription
-from ibapi.comm import (make_field, make_field_handle_empty)
-from ibapi.utils import (current_fn_name, BadMessage)
+from ibapi.comm import (make_field, make_field_handle_empty, OutMessage)
+from ibapi.utils import (current_fn_name, BadMessage, HOT_PATH_LOGGING)
 from ibapi.errors import *  # @UnusedWildImport
 from ibapi.server_versions import *  # @UnusedWildImport
 from ibapi.utils import ClientException
@@ -44,9 +45,24 @@ class EClient(object):
         self.msg_queue = queue.Queue()
         self.wrapper = wrapper
         self.decoder = None
+        self.readerBufSize = 0
+        self.msgBatchSize = 0
+        self.eventDriven = False
+        self.sessionManager = None
+        self.useWriter = False
+        self.conflation = False
+        self.priorityLanes = False
+        self.columnarHistoricalData = False
+        self.skipUnhandledMsgs = False
+        self.callbackWorkers = 0
+        self.recordFile = None
+        self.latencyMonitor = None
+        self.executor = None
         self.reset()
 
     def reset(self):
+        # the workers are started along with the decoder, before the handshake
+        self.stopExecutor()
         self.nKeybIntHard = 0
         self.conn = None
         self.host = None
@@ -59,6 +75,7 @@ class EClient(object):
         self.optCapab = ""
         self.asynchronous = False
         self.reader = None
+        self.writer = None
         self.decode = None
         self.setConnState(EClient.DISCONNECTED)
         self.connectionOptions = None
@@ -70,9 +87,18 @@ class EClient(object):
                                                  self.connState))
 
     def sendMsg(self, msg):
-        full_msg = comm.make_msg(msg)
-        logger.info("%s %s %s", "SENDING", current_fn_name(1), full_msg)
-        self.conn.sendMsg(full_msg)
+        """ msg is either the str made of the make_field() fields or an
+        OutMessage """
+        if type(msg) is OutMessage:
+            full_msg = msg.toBytes()
+        else:
+            full_msg = comm.make_msg(msg)
+        if HOT_PATH_LOGGING:
+            logger.info("%s %s %s", "SENDING", current_fn_name(1), full_msg)
+        if self.writer is not None:
+            self.writer.sendMsg(full_msg)
+        else:
+            self.conn.sendMsg(full_msg)
 
     def logRequest(self, fnName, fnParams):
         if logger.isEnabledFor(logging.INFO):
@@ -87,7 +113,8 @@ class EClient(object):
         """  Initiates the message exchange between the client application and
         the TWS/IB Gateway. """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(),
@@ -111,7 +138,7 @@ class EClient(object):
 
         self.sendMsg(msg)
 
-    def connect(self, host, port, clientId):
+    def connect(self, host, port, clientId, socketOptions=None):
         """This function must be called before any other. There is no
         feedback for a successful connection, but a subsequent attempt to
         connect will return the message \"Already connected.\"
@@ -124,7 +151,9 @@ class EClient(object):
             orders placed/modified from this client will be associated with
             this client identifier.
 
-            Note: Each client MUST connect with a unique clientId."""
+            Note: Each client MUST connect with a unique clientId.
+        socketOptions:SocketOptions - Optional socket buffer sizes, TCP_NODELAY
+            and read size, the OS defaults are used when None."""
 
         try:
             self.host = host
@@ -132,27 +161,15 @@ class EClient(object):
             self.clientId = clientId
             logger.debug("Connecting to %s:%d w/ id:%d", self.host, self.port, self.clientId)
 
-            self.conn = Connection(self.host, self.port)
+            self.conn = Connection(self.host, self.port, socketOptions, self.eventDriven)
 
             self.conn.connect()
             self.setConnState(EClient.CONNECTING)
 
-            # TODO: support async mode
-
-            v100prefix = "API\0"
-            v100version = "v%d..%d" % (MIN_CLIENT_VER, MAX_CLIENT_VER)
-
-            if self.connectionOptions:
-                v100version = v100version + " " + self.connectionOptions
+            # see AsyncEClient for the asyncio based flavour
+            self.conn.sendMsg(self.handshakeMsg())
 
-            # v100version = "v%d..%d" % (MIN_CLIENT_VER, 101)
-            msg = comm.make_msg(v100version)
-            logger.debug("msg %s", msg)
-            msg2 = str.encode(v100prefix, 'ascii') + msg
-            logger.debug("REQUEST %s", msg2)
-            self.conn.sendMsg(msg2)
-
-            self.decoder = decoder.Decoder(self.wrapper, self.serverVersion())
+            self.decoder = self.makeDecoder()
             fields = []
 
             # sometimes I get news before the server version, thus the loop
@@ -163,6 +180,7 @@ class EClient(object):
                     # recvMsg() triggers disconnect() where there's a socket.error or 0 length buffer
                     # if we don't then drop out of the while loop it infinitely loops
                     logger.warning('Disconnected; resetting connection')
+                    self.conn.close()
                     self.reset()
                     return
                 logger.debug("ANSWER %s", buf)
@@ -179,12 +197,29 @@ class EClient(object):
             logger.debug("ANSWER Version:%d time:%s", server_version, conn_time)
             self.connTime = conn_time
             self.serverVersion_ = server_version
-            self.decoder.serverVersion = self.serverVersion()
+            self.decoder.setServerVersion(self.serverVersion())
 
             self.setConnState(EClient.CONNECTED)
 
-            self.reader = reader.EReader(self.conn, self.msg_queue)
-            self.reader.start()  # start thread
+            if self.sessionManager is not None:
+                self.sessionManager.addSession(self)
+            else:
+                if self.conflation or self.priorityLanes:
+                    self.msg_queue = MsgQueue(self.msgBatchSize, self.conflation,
+                                              self.priorityLanes)
+                msgRecorder = None
+                if self.recordFile is not None:
+                    msgRecorder = recorder.Recorder(self.recordFile, self.serverVersion())
+                if self.latencyMonitor is not None:
+                    self.conn.timestamps = True
+                    self.latencyMonitor.setQueue(self.msg_queue)
+                self.reader = reader.EReader(self.conn, self.msg_queue, self.readerBufSize,
+                                            self.msgBatchSize, self.eventDriven, msgRecorder,
+                                            self.latencyMonitor)
+                self.reader.start()  # start thread
+            if self.useWriter:
+                self.writer = writer.EWriter(self.conn)
+                self.writer.start()
             logger.info("sent startApi")
             self.startApi()
             self.wrapper.connectAck()
@@ -194,6 +229,23 @@ class EClient(object):
             logger.info("could not connect")
             self.disconnect()
 
+    def handshakeMsg(self) -> bytes:
+        """The first msg sent to TWS/IBGW: the v100 prefix and the range of
+        supported client versions."""
+
+        v100prefix = "API\0"
+        v100version = "v%d..%d" % (MIN_CLIENT_VER, MAX_CLIENT_VER)
+
+        if self.connectionOptions:
+            v100version = v100version + " " + self.connectionOptions
+
+        # v100version = "v%d..%d" % (MIN_CLIENT_VER, 101)
+        msg = comm.make_msg(v100version)
+        logger.debug("msg %s", msg)
+        msg2 = str.encode(v100prefix, 'ascii') + msg
+        logger.debug("REQUEST %s", msg2)
+        return msg2
+
     def disconnect(self):
         """Call this function to terminate the connections with TWS.
         Calling this function does not cancel orders that have already been
@@ -202,16 +254,32 @@ class EClient(object):
         self.setConnState(EClient.DISCONNECTED)
         if self.conn is not None:
             logger.info("disconnecting")
+            if self.sessionManager is not None:
+                self.sessionManager.removeSession(self)
+            if self.writer is not None:
+                # flushes the pending requests
+                self.writer.stop()
             self.conn.disconnect()
+            if self.reader is None:
+                # released by the EReader otherwise
+                self.conn.close()
+            # the pending callbacks run before connectionClosed()
+            self.stopExecutor()
             self.wrapper.connectionClosed()
             self.reset()
 
+    def stopExecutor(self):
+        if self.executor is not None:
+            self.executor.stop()
+            self.executor = None
+
     def isConnected(self):
         """Call this function to check if there is a connection with TWS"""
 
         connConnected = self.conn and self.conn.isConnected()
-        logger.debug("%s isConn: %s, connConnected: %s" % (id(self),
-                                                           self.connState, str(connConnected)))
+        if HOT_PATH_LOGGING:
+            logger.debug("%s isConn: %s, connConnected: %s", id(self),
+                         self.connState, connConnected)
         return EClient.CONNECTED == self.connState and connConnected
 
     def keyboardInterrupt(self):
@@ -226,6 +294,142 @@ class EClient(object):
     def setConnectionOptions(self, opts):
         self.connectionOptions = opts
 
+    def setReaderBufferSize(self, bufSize: int):
+        """When bufSize > 0 the EReader thread reads the socket directly in a
+        preallocated buffer of that size (grown if a msg does not fit) and
+        frames the msgs in place instead of concatenating/slicing bytes.
+        Must be called before connect()."""
+
+        self.readerBufSize = bufSize
+
+    def setMsgBatchSize(self, maxBatchSize: int):
+        """When maxBatchSize > 0 the EReader thread hands all the msgs framed
+        from one packet to run() as lists of at most maxBatchSize msgs, which
+        costs one Queue round trip per list instead of one per msg.
+        Must be called before connect()."""
+
+        self.msgBatchSize = maxBatchSize
+
+    def setEventDriven(self, eventDriven: bool):
+        """When True the EReader thread blocks on a selector until the socket
+        is readable and run() blocks on the Queue until a msg or the end of
+        the connection is queued, instead of polling every 1s and 0.2s: an
+        idle connection then costs no CPU and a disconnection is seen right
+        away. msgLoopTmo() is not called in this mode.
+        Must be called before connect()."""
+
+        self.eventDriven = eventDriven
+
+    def setUseWriter(self, useWriter: bool):
+        """When True the requests are queued to an EWriter thread which sends
+        all the msgs queued so far with one sendmsg() call, instead of each
+        request taking the connection lock and doing its own send. Meant for
+        bursts of requests, eg: a basket of orders or the subscriptions at
+        startup. Must be called before connect()."""
+
+        self.useWriter = useWriter
+
+    def setConflation(self, conflation: bool):
+        """When True the market data msgs (tickPrice, tickSize, tickGeneric and
+        the BidAsk tickByTick) waiting in the Queue are replaced by the newer
+        ones for the same reqId and tick type, so a slow run() loop processes
+        the latest values instead of a growing backlog. The other msgs are
+        all processed in order. msg_queue.stats() has the conflation counts.
+        Must be called before connect()."""
+
+        self.conflation = conflation
+
+    def setPriorityLanes(self, priorityLanes: bool):
+        """When True the order status, open order, execution, commission
+        report and error msgs (and the matching end msgs) are processed by
+        run() ahead of the market data waiting in the Queue; the order of the
+        msgs is kept within each of these two lanes. msg_queue.stats() has
+        the number of msgs which went through the priority lane.
+        Must be called before connect()."""
+
+        self.priorityLanes = priorityLanes
+
+    def setSessionManager(self, sessionManager):
+        """Hands the connection to the given (started) SessionManager which
+        reads it and runs the decoding and the EWrapper callbacks on one of
+        its workers: there is then no EReader thread and run() must not be
+        called. Must be called before connect()."""
+
+        self.sessionManager = sessionManager
+
+    def setColumnarHistoricalData(self, columnarHistoricalData: bool):
+        """When True the historical bars and ticks are decoded straight into
+        NumPy structured arrays and delivered to historicalDataArray(),
+        historicalTicksArray(), historicalTicksBidAskArray() and
+        historicalTicksLastArray() instead of the per bar/tick callbacks.
+        Needs NumPy. Must be called before connect()."""
+
+        if columnarHistoricalData:
+            columnar.check_numpy()
+        self.columnarHistoricalData = columnarHistoricalData
+
+    def setRecordFile(self, recordFile: str):
+        """When set the EReader thread records all the msgs received from TWS,
+        along with their receive time and the server version, in recordFile
+        (overwritten at each connect). See recorder.Replay to replay them.
+        Must be called before connect()."""
+
+        self.recordFile = recordFile
+
+    def setLatencyMonitor(self, latencyMonitor):
+        """When set (a latency.LatencyMonitor) each msg is timestamped from
+        the socket read to the end of its callbacks and the time of each
+        stage is aggregated per msg in histograms, see
+        latencyMonitor.snapshot(). Not supported with a SessionManager.
+        Must be called before connect()."""
+
+        self.latencyMonitor = latencyMonitor
+
+    def setCallbackWorkers(self, nWorkers: int):
+        """When nWorkers > 0 the EWrapper callbacks (and the ones of the
+        registered handlers) run on nWorkers threads instead of the run()
+        thread. They are sharded by reqId: the callbacks for one id keep their
+        order, the ones for different ids may run in parallel, the callbacks
+        without such id and the order/execution callbacks all run on one
+        worker (see executor). The wrapper must then be thread safe.
+        Must be called before connect()."""
+
+        self.callbackWorkers = nWorkers
+
+    def setSkipUnhandledMsgs(self, skipUnhandledMsgs: bool):
+        """When True the msgs whose EWrapper callbacks are not overridden by
+        the wrapper (eg: news bulletins, display groups) are dropped right
+        after reading their msg id instead of being decoded for the default
+        callbacks, which only log them. The errors are always processed.
+        decoder.nSkipped counts the dropped msgs per msg id.
+        Must be called before connect()."""
+
+        self.skipUnhandledMsgs = skipUnhandledMsgs
+
+    def registerHandler(self, reqId, handler):
+        """Routes the msgs for reqId to handler instead of the wrapper: any
+        object with some of the EWrapper methods (eg: tickPrice and tickSize
+        for a reqMktData), the wrapper still gets the other ones. Meant to be
+        called right before the request, once connected; the handler stays
+        registered until unregisterHandler()."""
+
+        self.decoder.registerHandler(reqId, handler)
+
+    def unregisterHandler(self, reqId):
+        self.decoder.unregisterHandler(reqId)
+
+    def makeDecoder(self):
+        dec = decoder.Decoder(self.wrapper, self.serverVersion())
+        dec.columnar = self.columnarHistoricalData
+        dec.setSkipUnhandled(self.skipUnhandledMsgs)
+        if self.callbackWorkers > 0:
+            self.executor = executor.CallbackExecutor(self.callbackWorkers)
+            self.executor.start()
+            dec.setExecutor(self.executor)
+        if self.latencyMonitor is not None:
+            dec.setLatencyMonitor(self.latencyMonitor)
+        return dec
+
     def msgLoopTmo(self):
         # intended to be overloaded
         pass
@@ -242,36 +446,64 @@ class EClient(object):
             while self.isConnected() or not self.msg_queue.empty():
                 try:
                     try:
-                        text = self.msg_queue.get(block=True, timeout=0.2)
-                        if len(text) > MAX_MSG_LEN:
-                            self.wrapper.error(NO_VALID_ID, BAD_LENGTH.code(),
-                                               "%s:%d:%s" % (BAD_LENGTH.msg(), len(text), text))
-                            break
+                        msgs = self.msg_queue.get(block=True,
+                                                  timeout=None if self.eventDriven else 0.2)
                     except queue.Empty:
-                        logger.debug("queue.get: empty")
+                        if HOT_PATH_LOGGING:
+                            logger.debug("queue.get: empty")
                         self.msgLoopTmo()
                     else:
-                        fields = comm.read_fields(text)
-                        logger.debug("fields %s", fields)
-                        self.decoder.interpret(fields)  # This line interprets the msg returned by IB API server
-                        self.msgLoopRec()
+                        if msgs is None:
+                            # queued by the reader when it is done
+                            continue
+                        if self.latencyMonitor is not None:
+                            self.latencyMonitor.dequeued()
+                        # in batched mode the reader queues lists of msgs
+                        if type(msgs) is not list:
+                            msgs = (msgs, )
+                        if not self.processMsgs(msgs):
+                            break
                 except (KeyboardInterrupt, SystemExit):
                     logger.info("detected KeyboardInterrupt, SystemExit")
                     self.keyboardInterrupt()
                     self.keyboardInterruptHard()
-                except BadMessage:
-                    logger.info("BadMessage")
 
-                logger.debug("conn:%d queue.sz:%d",
-                             self.isConnected(),
-                             self.msg_queue.qsize())
+                if HOT_PATH_LOGGING:
+                    logger.debug("conn:%d queue.sz:%d",
+                                 self.isConnected(),
+                                 self.msg_queue.qsize())
         finally:
             self.disconnect()
 
+    def processMsgs(self, msgs):
+        """Interprets the given low level msgs, returns False if the message
+        loop must stop."""
+
+        latencyMonitor = self.latencyMonitor
+        for (text, fields) in zip(msgs, comm.read_fields_batch(msgs)):
+            try:
+                if len(text) > MAX_MSG_LEN:
+                    self.wrapper.error(NO_VALID_ID, BAD_LENGTH.code(),
+                                       "%s:%d:%s" % (BAD_LENGTH.msg(), len(text), text))
+                    return False
+                if HOT_PATH_LOGGING:
+                    logger.debug("fields %s", fields)
+                if latencyMonitor is not None:
+                    latencyMonitor.dispatchStart()
+                self.decoder.interpret(fields)  # This line interprets the msg returned by IB API server
+                if latencyMonitor is not None:
+                    latencyMonitor.dispatchEnd(text)
+                self.msgLoopRec()
+            except BadMessage:
+                logger.info("BadMessage")
+
+        return True
+
     def reqCurrentTime(self):
         """Asks the current system time on the server side."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(),
@@ -295,7 +527,8 @@ class EClient(object):
         """The default detail level is ERROR. For more details, see API
         Logging."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(),
@@ -343,7 +576,8 @@ class EClient(object):
         mktDataOptions:TagValueList - For internal use only.
             Use default value XYZ. """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(),
@@ -373,53 +607,53 @@ class EClient(object):
             VERSION = 11
 
             # send req mkt data msg
-            flds = []
-            flds += [make_field(OUT.REQ_MKT_DATA),
-                     make_field(VERSION),
-                     make_field(reqId)]
+            msg = OutMessage()
+            msg.addField(OUT.REQ_MKT_DATA)
+            msg.addField(VERSION)
+            msg.addField(reqId)
 
             # send contract fields
             if self.serverVersion() >= MIN_SERVER_VER_REQ_MKT_DATA_CONID:
-                flds += [make_field(contract.conId), ]
-
-            flds += [make_field(contract.symbol),
-                     make_field(contract.secType),
-                     make_field(contract.lastTradeDateOrContractMonth),
-                     make_field(contract.strike),
-                     make_field(contract.right),
-                     make_field(contract.multiplier),  # srv v15 and above
-                     make_field(contract.exchange),
-                     make_field(contract.primaryExchange),  # srv v14 and above
-                     make_field(contract.currency),
-                     make_field(contract.localSymbol)]  # srv v2 and above
+                msg.addField(contract.conId)
+
+            msg.addField(contract.symbol)
+            msg.addField(contract.secType)
+            msg.addField(contract.lastTradeDateOrContractMonth)
+            msg.addField(contract.strike)
+            msg.addField(contract.right)
+            msg.addField(contract.multiplier)  # srv v15 and above
+            msg.addField(contract.exchange)
+            msg.addField(contract.primaryExchange)  # srv v14 and above
+            msg.addField(contract.currency)
+            msg.addField(contract.localSymbol)  # srv v2 and above
 
             if self.serverVersion() >= MIN_SERVER_VER_TRADING_CLASS:
-                flds += [make_field(contract.tradingClass), ]
+                msg.addField(contract.tradingClass)
 
             # Send combo legs for BAG requests (srv v8 and above)
             if contract.secType == "BAG":
                 comboLegsCount = len(contract.comboLegs) if contract.comboLegs else 0
-                flds += [make_field(comboLegsCount), ]
+                msg.addField(comboLegsCount)
                 for comboLeg in contract.comboLegs:
-                    flds += [make_field(comboLeg.conId),
-                             make_field(comboLeg.ratio),
-                             make_field(comboLeg.action),
-                             make_field(comboLeg.exchange)]
+                    msg.addField(comboLeg.conId)
+                    msg.addField(comboLeg.ratio)
+                    msg.addField(comboLeg.action)
+                    msg.addField(comboLeg.exchange)
 
             if self.serverVersion() >= MIN_SERVER_VER_DELTA_NEUTRAL:
                 if contract.deltaNeutralContract:
-                    flds += [make_field(True),
-                             make_field(contract.deltaNeutralContract.conId),
-                             make_field(contract.deltaNeutralContract.delta),
-                             make_field(contract.deltaNeutralContract.price)]
+                    msg.addField(True)
+                    msg.addField(contract.deltaNeutralContract.conId)
+                    msg.addField(contract.deltaNeutralContract.delta)
+                    msg.addField(contract.deltaNeutralContract.price)
                 else:
-                    flds += [make_field(False), ]
+                    msg.addField(False)
 
-            flds += [make_field(genericTickList),  # srv v31 and above
-                     make_field(snapshot)]  # srv v35 and above
+            msg.addField(genericTickList)  # srv v31 and above
+            msg.addField(snapshot)  # srv v35 and above
 
             if self.serverVersion() >= MIN_SERVER_VER_REQ_SMART_COMPONENTS:
-                flds += [make_field(regulatorySnapshot), ]
+                msg.addField(regulatorySnapshot)
 
             # send mktDataOptions parameter
             if self.serverVersion() >= MIN_SERVER_VER_LINKING:
@@ -427,9 +661,7 @@ class EClient(object):
                 if mktDataOptions:
                     raise NotImplementedError("not supported")
                 mktDataOptionsStr = ""
-                flds += [make_field(mktDataOptionsStr), ]
-
-            msg = "".join(flds)
+                msg.addField(mktDataOptionsStr)
 
         except ClientException as ex:
             self.wrapper.error(reqId, ex.code, ex.msg + ex.text)
@@ -444,7 +676,8 @@ class EClient(object):
         reqId: TickerId - The ID that was specified in the call to
             reqMktData(). """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -453,12 +686,11 @@ class EClient(object):
         VERSION = 2
 
         # send req mkt data msg
-        flds = []
-        flds += [make_field(OUT.CANCEL_MKT_DATA),
-                 make_field(VERSION),
-                 make_field(reqId)]
+        msg = OutMessage()
+        msg.addField(OUT.CANCEL_MKT_DATA)
+        msg.addField(VERSION)
+        msg.addField(reqId)
 
-        msg = "".join(flds)
         self.sendMsg(msg)
 
     def reqMarketDataType(self, marketDataType: int):
@@ -473,7 +705,8 @@ class EClient(object):
         marketDataType:int - 1 for real-time streaming market data or 2 for
             frozen market data"""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -496,7 +729,8 @@ class EClient(object):
         self.sendMsg(msg)
 
     def reqSmartComponents(self, reqId: int, bboExchange: str):
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -520,7 +754,8 @@ class EClient(object):
         self.sendMsg(msg)
 
     def reqMarketRule(self, marketRuleId: int):
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -538,7 +773,8 @@ class EClient(object):
 
     def reqTickByTickData(self, reqId: int, contract: Contract, tickType: str,
                           numberOfTicks: int, ignoreSize: bool):
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -584,7 +820,8 @@ class EClient(object):
         self.sendMsg(msg)
 
     def cancelTickByTickData(self, reqId: int):
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -616,7 +853,8 @@ class EClient(object):
         optionPrice:double - The price of the option.
         underPrice:double - Price of the underlying."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -682,7 +920,8 @@ class EClient(object):
 
         reqId:TickerId - The request ID.  """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -712,7 +951,8 @@ class EClient(object):
         volatility:double - The volatility.
         underPrice:double - Price of the underlying."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -778,7 +1018,8 @@ class EClient(object):
 
         reqId:TickerId - The request ID.  """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -815,7 +1056,8 @@ class EClient(object):
              be overridden and the out-of-the money option would be exercised.
             Values are: 0 = no, 1 = yes."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -879,7 +1121,8 @@ class EClient(object):
         order:Order - This structure contains the details of tradedhe order.
             Note: Each client MUST connect with a unique clientId."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(orderId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1030,7 +1273,7 @@ class EClient(object):
                 return
 
         if self.serverVersion() < MIN_SERVER_VER_SOFT_DOLLAR_TIER:
-            if order.softDollarTier.event_name or order.softDollarTier.val:
+            if order.softDollarTier.name or order.softDollarTier.val:
                 self.wrapper.error(orderId, UPDATE_TWS.code(), UPDATE_TWS.msg() +
                                    " It does not support soft dollar tier")
                 return
@@ -1073,104 +1316,102 @@ class EClient(object):
             VERSION = 27 if (self.serverVersion() < MIN_SERVER_VER_NOT_HELD) else 45
 
             # send place order msg
-            flds = []
-            flds += [make_field(OUT.PLACE_ORDER)]
+            msg = OutMessage()
+            msg.addField(OUT.PLACE_ORDER)
 
             if self.serverVersion() < MIN_SERVER_VER_ORDER_CONTAINER:
-                flds += [make_field(VERSION)]
+                msg.addField(VERSION)
 
-            flds += [make_field(orderId)]
+            msg.addField(orderId)
 
             # send contract fields
             if self.serverVersion() >= MIN_SERVER_VER_PLACE_ORDER_CONID:
-                flds.append(make_field(contract.conId))
-            flds += [make_field(contract.symbol),
-                     make_field(contract.secType),
-                     make_field(contract.lastTradeDateOrContractMonth),
-                     make_field(contract.strike),
-                     make_field(contract.right),
-                     make_field(contract.multiplier),  # srv v15 and above
-                     make_field(contract.exchange),
-                     make_field(contract.primaryExchange),  # srv v14 and above
-                     make_field(contract.currency),
-                     make_field(contract.localSymbol)]  # srv v2 and above
+                msg.addField(contract.conId)
+            msg.addField(contract.symbol)
+            msg.addField(contract.secType)
+            msg.addField(contract.lastTradeDateOrContractMonth)
+            msg.addField(contract.strike)
+            msg.addField(contract.right)
+            msg.addField(contract.multiplier)  # srv v15 and above
+            msg.addField(contract.exchange)
+            msg.addField(contract.primaryExchange)  # srv v14 and above
+            msg.addField(contract.currency)
+            msg.addField(contract.localSymbol)  # srv v2 and above
             if self.serverVersion() >= MIN_SERVER_VER_TRADING_CLASS:
-                flds.append(make_field(contract.tradingClass))
+                msg.addField(contract.tradingClass)
 
             if self.serverVersion() >= MIN_SERVER_VER_SEC_ID_TYPE:
-                flds += [make_field(contract.secIdType),
-                         make_field(contract.secId)]
+                msg.addField(contract.secIdType)
+                msg.addField(contract.secId)
 
             # send main order fields
-            flds.append(make_field(order.action))
+            msg.addField(order.action)
 
             if self.serverVersion() >= MIN_SERVER_VER_FRACTIONAL_POSITIONS:
-                flds.append(make_field(order.totalQuantity))
+                msg.addField(order.totalQuantity)
             else:
-                flds.append(make_field(int(order.totalQuantity)))
+                msg.addField(int(order.totalQuantity))
 
-            flds.append(make_field(order.orderType))
+            msg.addField(order.orderType)
             if self.serverVersion() < MIN_SERVER_VER_ORDER_COMBO_LEGS_PRICE:
-                flds.append(make_field(
-                    order.lmtPrice if order.lmtPrice != UNSET_DOUBLE else 0))
+                msg.addField(order.lmtPrice if order.lmtPrice != UNSET_DOUBLE else 0)
             else:
-                flds.append(make_field_handle_empty(order.lmtPrice))
+                msg.addFieldHandleEmpty(order.lmtPrice)
             if self.serverVersion() < MIN_SERVER_VER_TRAILING_PERCENT:
-                flds.append(make_field(
-                    order.auxPrice if order.auxPrice != UNSET_DOUBLE else 0))
+                msg.addField(order.auxPrice if order.auxPrice != UNSET_DOUBLE else 0)
             else:
-                flds.append(make_field_handle_empty(order.auxPrice))
+                msg.addFieldHandleEmpty(order.auxPrice)
 
                 # send extended order fields
-                flds += [make_field(order.tif),
-                         make_field(order.ocaGroup),
-                         make_field(order.account),
-                         make_field(order.openClose),
-                         make_field(order.origin),
-                         make_field(order.orderRef),
-                         make_field(order.transmit),
-                         make_field(order.parentId),  # srv v4 and above
-                         make_field(order.blockOrder),  # srv v5 and above
-                         make_field(order.sweepToFill),  # srv v5 and above
-                         make_field(order.displaySize),  # srv v5 and above
-                         make_field(order.triggerMethod),  # srv v5 and above
-                         make_field(order.outsideRth),  # srv v5 and above
-                         make_field(order.hidden)]  # srv v7 and above
+                msg.addField(order.tif)
+                msg.addField(order.ocaGroup)
+                msg.addField(order.account)
+                msg.addField(order.openClose)
+                msg.addField(order.origin)
+                msg.addField(order.orderRef)
+                msg.addField(order.transmit)
+                msg.addField(order.parentId)  # srv v4 and above
+                msg.addField(order.blockOrder)  # srv v5 and above
+                msg.addField(order.sweepToFill)  # srv v5 and above
+                msg.addField(order.displaySize)  # srv v5 and above
+                msg.addField(order.triggerMethod)  # srv v5 and above
+                msg.addField(order.outsideRth)  # srv v5 and above
+                msg.addField(order.hidden)  # srv v7 and above
 
             # Send combo legs for BAG requests (srv v8 and above)
             if contract.secType == "BAG":
                 comboLegsCount = len(contract.comboLegs) if contract.comboLegs else 0
-                flds.append(make_field(comboLegsCount))
+                msg.addField(comboLegsCount)
                 if comboLegsCount > 0:
                     for comboLeg in contract.comboLegs:
                         assert comboLeg
-                        flds += [make_field(comboLeg.conId),
-                                 make_field(comboLeg.ratio),
-                                 make_field(comboLeg.action),
-                                 make_field(comboLeg.exchange),
-                                 make_field(comboLeg.openClose),
-                                 make_field(comboLeg.shortSaleSlot),  # srv v35 and above
-                                 make_field(comboLeg.designatedLocation)]  # srv v35 and above
+                        msg.addField(comboLeg.conId)
+                        msg.addField(comboLeg.ratio)
+                        msg.addField(comboLeg.action)
+                        msg.addField(comboLeg.exchange)
+                        msg.addField(comboLeg.openClose)
+                        msg.addField(comboLeg.shortSaleSlot)  # srv v35 and above
+                        msg.addField(comboLeg.designatedLocation)  # srv v35 and above
                         if self.serverVersion() >= MIN_SERVER_VER_SSHORTX_OLD:
-                            flds.append(make_field(comboLeg.exemptCode))
+                            msg.addField(comboLeg.exemptCode)
 
             # Send order combo legs for BAG requests
             if self.serverVersion() >= MIN_SERVER_VER_ORDER_COMBO_LEGS_PRICE and contract.secType == "BAG":
                 orderComboLegsCount = len(order.orderComboLegs) if order.orderComboLegs else 0
-                flds.append(make_field(orderComboLegsCount))
+                msg.addField(orderComboLegsCount)
                 if orderComboLegsCount:
                     for orderComboLeg in order.orderComboLegs:
                         assert orderComboLeg
-                        flds.append(make_field_handle_empty(orderComboLeg.price))
+                        msg.addFieldHandleEmpty(orderComboLeg.price)
 
             if self.serverVersion() >= MIN_SERVER_VER_SMART_COMBO_ROUTING_PARAMS and contract.secType == "BAG":
                 smartComboRoutingParamsCount = len(
                     order.smartComboRoutingParams) if order.smartComboRoutingParams else 0
-                flds.append(make_field(smartComboRoutingParamsCount))
+                msg.addField(smartComboRoutingParamsCount)
                 if smartComboRoutingParamsCount > 0:
                     for tagValue in order.smartComboRoutingParams:
-                        flds += [make_field(tagValue.tag),
-                                 make_field(tagValue.value)]
+                        msg.addField(tagValue.tag)
+                        msg.addField(tagValue.value)
 
             ######################################################################
             # Send the shares allocation.
@@ -1185,143 +1426,138 @@ class EClient(object):
             #          U101/20,U203/80
             #####################################################################
             # send deprecated sharesAllocation field
-            flds += [make_field(""),  # srv v9 and above
-
-                     make_field(order.discretionaryAmt),  # srv v10 and above
-                     make_field(order.goodAfterTime),  # srv v11 and above
-                     make_field(order.goodTillDate),  # srv v12 and above
-
-                     make_field(order.faGroup),  # srv v13 and above
-                     make_field(order.faMethod),  # srv v13 and above
-                     make_field(order.faPercentage),  # srv v13 and above
-                     make_field(order.faProfile)]  # srv v13 and above
+            msg.addField("")  # srv v9 and above
+            msg.addField(order.discretionaryAmt)  # srv v10 and above
+            msg.addField(order.goodAfterTime)  # srv v11 and above
+            msg.addField(order.goodTillDate)  # srv v12 and above
+            msg.addField(order.faGroup)  # srv v13 and above
+            msg.addField(order.faMethod)  # srv v13 and above
+            msg.addField(order.faPercentage)  # srv v13 and above
+            msg.addField(order.faProfile)  # srv v13 and above
 
             if self.serverVersion() >= MIN_SERVER_VER_MODELS_SUPPORT:
-                flds.append(make_field(order.modelCode))
+                msg.addField(order.modelCode)
 
             # institutional short saleslot data (srv v18 and above)
-            flds += [make_field(order.shortSaleSlot),  # 0 for retail, 1 or 2 for institutions
-                     make_field(order.designatedLocation)]  # populate only when shortSaleSlot = 2.
+            msg.addField(order.shortSaleSlot)  # 0 for retail, 1 or 2 for institutions
+            msg.addField(order.designatedLocation)  # populate only when shortSaleSlot = 2.
             if self.serverVersion() >= MIN_SERVER_VER_SSHORTX_OLD:
-                flds.append(make_field(order.exemptCode))
+                msg.addField(order.exemptCode)
 
             # not needed anymore
             # bool isVolOrder = (order.orderType.CompareNoCase("VOL") == 0)
 
             # srv v19 and above fields
-            flds.append(make_field(order.ocaType))
+            msg.addField(order.ocaType)
             # if( self.serverVersion() < 38) {
             # will never happen
             #      send( /* order.rthOnly */ false);
             # }
-            flds += [make_field(order.rule80A),
-                     make_field(order.settlingFirm),
-                     make_field(order.allOrNone),
-                     make_field_handle_empty(order.minQty),
-                     make_field_handle_empty(order.percentOffset),
-                     make_field(order.eTradeOnly),
-                     make_field(order.firmQuoteOnly),
-                     make_field_handle_empty(order.nbboPriceCap),
-                     make_field(order.auctionStrategy),  # AUCTION_MATCH, AUCTION_IMPROVEMENT, AUCTION_TRANSPARENT
-                     make_field_handle_empty(order.startingPrice),
-                     make_field_handle_empty(order.stockRefPrice),
-                     make_field_handle_empty(order.delta),
-                     make_field_handle_empty(order.stockRangeLower),
-                     make_field_handle_empty(order.stockRangeUpper),
-
-                     make_field(order.overridePercentageConstraints),  # srv v22 and above
-
-                     # Volatility orders (srv v26 and above)
-                     make_field_handle_empty(order.volatility),
-                     make_field_handle_empty(order.volatilityType),
-                     make_field(order.deltaNeutralOrderType),  # srv v28 and above
-                     make_field_handle_empty(order.deltaNeutralAuxPrice)]  # srv v28 and above
+            msg.addField(order.rule80A)
+            msg.addField(order.settlingFirm)
+            msg.addField(order.allOrNone)
+            msg.addFieldHandleEmpty(order.minQty)
+            msg.addFieldHandleEmpty(order.percentOffset)
+            msg.addField(order.eTradeOnly)
+            msg.addField(order.firmQuoteOnly)
+            msg.addFieldHandleEmpty(order.nbboPriceCap)
+            msg.addField(order.auctionStrategy)  # AUCTION_MATCH, AUCTION_IMPROVEMENT, AUCTION_TRANSPARENT
+            msg.addFieldHandleEmpty(order.startingPrice)
+            msg.addFieldHandleEmpty(order.stockRefPrice)
+            msg.addFieldHandleEmpty(order.delta)
+            msg.addFieldHandleEmpty(order.stockRangeLower)
+            msg.addFieldHandleEmpty(order.stockRangeUpper)
+            msg.addField(order.overridePercentageConstraints)  # srv v22 and above
+            msg.addFieldHandleEmpty(order.volatility)
+            msg.addFieldHandleEmpty(order.volatilityType)
+            msg.addField(order.deltaNeutralOrderType)  # srv v28 and above
+            msg.addFieldHandleEmpty(order.deltaNeutralAuxPrice)  # srv v28 and above
 
             if self.serverVersion() >= MIN_SERVER_VER_DELTA_NEUTRAL_CONID and order.deltaNeutralOrderType:
-                flds += [make_field(order.deltaNeutralConId),
-                         make_field(order.deltaNeutralSettlingFirm),
-                         make_field(order.deltaNeutralClearingAccount),
-                         make_field(order.deltaNeutralClearingIntent)]
+                msg.addField(order.deltaNeutralConId)
+                msg.addField(order.deltaNeutralSettlingFirm)
+                msg.addField(order.deltaNeutralClearingAccount)
+                msg.addField(order.deltaNeutralClearingIntent)
 
             if self.serverVersion() >= MIN_SERVER_VER_DELTA_NEUTRAL_OPEN_CLOSE and order.deltaNeutralOrderType:
-                flds += [make_field(order.deltaNeutralOpenClose),
-                         make_field(order.deltaNeutralShortSale),
-                         make_field(order.deltaNeutralShortSaleSlot),
-                         make_field(order.deltaNeutralDesignatedLocation)]
+                msg.addField(order.deltaNeutralOpenClose)
+                msg.addField(order.deltaNeutralShortSale)
+                msg.addField(order.deltaNeutralShortSaleSlot)
+                msg.addField(order.deltaNeutralDesignatedLocation)
 
-            flds += [make_field(order.continuousUpdate),
-                     make_field_handle_empty(order.referencePriceType),
-                     make_field_handle_empty(order.trailStopPrice)]  # srv v30 and above
+            msg.addField(order.continuousUpdate)
+            msg.addFieldHandleEmpty(order.referencePriceType)
+            msg.addFieldHandleEmpty(order.trailStopPrice)  # srv v30 and above
 
             if self.serverVersion() >= MIN_SERVER_VER_TRAILING_PERCENT:
-                flds.append(make_field_handle_empty(order.trailingPercent))
+                msg.addFieldHandleEmpty(order.trailingPercent)
 
             # SCALE orders
             if self.serverVersion() >= MIN_SERVER_VER_SCALE_ORDERS2:
-                flds += [make_field_handle_empty(order.scaleInitLevelSize),
-                         make_field_handle_empty(order.scaleSubsLevelSize)]
+                msg.addFieldHandleEmpty(order.scaleInitLevelSize)
+                msg.addFieldHandleEmpty(order.scaleSubsLevelSize)
             else:
                 # srv v35 and above)
-                flds += [make_field(""),  # for not supported scaleNumComponents
-                         make_field_handle_empty(order.scaleInitLevelSize)]  # for scaleComponentSize
+                msg.addField("")  # for not supported scaleNumComponents
+                msg.addFieldHandleEmpty(order.scaleInitLevelSize)  # for scaleComponentSize
 
-            flds.append(make_field_handle_empty(order.scalePriceIncrement))
+            msg.addFieldHandleEmpty(order.scalePriceIncrement)
 
             if self.serverVersion() >= MIN_SERVER_VER_SCALE_ORDERS3 \
                     and order.scalePriceIncrement != UNSET_DOUBLE \
                     and order.scalePriceIncrement > 0.0:
-                flds += [make_field_handle_empty(order.scalePriceAdjustValue),
-                         make_field_handle_empty(order.scalePriceAdjustInterval),
-                         make_field_handle_empty(order.scaleProfitOffset),
-                         make_field(order.scaleAutoReset),
-                         make_field_handle_empty(order.scaleInitPosition),
-                         make_field_handle_empty(order.scaleInitFillQty),
-                         make_field(order.scaleRandomPercent)]
+                msg.addFieldHandleEmpty(order.scalePriceAdjustValue)
+                msg.addFieldHandleEmpty(order.scalePriceAdjustInterval)
+                msg.addFieldHandleEmpty(order.scaleProfitOffset)
+                msg.addField(order.scaleAutoReset)
+                msg.addFieldHandleEmpty(order.scaleInitPosition)
+                msg.addFieldHandleEmpty(order.scaleInitFillQty)
+                msg.addField(order.scaleRandomPercent)
 
             if self.serverVersion() >= MIN_SERVER_VER_SCALE_TABLE:
-                flds += [make_field(order.scaleTable),
-                         make_field(order.activeStartTime),
-                         make_field(order.activeStopTime)]
+                msg.addField(order.scaleTable)
+                msg.addField(order.activeStartTime)
+                msg.addField(order.activeStopTime)
 
             # HEDGE orders
             if self.serverVersion() >= MIN_SERVER_VER_HEDGE_ORDERS:
-                flds.append(make_field(order.hedgeType))
+                msg.addField(order.hedgeType)
                 if order.hedgeType:
-                    flds.append(make_field(order.hedgeParam))
+                    msg.addField(order.hedgeParam)
 
             if self.serverVersion() >= MIN_SERVER_VER_OPT_OUT_SMART_ROUTING:
-                flds.append(make_field(order.optOutSmartRouting))
+                msg.addField(order.optOutSmartRouting)
 
             if self.serverVersion() >= MIN_SERVER_VER_PTA_ORDERS:
-                flds += [make_field(order.clearingAccount),
-                         make_field(order.clearingIntent)]
+                msg.addField(order.clearingAccount)
+                msg.addField(order.clearingIntent)
 
             if self.serverVersion() >= MIN_SERVER_VER_NOT_HELD:
-                flds.append(make_field(order.notHeld))
+                msg.addField(order.notHeld)
 
             if self.serverVersion() >= MIN_SERVER_VER_DELTA_NEUTRAL:
                 if contract.deltaNeutralContract:
-                    flds += [make_field(True),
-                             make_field(contract.deltaNeutralContract.conId),
-                             make_field(contract.deltaNeutralContract.delta),
-                             make_field(contract.deltaNeutralContract.price)]
+                    msg.addField(True)
+                    msg.addField(contract.deltaNeutralContract.conId)
+                    msg.addField(contract.deltaNeutralContract.delta)
+                    msg.addField(contract.deltaNeutralContract.price)
                 else:
-                    flds.append(make_field(False))
+                    msg.addField(False)
 
             if self.serverVersion() >= MIN_SERVER_VER_ALGO_ORDERS:
-                flds.append(make_field(order.algoStrategy))
+                msg.addField(order.algoStrategy)
                 if order.algoStrategy:
                     algoParamsCount = len(order.algoParams) if order.algoParams else 0
-                    flds.append(make_field(algoParamsCount))
+                    msg.addField(algoParamsCount)
                     if algoParamsCount > 0:
                         for algoParam in order.algoParams:
-                            flds += [make_field(algoParam.tag),
-                                     make_field(algoParam.value)]
+                            msg.addField(algoParam.tag)
+                            msg.addField(algoParam.value)
 
             if self.serverVersion() >= MIN_SERVER_VER_ALGO_ID:
-                flds.append(make_field(order.algoId))
+                msg.addField(order.algoId)
 
-            flds.append(make_field(order.whatIf))  # srv v36 and above
+            msg.addField(order.whatIf)  # srv v36 and above
 
             # send miscOptions parameter
             if self.serverVersion() >= MIN_SERVER_VER_LINKING:
@@ -1329,73 +1565,70 @@ class EClient(object):
                 if order.orderMiscOptions:
                     for tagValue in order.orderMiscOptions:
                         miscOptionsStr += str(tagValue)
-                flds.append(make_field(miscOptionsStr))
+                msg.addField(miscOptionsStr)
 
             if self.serverVersion() >= MIN_SERVER_VER_ORDER_SOLICITED:
-                flds.append(make_field(order.solicited))
+                msg.addField(order.solicited)
 
             if self.serverVersion() >= MIN_SERVER_VER_RANDOMIZE_SIZE_AND_PRICE:
-                flds += [make_field(order.randomizeSize),
-                         make_field(order.randomizePrice)]
+                msg.addField(order.randomizeSize)
+                msg.addField(order.randomizePrice)
 
             if self.serverVersion() >= MIN_SERVER_VER_PEGGED_TO_BENCHMARK:
                 if order.orderType == "PEG BENCH":
-                    flds += [make_field(order.referenceContractId),
-                             make_field(order.isPeggedChangeAmountDecrease),
-                             make_field(order.peggedChangeAmount),
-                             make_field(order.referenceChangeAmount),
-                             make_field(order.referenceExchangeId)]
+                    msg.addField(order.referenceContractId)
+                    msg.addField(order.isPeggedChangeAmountDecrease)
+                    msg.addField(order.peggedChangeAmount)
+                    msg.addField(order.referenceChangeAmount)
+                    msg.addField(order.referenceExchangeId)
 
-                flds.append(make_field(len(order.conditions)))
+                msg.addField(len(order.conditions))
 
                 if len(order.conditions) > 0:
                     for cond in order.conditions:
-                        flds.append(make_field(cond.type()))
-                        flds += cond.make_fields()
+                        msg.addField(cond.type())
+                        msg.addRawFields("".join(cond.make_fields()))
 
-                    flds += [make_field(order.conditionsIgnoreRth),
-                             make_field(order.conditionsCancelOrder)]
+                    msg.addField(order.conditionsIgnoreRth)
+                    msg.addField(order.conditionsCancelOrder)
 
-                flds += [make_field(order.adjustedOrderType),
-                         make_field(order.triggerPrice),
-                         make_field(order.lmtPriceOffset),
-                         make_field(order.adjustedStopPrice),
-                         make_field(order.adjustedStopLimitPrice),
-                         make_field(order.adjustedTrailingAmount),
-                         make_field(order.adjustableTrailingUnit)]
+                msg.addField(order.adjustedOrderType)
+                msg.addField(order.triggerPrice)
+                msg.addField(order.lmtPriceOffset)
+                msg.addField(order.adjustedStopPrice)
+                msg.addField(order.adjustedStopLimitPrice)
+                msg.addField(order.adjustedTrailingAmount)
+                msg.addField(order.adjustableTrailingUnit)
 
             if self.serverVersion() >= MIN_SERVER_VER_EXT_OPERATOR:
-                flds.append(make_field(order.extOperator))
+                msg.addField(order.extOperator)
 
             if self.serverVersion() >= MIN_SERVER_VER_SOFT_DOLLAR_TIER:
-                flds += [make_field(order.softDollarTier.event_name),
-                         make_field(order.softDollarTier.val)]
+                msg.addField(order.softDollarTier.name)
+                msg.addField(order.softDollarTier.val)
 
             if self.serverVersion() >= MIN_SERVER_VER_CASH_QTY:
-                flds.append(make_field(order.cashQty))
+                msg.addField(order.cashQty)
 
             if self.serverVersion() >= MIN_SERVER_VER_DECISION_MAKER:
-                flds.append(make_field(order.mifid2DecisionMaker))
-                flds.append(make_field(order.mifid2DecisionAlgo))
+                msg.addField(order.mifid2DecisionMaker)
+                msg.addField(order.mifid2DecisionAlgo)
 
             if self.serverVersion() >= MIN_SERVER_VER_MIFID_EXECUTION:
-                flds.append(make_field(order.mifid2ExecutionTrader))
-                flds.append(make_field(order.mifid2ExecutionAlgo))
+                msg.addField(order.mifid2ExecutionTrader)
+                msg.addField(order.mifid2ExecutionAlgo)
 
             if self.serverVersion() >= MIN_SERVER_VER_AUTO_PRICE_FOR_HEDGE:
-                flds.append(make_field(order.dontUseAutoPriceForHedge))
+                msg.addField(order.dontUseAutoPriceForHedge)
 
             if self.serverVersion() >= MIN_SERVER_VER_ORDER_CONTAINER:
-                flds.append(make_field(order.isOmsContainer))
+                msg.addField(order.isOmsContainer)
 
             if self.serverVersion() >= MIN_SERVER_VER_D_PEG_ORDERS:
-                flds.append(make_field(order.discretionaryUpToLimitPrice))
+                msg.addField(order.discretionaryUpToLimitPrice)
 
             if self.serverVersion() >= MIN_SERVER_VER_PRICE_MGMT_ALGO:
-                flds.append(make_field_handle_empty(
-                    UNSET_INTEGER if order.usePriceMgmtAlgo == None else 1 if order.usePriceMgmtAlgo else 0))
-
-            msg = "".join(flds)
+                msg.addFieldHandleEmpty(UNSET_INTEGER if order.usePriceMgmtAlgo == None else 1 if order.usePriceMgmtAlgo else 0)
 
         except ClientException as ex:
             self.wrapper.error(orderId, ex.code, ex.msg + ex.text)
@@ -1409,7 +1642,8 @@ class EClient(object):
         orderId:OrderId - The order ID that was specified previously in the call
             to placeOrder()"""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1433,7 +1667,8 @@ class EClient(object):
         orderId will be generated. This association will persist over multiple
         API and TWS sessions.  """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1458,7 +1693,8 @@ class EClient(object):
         associated with the client. If set to FALSE, no association will be
         made."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1480,7 +1716,8 @@ class EClient(object):
         Note:  No association is made between the returned orders and the
         requesting client."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1500,7 +1737,8 @@ class EClient(object):
         If the order was created in TWS, it also gets canceled. If the order
         was initiated in the API, it also gets canceled."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1522,7 +1760,8 @@ class EClient(object):
 
         numIds:int - deprecated"""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1551,7 +1790,8 @@ class EClient(object):
         acctCode:str -The account code for which to receive account and
             portfolio updates."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1630,7 +1870,8 @@ class EClient(object):
             $LEDGER:ALL - Single flag to relay all cash balance tags* in all
             currencies."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1657,7 +1898,8 @@ class EClient(object):
 
         reqId:int - The ID of the data request being canceled."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1674,7 +1916,8 @@ class EClient(object):
     def reqPositions(self):
         """Requests real-time position data for all accounts."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1695,7 +1938,8 @@ class EClient(object):
     def cancelPositions(self):
         """Cancels real-time position updates."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1718,7 +1962,8 @@ class EClient(object):
         Results are delivered via EWrapper.positionMulti() and
         EWrapper.positionMultiEnd() """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1747,7 +1992,8 @@ class EClient(object):
 
     def cancelPositionsMulti(self, reqId: int):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1770,7 +2016,8 @@ class EClient(object):
                                ledgerAndNLV: bool):
         """Requests account updates for account and/or model."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1800,7 +2047,8 @@ class EClient(object):
 
     def cancelAccountUpdatesMulti(self, reqId: int):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1825,7 +2073,8 @@ class EClient(object):
 
     def reqPnL(self, reqId: int, account: str, modelCode: str):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1851,7 +2100,8 @@ class EClient(object):
 
     def cancelPnL(self, reqId: int):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1869,7 +2119,8 @@ class EClient(object):
 
     def reqPnLSingle(self, reqId: int, account: str, modelCode: str, conid: int):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1896,7 +2147,8 @@ class EClient(object):
 
     def cancelPnLSingle(self, reqId: int):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1931,7 +2183,8 @@ class EClient(object):
 
         NOTE: Time format must be 'yyyymmdd-hh:mm:ss' Eg: '20030702-14:55'"""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -1979,7 +2232,8 @@ class EClient(object):
             make_field() attached to requests if several requests are in process.
         contract: Contract - The summary description of the contract being looked up."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2058,7 +2312,8 @@ class EClient(object):
 
     def reqMktDepthExchanges(self):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2094,7 +2349,8 @@ class EClient(object):
         mktDepthOptions:TagValueList - For internal use only. Use default value
             XYZ."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2172,7 +2428,8 @@ class EClient(object):
             reqMktDepth().
         isSmartDepth:bool - specifies SMART depth request"""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2210,7 +2467,8 @@ class EClient(object):
         the currencyent day and any new ones. If set to FALSE, will only
         return new bulletins. """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2227,7 +2485,8 @@ class EClient(object):
     def cancelNewsBulletins(self):
         """Call this function to stop receiving news bulletins."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2250,7 +2509,8 @@ class EClient(object):
 
         Note:  This request can only be made when connected to a FA managed account."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2273,7 +2533,8 @@ class EClient(object):
             2 = PROFILE
             3 = ACCOUNT ALIASES"""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2300,7 +2561,8 @@ class EClient(object):
         cxml: str - The XML string containing the new FA configuration
             information.  """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2379,7 +2641,8 @@ class EClient(object):
                 1/1/1970 GMT.
         chartOptions:TagValueList - For internal use only. Use default value XYZ. """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(),
@@ -2397,48 +2660,48 @@ class EClient(object):
             VERSION = 6
 
             # send req mkt data msg
-            flds = []
-            flds += [make_field(OUT.REQ_HISTORICAL_DATA), ]
+            msg = OutMessage()
+            msg.addField(OUT.REQ_HISTORICAL_DATA)
 
             if self.serverVersion() < MIN_SERVER_VER_SYNT_REALTIME_BARS:
-                flds += [make_field(VERSION), ]
+                msg.addField(VERSION)
 
-            flds += [make_field(reqId), ]
+            msg.addField(reqId)
 
             # send contract fields
             if self.serverVersion() >= MIN_SERVER_VER_TRADING_CLASS:
-                flds += [make_field(contract.conId), ]
-            flds += [make_field(contract.symbol),
-                     make_field(contract.secType),
-                     make_field(contract.lastTradeDateOrContractMonth),
-                     make_field(contract.strike),
-                     make_field(contract.right),
-                     make_field(contract.multiplier),
-                     make_field(contract.exchange),
-                     make_field(contract.primaryExchange),
-                     make_field(contract.currency),
-                     make_field(contract.localSymbol)]
+                msg.addField(contract.conId)
+            msg.addField(contract.symbol)
+            msg.addField(contract.secType)
+            msg.addField(contract.lastTradeDateOrContractMonth)
+            msg.addField(contract.strike)
+            msg.addField(contract.right)
+            msg.addField(contract.multiplier)
+            msg.addField(contract.exchange)
+            msg.addField(contract.primaryExchange)
+            msg.addField(contract.currency)
+            msg.addField(contract.localSymbol)
             if self.serverVersion() >= MIN_SERVER_VER_TRADING_CLASS:
-                flds += [make_field(contract.tradingClass), ]
-            flds += [make_field(contract.includeExpired),  # srv v31 and above
-                     make_field(endDateTime),  # srv v20 and above
-                     make_field(barSizeSetting),  # srv v20 and above
-                     make_field(durationStr),
-                     make_field(useRTH),
-                     make_field(whatToShow),
-                     make_field(formatDate)]  # srv v16 and above
+                msg.addField(contract.tradingClass)
+            msg.addField(contract.includeExpired)  # srv v31 and above
+            msg.addField(endDateTime)  # srv v20 and above
+            msg.addField(barSizeSetting)  # srv v20 and above
+            msg.addField(durationStr)
+            msg.addField(useRTH)
+            msg.addField(whatToShow)
+            msg.addField(formatDate)  # srv v16 and above
 
             # Send combo legs for BAG requests
             if contract.secType == "BAG":
-                flds += [make_field(len(contract.comboLegs)), ]
+                msg.addField(len(contract.comboLegs))
                 for comboLeg in contract.comboLegs:
-                    flds += [make_field(comboLeg.conId),
-                             make_field(comboLeg.ratio),
-                             make_field(comboLeg.action),
-                             make_field(comboLeg.exchange)]
+                    msg.addField(comboLeg.conId)
+                    msg.addField(comboLeg.ratio)
+                    msg.addField(comboLeg.action)
+                    msg.addField(comboLeg.exchange)
 
             if self.serverVersion() >= MIN_SERVER_VER_SYNT_REALTIME_BARS:
-                flds += [make_field(keepUpToDate), ]
+                msg.addField(keepUpToDate)
 
             # send chartOptions parameter
             if self.serverVersion() >= MIN_SERVER_VER_LINKING:
@@ -2446,9 +2709,7 @@ class EClient(object):
                 if chartOptions:
                     for tagValue in chartOptions:
                         chartOptionsStr += str(tagValue)
-                flds += [make_field(chartOptionsStr)]
-
-            msg = "".join(flds)
+                msg.addField(chartOptionsStr)
 
         except ClientException as ex:
             self.wrapper.error(reqId, ex.code, ex.msg + ex.text)
@@ -2463,7 +2724,8 @@ class EClient(object):
 
         reqId:TickerId - The ticker ID. Must be a unique value."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2483,7 +2745,8 @@ class EClient(object):
     def reqHeadTimeStamp(self, reqId: TickerId, contract: Contract,
                          whatToShow: str, useRTH: int, formatDate: int):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2526,7 +2789,8 @@ class EClient(object):
 
     def cancelHeadTimeStamp(self, reqId: TickerId):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2547,7 +2811,8 @@ class EClient(object):
     def reqHistogramData(self, tickerId: int, contract: Contract,
                          useRTH: bool, timePeriod: str):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2589,7 +2854,8 @@ class EClient(object):
 
     def cancelHistogramData(self, tickerId: int):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2608,7 +2874,8 @@ class EClient(object):
                            endDateTime: str, numberOfTicks: int, whatToShow: str, useRth: int,
                            ignoreSize: bool, miscOptions: TagValueList):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2665,7 +2932,8 @@ class EClient(object):
     def reqScannerParameters(self):
         """Requests an XML string that describes all possible scanner queries."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2688,7 +2956,8 @@ class EClient(object):
         scannerSubscriptionOptions:TagValueList - For internal use only.
             Use default value XYZ."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2759,7 +3028,8 @@ class EClient(object):
     def cancelScannerSubscription(self, reqId: int):
         """reqId:int - The ticker ID. Must be a unique value."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2805,7 +3075,8 @@ class EClient(object):
                 partially or completely outside.
         realTimeBarOptions:TagValueList - For internal use only. Use default value XYZ."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2866,7 +3137,8 @@ class EClient(object):
 
         reqId:TickerId - The Id that was specified in the call to reqRealTimeBars(). """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(reqId, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2910,7 +3182,8 @@ class EClient(object):
             ReportsFinStatements (financial statements)
             RESC (analyst estimates) """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2968,7 +3241,8 @@ class EClient(object):
 
         reqId:TickerId - The ID of the data request."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -2993,7 +3267,8 @@ class EClient(object):
 
     def reqNewsProviders(self):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3010,7 +3285,8 @@ class EClient(object):
 
     def reqNewsArticle(self, reqId: int, providerCode: str, articleId: str, newsArticleOptions: TagValueList):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3049,7 +3325,8 @@ class EClient(object):
     def reqHistoricalNews(self, reqId: int, conId: int, providerCodes: str,
                           startDateTime: str, endDateTime: str, totalResults: int, historicalNewsOptions: TagValueList):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3099,7 +3376,8 @@ class EClient(object):
         reqId:int - The unique number that will be associated with the
             response """
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3123,7 +3401,8 @@ class EClient(object):
         groupId:int - The ID of the group, currently it is a number from 1 to 7.
             This is the display group subscription request sent by the API to TWS."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3153,7 +3432,8 @@ class EClient(object):
                 Examples: 8314@SMART for IBM SMART; 8314@ARCA for IBM @ARCA.
             combo = if any combo is selected."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3182,7 +3462,8 @@ class EClient(object):
     def unsubscribeFromGroupEvents(self, reqId: int):
         """reqId:int - The requestId specified in subscribeToGroupEvents()."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3205,7 +3486,8 @@ class EClient(object):
         """For IB's internal purpose. Allows to provide means of verification
         between the TWS and third party programs."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3240,7 +3522,8 @@ class EClient(object):
         """For IB's internal purpose. Allows to provide means of verification
         between the TWS and third party programs."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3270,7 +3553,8 @@ class EClient(object):
         """For IB's internal purpose. Allows to provide means of verification
         between the TWS and third party programs."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3306,7 +3590,8 @@ class EClient(object):
         """For IB's internal purpose. Allows to provide means of verification
         between the TWS and third party programs."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3343,7 +3628,8 @@ class EClient(object):
         i.e. STK underlyingConId the contract ID of the underlying security.
         Response comes via EWrapper.securityDefinitionOptionParameter()"""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3377,7 +3663,8 @@ class EClient(object):
         registered professional advisors and hedge and mutual funds who have
         configured Soft Dollar Tiers in Account Management."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3390,7 +3677,8 @@ class EClient(object):
 
     def reqFamilyCodes(self):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3407,7 +3695,8 @@ class EClient(object):
 
     def reqMatchingSymbols(self, reqId: int, pattern: str):
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -3436,7 +3725,8 @@ class EClient(object):
         Each completed order will be fed back through the
         completedOrder() function on the EWrapper."""
 
-        self.logRequest(current_fn_name(), vars())
+        if HOT_PATH_LOGGING:
+            self.logRequest(current_fn_name(), vars())
 
         if not self.isConnected():
             self.wrapper.error(NO_VALID_ID, NOT_CONNECTED.code(), NOT_CONNECTED.msg())
@@ -0,0 +1,66 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+"""
+Columnar decoding of the repeated groups of the historical data and
+historical ticks msgs: each column of the rows is converted in one go into
+a field of a NumPy structured array, without creating one object per row.
+NumPy is an optional dependency, only needed (and only imported, as it
+takes a while) when this mode is used.
+"""
+
+import importlib.util
+
+
+# found without being imported
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+# (name, dtype) of the decoded columns, in the order of the DecodePlan rows;
+# the dtype of the str columns is sized on the longest value
+BAR_COLUMNS = (("date", "U"), ("open", "f8"), ("high", "f8"), ("low", "f8"),
+               ("close", "f8"), ("volume", "i8"), ("average", "f8"), ("barCount", "i8"))
+
+TICK_COLUMNS = (("time", "i8"), ("price", "f8"), ("size", "i8"))
+
+TICK_BID_ASK_COLUMNS = (("time", "i8"), ("mask", "i4"), ("priceBid", "f8"),
+                        ("priceAsk", "f8"), ("sizeBid", "i8"), ("sizeAsk", "i8"))
+
+TICK_LAST_COLUMNS = (("time", "i8"), ("mask", "i4"), ("price", "f8"), ("size", "i8"),
+                     ("exchange", "U"), ("specialConditions", "U"))
+
+
+def check_numpy(what="decode the historical data in columns"):
+    """ imports and returns numpy """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is needed to " + what) from None
+    return numpy
+
+
+def decode_array_column(column, dtype, safe):
+    import numpy
+    try:
+        return numpy.array(column, dtype="S").astype(dtype)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        # empty fields, non ascii text, ...: go through the regular converter
+        return numpy.array(list(map(safe, column)), dtype=dtype)
+
+
+def to_structured_array(rowColumns, columns):
+    """ rowColumns: as returned by DecodePlan.rowColumns()
+    columns: (name, dtype) of each of the rowColumns """
+    import numpy
+    arrays = [decode_array_column(column, dtype, safe)
+              for ((column, _, safe), (_, dtype)) in zip(rowColumns, columns)]
+    nRows = len(rowColumns[0][0]) if rowColumns else 0
+
+    result = numpy.empty(nRows, dtype=[(name, array.dtype)
+                                        for ((name, _), array) in zip(columns, arrays)])
+    for ((name, _), array) in zip(columns, arrays):
+        result[name] = array
+
+    return result
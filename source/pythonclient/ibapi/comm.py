@@ -14,6 +14,7 @@ import sys
 from ibapi.common import UNSET_INTEGER, UNSET_DOUBLE
 from ibapi.utils import ClientException
 from ibapi.utils import isAsciiPrintable
+from ibapi.utils import HOT_PATH_LOGGING
 from ibapi.errors import INVALID_SYMBOL
 
 logger = logging.getLogger(__name__)
@@ -57,13 +58,91 @@ def make_field_handle_empty(val) -> str:
     return make_field(val)
 
 
+# pre-encoded fields: the msg ids and versions (small ints) and the usual
+# exchanges/currencies/sec types etc are encoded once and for all, other
+# short strings (symbols, ...) are added on the fly up to FIELD_CACHE_SIZE
+FIELD_CACHE_SIZE = 4096
+FIELD_CACHE_MAX_STR_LEN = 16
+COMMON_STR_FIELDS = ("", "0", "SMART", "IDEALPRO", "NYSE", "NASDAQ", "ISLAND",
+                     "ARCA", "BATS", "GLOBEX", "CME", "CBOE", "EUREX", "SEHK",
+                     "USD", "EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "HKD",
+                     "STK", "OPT", "FUT", "FOP", "CASH", "IND", "CFD", "BOND",
+                     "BAG", "WAR", "CMDTY", "CRYPTO", "C", "P", "BUY", "SELL",
+                     "SSHORT", "MKT", "LMT", "STP", "STP LMT", "MOC", "LOC",
+                     "REL", "TRAIL", "PEG MID", "DAY", "GTC", "IOC", "GTD",
+                     "OPG", "TRADES", "MIDPOINT", "BID", "ASK", "BID_ASK")
+
+# no 0.0: -0.0 is an equal key and has to be sent as "-0.0"
+_encoded_fields = {}
+for _val in range(-1, 256):
+    _encoded_fields[(int, _val)] = make_field(_val).encode()
+for _val in (False, True, UNSET_INTEGER, UNSET_DOUBLE) + COMMON_STR_FIELDS:
+    _encoded_fields[(type(_val), _val)] = make_field(_val).encode()
+del _val
+
+
+def encode_field(val) -> bytes:
+    """ same as make_field() but returns the encoded field, looked up in
+    the pre-encoded fields cache first """
+
+    key = (type(val), val)
+    field = _encoded_fields.get(key)
+    if field is None:
+        field = make_field(val).encode()
+        if type(val) is str and len(val) <= FIELD_CACHE_MAX_STR_LEN \
+                and len(_encoded_fields) < FIELD_CACHE_SIZE:
+            _encoded_fields[key] = field
+
+    return field
+
+
+class OutMessage:
+    """ builds a request msg straight into a bytearray: the fields are
+    appended already encoded after a placeholder for the size prefix,
+    which is filled in place by toBytes() """
+
+    __slots__ = ("buf", )
+
+    def __init__(self):
+        self.buf = bytearray(4)
+
+    def reset(self):
+        """ drops the fields so the msg (and its buffer) can be reused """
+        del self.buf[4:]
+
+    def addField(self, val):
+        field = _encoded_fields.get((type(val), val))
+        if field is None:
+            field = encode_field(val)
+        self.buf += field
+
+    def addFieldHandleEmpty(self, val):
+        if val is None:
+            raise ValueError("Cannot send None to TWS")
+
+        if UNSET_INTEGER == val or UNSET_DOUBLE == val:
+            val = ""
+
+        self.buf += encode_field(val)
+
+    def addRawFields(self, text: str):
+        """ for the fields already built with make_field() """
+        self.buf += text.encode()
+
+    def toBytes(self) -> bytes:
+        """ fills the size prefix and returns the complete msg """
+        struct.pack_into("!I", self.buf, 0, len(self.buf) - 4)
+        return bytes(self.buf)
+
+
 def read_msg(buf: bytes) -> tuple:
     """ first the size prefix and then the corresponding msg payload """
 
     if len(buf) < 4:
         return (0, "", buf)
     size = struct.unpack("!I", buf[0:4])[0]
-    logger.debug("read_msg: size: %d", size)
+    if HOT_PATH_LOGGING:
+        logger.debug("read_msg: size: %d", size)
     if len(buf) - 4 >= size:
         text = struct.unpack("!%ds" % size, buf[4:4 + size])[0]
         return (size, text, buf[4 + size:])
@@ -71,11 +150,46 @@ def read_msg(buf: bytes) -> tuple:
         return (size, "", buf)
 
 
-def read_fields(buf: bytes) -> tuple:
+def read_msgs_from(buf, start: int, end: int) -> tuple:
+    """ extracts all the complete msgs found in buf[start:end] without
+    slicing the remainder; buf is expected to be a memoryview over a
+    (reusable) bytearray. Returns the msgs and the offset of the first
+    unconsumed byte """
+
+    msgs = []
+    while end - start >= 4:
+        size = struct.unpack_from("!I", buf, start)[0]
+        if end - start - 4 < size:
+            break
+        start += 4
+        msgs.append(bytes(buf[start:start + size]))
+        start += size
+
+    return (msgs, start)
+
+
+def read_fields(buf: bytes) -> list:
+    """ msg payload is made of fields terminated/separated by NULL chars.
+    Returns a list of bytes (it used to be a tuple): the empty last field is
+    dropped in place instead of copying the others into a tuple """
+
     if isinstance(buf, str):
         buf = buf.encode()
 
-    """ msg payload is made of fields terminated/separated by NULL chars """
     fields = buf.split(b"\0")
+    del fields[-1]  # last one is empty; dropped in place rather than copying the rest
+
+    return fields
+
+
+def read_fields_batch(msgs) -> list:
+    """ same as read_fields() for a whole batch of msgs at once, returns the
+    list of fields of each msg. The fields stay bytes: they are only turned
+    into str/int/float by the Decoder for the fields it actually consumes. """
+
+    batch = [(msg.encode() if isinstance(msg, str) else msg).split(b"\0")
+             for msg in msgs]
+    for fields in batch:
+        del fields[-1]
 
-    return tuple(fields[0:-1])  # last one is empty; this may slow dow things though, TODO
+    return batch
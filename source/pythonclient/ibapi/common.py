@@ -44,7 +44,15 @@ ListOfHistoricalTickBidAsk = list
 ListOfHistoricalTickLast = list
 
 
+"""
+The value types created for each tick/bar have __slots__: no per instance
+dict, thus less memory and faster attribute access, but no ad hoc attributes.
+"""
+
+
 class BarData(Object):
+    __slots__ = ("date", "open", "high", "low", "close", "volume", "barCount", "average")
+
     def __init__(self):
         self.date = ""
         self.open = 0.
@@ -62,6 +70,8 @@ class BarData(Object):
 
 
 class RealTimeBar(Object):
+    __slots__ = ("time", "endTime", "open_", "high", "low", "close", "volume", "wap", "count")
+
     def __init__(self, time=0, endTime=-1, open_=0., high=0., low=0., close=0., volume=0., wap=0., count=0):
         self.time = time
         self.endTime = endTime
@@ -125,6 +135,8 @@ class SmartComponent(Object):
 
 
 class TickAttrib(Object):
+    __slots__ = ("canAutoExecute", "pastLimit", "preOpen")
+
     def __init__(self):
         self.canAutoExecute = False
         self.pastLimit = False
@@ -135,6 +147,8 @@ class TickAttrib(Object):
 
 
 class TickAttribBidAsk(Object):
+    __slots__ = ("bidPastLow", "askPastHigh")
+
     def __init__(self):
         self.bidPastLow = False
         self.askPastHigh = False
@@ -144,6 +158,8 @@ class TickAttribBidAsk(Object):
 
 
 class TickAttribLast(Object):
+    __slots__ = ("pastLimit", "unreported")
+
     def __init__(self):
         self.pastLimit = False
         self.unreported = False
@@ -171,6 +187,8 @@ class PriceIncrement(Object):
 
 
 class HistoricalTick(Object):
+    __slots__ = ("time", "price", "size")
+
     def __init__(self):
         self.time = 0
         self.price = 0.
@@ -181,6 +199,8 @@ class HistoricalTick(Object):
 
 
 class HistoricalTickBidAsk(Object):
+    __slots__ = ("time", "tickAttribBidAsk", "priceBid", "priceAsk", "sizeBid", "sizeAsk")
+
     def __init__(self):
         self.time = 0
         self.tickAttribBidAsk = TickAttribBidAsk()
@@ -195,6 +215,8 @@ class HistoricalTickBidAsk(Object):
 
 
 class HistoricalTickLast(Object):
+    __slots__ = ("time", "tickAttribLast", "price", "size", "exchange", "specialConditions")
+
     def __init__(self):
         self.time = 0
         self.tickAttribLast = TickAttribLast()
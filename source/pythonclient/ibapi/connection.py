@@ -11,29 +11,80 @@ It allows us to keep some other info along with it.
 
 
 import socket
+import selectors
 import threading
 import logging
+import time
 
 from ibapi.common import * # @UnusedWildImport
 from ibapi.errors import * # @UnusedWildImport
+from ibapi.utils import HOT_PATH_LOGGING
 
 
 #TODO: support SSL !!
 
 logger = logging.getLogger(__name__)
 
+# max number of buffers per sendmsg() call (IOV_MAX on Linux)
+MAX_IOV = 1024
+# no sendmsg() on Windows
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
+
+class SocketOptions(Object):
+    """ socket tuning, 0 (or None for noDelay) leaves the OS default:
+    rcvBuf/sndBuf - SO_RCVBUF/SO_SNDBUF sizes in bytes
+    noDelay - TCP_NODELAY, ie: disables Nagle's algorithm
+    readSize - how much is asked for per recv() call """
+
+    def __init__(self, rcvBuf=0, sndBuf=0, noDelay=None, readSize=4096):
+        self.rcvBuf = rcvBuf
+        self.sndBuf = sndBuf
+        self.noDelay = noDelay
+        self.readSize = readSize
+
+    def apply(self, sock):
+        """ must be called before connecting for the buffer sizes to be
+        taken into account by the TCP window negotiation """
+        if self.rcvBuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvBuf)
+        if self.sndBuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndBuf)
+        if self.noDelay is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.noDelay))
+
+    def __str__(self):
+        return "RcvBuf: %d, SndBuf: %d, NoDelay: %s, ReadSize: %d" % (
+            self.rcvBuf, self.sndBuf, self.noDelay, self.readSize)
+
 
 class Connection:
-    def __init__(self, host, port):
+    def __init__(self, host, port, socketOptions=None, eventDriven=False):
         self.host = host
         self.port = port
         self.socket = None
         self.wrapper = None
         self.lock = threading.Lock()
+        self.socketOptions = socketOptions or SocketOptions()
+        # reused by all the recv() calls of _recvAllMsg()
+        self.recvBuf = bytearray(self.socketOptions.readSize)
+        self.recvView = memoryview(self.recvBuf)
+        # in event driven mode the reads wait on a selector, which
+        # disconnect() wakes up through a socket pair, instead of polling
+        # with the 1s socket timeout
+        self.eventDriven = eventDriven
+        self.selector = None
+        self.wakeupRecv = None
+        self.wakeupSend = None
+        # when True recvTime is the time.monotonic_ns() of the last read
+        # (see latency)
+        self.timestamps = False
+        self.recvTime = 0
 
     def connect(self):
         try:
             self.socket = socket.socket()
+            self.socketOptions.apply(self.socket)
         #TODO: list the exceptions you want to catch
         except socket.error:
             if self.wrapper:
@@ -47,13 +98,25 @@ class Connection:
 
         self.socket.settimeout(1)   #non-blocking
 
+        if self.eventDriven and self.socket is not None:
+            (self.wakeupRecv, self.wakeupSend) = socket.socketpair()
+            self.wakeupRecv.setblocking(False)
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.socket, selectors.EVENT_READ)
+            self.selector.register(self.wakeupRecv, selectors.EVENT_READ)
+
     def disconnect(self):
         self.lock.acquire()
         try:
             if self.socket is not None:
                 logger.debug("disconnecting")
+                if self.selector is not None:
+                    self.selector.unregister(self.socket)
                 self.socket.close()
                 self.socket = None
+                if self.wakeupSend is not None:
+                    # the reader is blocked in waitForData()
+                    self.wakeupSend.send(b"\0")
                 logger.debug("disconnected")
                 if self.wrapper:
                     self.wrapper.connectionClosed()
@@ -64,40 +127,121 @@ class Connection:
         return self.socket is not None
 
     def sendMsg(self, msg):
-        logger.debug("acquiring lock")
+        if HOT_PATH_LOGGING:
+            logger.debug("acquiring lock")
         self.lock.acquire()
-        logger.debug("acquired lock")
+        if HOT_PATH_LOGGING:
+            logger.debug("acquired lock")
         if not self.isConnected():
             logger.debug("sendMsg attempted while not connected, releasing lock")
             self.lock.release()
             return 0
         try:
-            nSent = self.socket.send(msg)
+            # send() may write only part of the msg when the socket buffer is full
+            self.socket.sendall(msg)
+            nSent = len(msg)
         except socket.error:
             logger.debug("exception from sendMsg %s", sys.exc_info())
             raise
         finally:
-            logger.debug("releasing lock")
+            if HOT_PATH_LOGGING:
+                logger.debug("releasing lock")
+            self.lock.release()
+            if HOT_PATH_LOGGING:
+                logger.debug("release lock")
+
+        if HOT_PATH_LOGGING:
+            logger.debug("sendMsg: sent: %d", nSent)
+
+        return nSent
+
+    def sendMsgs(self, msgs):
+        """ sends the given (framed) msgs with as few sendmsg() calls as
+        possible, ie: one per MAX_IOV msgs when the socket buffer has room,
+        and makes sure they are fully written; returns the number of bytes
+        sent. Without sendmsg() the msgs are joined and sent with sendall(). """
+        self.lock.acquire()
+        if not self.isConnected():
+            logger.debug("sendMsgs attempted while not connected, releasing lock")
+            self.lock.release()
+            return 0
+        try:
+            nSent = 0
+            pending = list(msgs)
+            if not HAS_SENDMSG:
+                data = b"".join(pending)
+                self.socket.sendall(data)
+                nSent = len(data)
+                pending = None
+            while pending:
+                n = self.socket.sendmsg(pending[:MAX_IOV])
+                nSent += n
+                # drop what was written, a msg may have been written partially
+                idx = 0
+                while idx < len(pending) and n >= len(pending[idx]):
+                    n -= len(pending[idx])
+                    idx += 1
+                del pending[:idx]
+                if n > 0:
+                    pending[0] = memoryview(pending[0])[n:]
+        except socket.error:
+            logger.debug("exception from sendMsgs %s", sys.exc_info())
+            raise
+        finally:
             self.lock.release()
-            logger.debug("release lock")
 
-        logger.debug("sendMsg: sent: %d", nSent)
+        if HOT_PATH_LOGGING:
+            logger.debug("sendMsgs: %d msgs, sent: %d", len(msgs), nSent)
 
         return nSent
 
+    def waitForData(self):
+        """ event driven mode: blocks until the socket is readable, returns
+        False when woken up by disconnect() """
+        self.selector.select()
+        if self.isConnected():
+            return True
+
+        self.close()
+        return False
+
+    def close(self):
+        """ event driven mode: releases the selector and the wakeup socket
+        pair, to be called by the reader (the only one using them) once it
+        is done, whichever side closed the connection """
+        self.lock.acquire()
+        try:
+            if self.selector is not None:
+                self.selector.close()
+                self.wakeupRecv.close()
+                self.wakeupSend.close()
+                self.selector = self.wakeupRecv = self.wakeupSend = None
+        finally:
+            self.lock.release()
+
+    def hasData(self):
+        """ event driven mode: tells whether the socket can be read right
+        away, without waiting """
+        return any(key.fileobj is self.socket for (key, _) in self.selector.select(0))
+
     def recvMsg(self):
         if not self.isConnected():
             logger.debug("recvMsg attempted while not connected, releasing lock")
             return b""
+        if self.selector is not None and not self.waitForData():
+            return b""
         try:
             buf = self._recvAllMsg()
+            if self.timestamps:
+                self.recvTime = time.monotonic_ns()
             # receiving 0 bytes outside a timeout means the connection is either
             # closed or broken
             if len(buf) == 0:
                 logger.debug("socket either closed or broken, disconnecting")
                 self.disconnect()
         except socket.timeout:
-            logger.debug("socket timeout from recvMsg %s", sys.exc_info())
+            if HOT_PATH_LOGGING:
+                logger.debug("socket timeout from recvMsg %s", sys.exc_info())
             buf = b""
         except socket.error:
             logger.debug("socket broken, disconnecting")
@@ -106,17 +250,51 @@ class Connection:
 
         return buf
 
+    def recvMsgInto(self, buf):
+        """ same as recvMsg() but reads straight into the writable buffer
+        buf (eg: a memoryview over a bytearray); returns the number of
+        bytes read """
+        if not self.isConnected():
+            logger.debug("recvMsgInto attempted while not connected")
+            return 0
+        if self.selector is not None and not self.waitForData():
+            return 0
+        try:
+            nRecvd = self.socket.recv_into(buf)
+            if self.timestamps:
+                self.recvTime = time.monotonic_ns()
+            # receiving 0 bytes outside a timeout means the connection is either
+            # closed or broken
+            if nRecvd == 0:
+                logger.debug("socket either closed or broken, disconnecting")
+                self.disconnect()
+        except socket.timeout:
+            if HOT_PATH_LOGGING:
+                logger.debug("socket timeout from recvMsgInto %s", sys.exc_info())
+            nRecvd = 0
+        except socket.error:
+            logger.debug("socket broken, disconnecting")
+            self.disconnect()
+            nRecvd = 0
+
+        return nRecvd
+
     def _recvAllMsg(self):
         cont = True
-        allbuf = b""
+        allbuf = bytearray()
+        readSize = len(self.recvBuf)
 
         while cont and self.isConnected():
-            buf = self.socket.recv(4096)
-            allbuf += buf
-            logger.debug("len %d raw:%s|", len(buf), buf)
+            nRecvd = self.socket.recv_into(self.recvView)
+            allbuf += self.recvView[:nRecvd]
+            if HOT_PATH_LOGGING:
+                logger.debug("len %d raw:%s|", nRecvd, self.recvBuf[:nRecvd])
 
-            if len(buf) < 4096:
+            if nRecvd < readSize:
+                cont = False
+            elif self.selector is not None and not self.hasData():
+                # exactly readSize bytes were pending
                 cont = False
 
-        return allbuf
+        return bytes(allbuf)
 
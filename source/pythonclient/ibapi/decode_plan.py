@@ -0,0 +1,94 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+"""
+A DecodePlan is the layout of one incoming msg, for one server version,
+compiled to a flat list of (field index, converter) pairs. It decodes a msg
+by indexing the already split fields instead of going through decode() one
+field at a time.
+Msgs with a repeated group (eg: the bars of the historical data) are
+described by:
+ - head: the fields before the group, the last one is the number of rows
+ - row: the fields of one row
+ - tail: the fields after the group
+Use None as type for the fields to skip.
+"""
+
+import operator
+
+from ibapi.object_implem import Object
+from ibapi.utils import (BadMessage, FIELD_CONVERTERS)
+
+
+"""
+For the columns of the repeated groups the builtin conversion is tried
+first on the whole column, the slower converter is only used when some
+field is empty or already a str.
+"""
+FAST_CONVERTERS = {
+    str: operator.methodcaller("decode", errors="backslashreplace"),
+    int: int,
+    float: float,
+}
+
+
+def compile_fields(types) -> tuple:
+    return tuple((idx, FAST_CONVERTERS.get(the_type, FIELD_CONVERTERS[the_type]),
+                  FIELD_CONVERTERS[the_type])
+                 for (idx, the_type) in enumerate(types) if the_type is not None)
+
+
+def decode_column(column, fast, safe) -> list:
+    try:
+        return list(map(fast, column))
+    except (ValueError, TypeError, AttributeError):
+        return list(map(safe, column))
+
+
+class DecodePlan(Object):
+    def __init__(self, head, row=(), tail=()):
+        self.head = compile_fields(head)
+        self.headLen = len(head)
+        self.row = compile_fields(row)
+        self.rowLen = len(row)
+        self.tail = compile_fields(tail)
+        self.tailLen = len(tail)
+
+    def __str__(self):
+        return "HeadLen: %d, RowLen: %d, TailLen: %d" % (self.headLen,
+            self.rowLen, self.tailLen)
+
+    def decode(self, fields) -> list:
+        """ decodes the head fields only """
+        if len(fields) < self.headLen:
+            raise BadMessage("no more fields")
+
+        return [safe(fields[idx]) for (idx, _, safe) in self.head]
+
+    def decodeRows(self, fields) -> tuple:
+        """ decodes the whole msg, returns the head values, the list of
+        rows (tuples of values) and the tail values """
+        head = self.decode(fields)
+        nRows = head[-1]
+        columns = [decode_column(column, fast, safe)
+                   for (column, fast, safe) in self.rowColumns(fields, nRows)]
+        rows = list(zip(*columns)) if nRows > 0 else []
+
+        return (head, rows, self.decodeTail(fields, nRows))
+
+    def rowColumns(self, fields, nRows) -> list:
+        """ the raw fields of each (not skipped) column of the rows, along
+        with the converters of the column """
+        start = self.headLen
+        end = start + nRows * self.rowLen
+        if nRows < 0 or len(fields) < end + self.tailLen:
+            raise BadMessage("no more fields")
+
+        return [(fields[start + idx:end:self.rowLen], fast, safe)
+                for (idx, fast, safe) in self.row]
+
+    def decodeTail(self, fields, nRows) -> list:
+        end = self.headLen + nRows * self.rowLen
+        return [safe(fields[end + idx]) for (idx, _, safe) in self.tail]
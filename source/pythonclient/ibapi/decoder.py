@@ -10,6 +10,8 @@ It will call the corresponding method from the EWrapper so that customer's code
 (eg: class derived from EWrapper) can make further use of the data.
 """
 
+import collections
+
 from ibapi.message import IN
 from ibapi.wrapper import *  # @UnusedWildImport
 from ibapi.contract import ContractDescription
@@ -22,15 +24,31 @@ from ibapi.scanner import ScanData
 from ibapi.errors import BAD_MESSAGE
 from ibapi.common import *  # @UnusedWildImport
 from ibapi.orderdecoder import OrderDecoder
+from ibapi.decode_plan import DecodePlan
+from ibapi import columnar
+from ibapi.executor import ShardedWrapper
+from ibapi.latency import TimedWrapper
 
 logger = logging.getLogger(__name__)
 
 
+def makeStrConverter(encoding):
+    def strConverter(field):
+        try:
+            return field.decode(encoding)
+        except UnicodeDecodeError:
+            return field.decode('latin-1')
+    return strConverter
+
+
 class HandleInfo(Object):
-    def __init__(self, wrap=None, proc=None):
+    """ plan: when given, returns the DecodePlan of the msg for the
+    decoder's server version and proc gets the fields tuple, not an iterator """
+    def __init__(self, wrap=None, proc=None, plan=None):
         self.wrapperMeth = wrap
         self.wrapperParams = None
         self.processMeth = proc
+        self.planMeth = plan
         if wrap is None and proc is None:
             raise ValueError("both wrap and proc can't be None")
 
@@ -40,21 +58,231 @@ class HandleInfo(Object):
         return s
 
 
+def code_names(code) -> set:
+    """ the attribute/global names used by code and its nested functions """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= code_names(const)
+    return names
+
+
+def overrides(obj, name) -> bool:
+    """ tells whether obj has its own version of the EWrapper method name """
+    return name in getattr(obj, "__dict__", {}) \
+        or getattr(type(obj), name, None) not in (None, getattr(EWrapper, name))
+
+
+# names of the 1st arg of the EWrapper methods which are routed to the
+# handler registered for that id, if any
+ROUTED_PARAMS = ("reqId", "requestId", "tickerId")
+
+
+class HandlerRoute(Object):
+    """ the EWrapper methods for the msgs of one reqId: the methods the
+    handler has, the ones of the wrapper for the others. Resolved once at
+    registration so that routing a msg costs a dict lookup. """
+
+    def __init__(self, handler, wrapper):
+        self.handler = handler
+        for (name, _) in inspect.getmembers(EWrapper, inspect.isfunction):
+            if not name.startswith("_"):
+                setattr(self, name, getattr(handler if overrides(handler, name) else wrapper, name))
+
+
 class Decoder(Object):
+    # (msgId, serverVersion) -> DecodePlan, shared by all the decoders
+    planCache = {}
+    # msgId -> names of the EWrapper methods its processing may call,
+    # shared by all the decoders (see discoverCallbacks())
+    msgCallbacks = None
+    # processed whether the application handles them or not
+    ALWAYS_PROCESSED = frozenset((IN.ERR_MSG, ))
+
     def __init__(self, wrapper, serverVersion):
         self.wrapper = wrapper
         self.serverVersion = serverVersion
+        self.plans = {}
+        self.dispatchTable = {}
+        # historical bars and ticks decoded in NumPy arrays (see columnar)
+        self.columnar = False
+        # reqId -> HandlerRoute (see registerHandler)
+        self.handlers = {}
+        # runs the callbacks on worker threads when set (see setExecutor)
+        self.executor = None
+        # stamped around the callbacks when set (see setLatencyMonitor)
+        self.latencyMonitor = None
+        # the profiling.DecoderProfiler standing in for the wrapper, if started
+        self.profiler = None
+        # msgs dropped right after reading their msgId (see setSkipUnhandled)
+        self.skippedMsgIds = frozenset()
+        self.nSkipped = collections.Counter()
         self.discoverParams()
+        self.compilePlans()
+        self.compileDispatchTable()
 
-    def processTickPriceMsg(self, fields):
-        next(fields)
-        decode(int, fields)
+    def setServerVersion(self, serverVersion):
+        """To be called once the server version is known (and only then
+        are the decode plans and the dispatch table available)."""
+        self.serverVersion = serverVersion
+        self.compilePlans()
+        self.compileDispatchTable()
+
+    def compileDispatchTable(self):
+        """For the msgs mapped directly to a wrapper method: resolves the
+        bound method and the converter of each field once, instead of doing
+        it for each msg in interpretWithSignature()."""
+        self.dispatchTable = {}
+        if self.serverVersion is None:
+            return
 
-        reqId = decode(int, fields)
-        tickType = decode(int, fields)
-        price = decode(float, fields)
-        size = decode(int, fields)  # ver 2 field
-        attrMask = decode(int, fields)  # ver 3 field
+        if self.serverVersion >= MIN_SERVER_VER_ENCODE_MSG_ASCII7:
+            strConverter = makeStrConverter('unicode-escape')
+        else:
+            strConverter = makeStrConverter('UTF-8')
+
+        for (msgId, handleInfo) in self.msgId2handleInfo.items():
+            if handleInfo.wrapperMeth is None or handleInfo.wrapperParams is None:
+                continue
+
+            converters = []
+            for (pname, param) in handleInfo.wrapperParams.items():
+                if pname != "self":
+                    if param.annotation is int:
+                        converters.append(int)
+                    elif param.annotation is float:
+                        converters.append(float)
+                    else:
+                        converters.append(strConverter)
+
+            name = handleInfo.wrapperMeth.__name__
+            method = getattr(self.wrapper, name)
+            # the name is given when the 1st arg can be routed to a handler
+            firstParam = list(handleInfo.wrapperParams)[1:2]
+            routedName = name if firstParam and firstParam[0] in ROUTED_PARAMS else None
+            # bypass msgId and versionId
+            self.dispatchTable[msgId] = (method, tuple(enumerate(converters, 2)),
+                                         len(converters) + 2, routedName)
+
+    def route(self, reqId):
+        """ where the callbacks for reqId go: its handler or the wrapper """
+        return self.handlers.get(reqId, self.wrapper)
+
+    def registerHandler(self, reqId, handler):
+        """The msgs for reqId now call the methods of handler (the ones it
+        has, the wrapper's otherwise) instead of the wrapper's."""
+        names = [name for name in dir(handler) if hasattr(EWrapper, name)
+                 and overrides(handler, name)]
+        if self.executor is not None:
+            handler = ShardedWrapper(handler, self.executor, names)
+        if self.latencyMonitor is not None:
+            handler = TimedWrapper(handler, self.latencyMonitor, names)
+        if self.profiler is not None:
+            self.handlers[reqId] = self.profiler.profiledRoute(handler)
+        else:
+            self.handlers[reqId] = HandlerRoute(handler, self.wrapper)
+        if self.skippedMsgIds:
+            # the msgs the handler handles can't be skipped anymore
+            self.skippedMsgIds = frozenset(
+                msgId for msgId in self.skippedMsgIds
+                if not any(overrides(handler, name) for name in self.discoverCallbacks()[msgId]))
+
+    def unregisterHandler(self, reqId):
+        self.handlers.pop(reqId, None)
+
+    def setExecutor(self, executor):
+        """The callbacks are then submitted to the (CallbackExecutor)
+        executor instead of being called right away. To be called after
+        setSkipUnhandled() and before setServerVersion()."""
+        self.checkNotProfiled("setExecutor")
+        self.executor = executor
+        self.wrapper = ShardedWrapper(self.wrapper, executor)
+
+    def setLatencyMonitor(self, monitor):
+        """The (LatencyMonitor) monitor is then stamped around the callbacks.
+        To be called after setExecutor() (the time to submit the callbacks
+        is then measured) and before setServerVersion()."""
+        self.checkNotProfiled("setLatencyMonitor")
+        self.latencyMonitor = monitor
+        self.wrapper = TimedWrapper(self.wrapper, monitor)
+
+    def checkNotProfiled(self, what):
+        # the profiler restores the wrapper it replaced when stopped, which
+        # would drop what is wrapped around it meanwhile
+        if self.profiler is not None:
+            raise RuntimeError("%s() while the decoder is profiled, stop the profiler first"
+                               % what)
+
+    def setSkipUnhandled(self, skipUnhandled: bool):
+        """When True the msgs whose EWrapper callbacks are not overridden by
+        the wrapper are dropped (and counted in nSkipped) without being
+        decoded, instead of ending up in the logging default callbacks. The
+        errors are always processed."""
+        if not skipUnhandled:
+            self.skippedMsgIds = frozenset()
+            return
+
+        skipped = []
+        for (msgId, callbacks) in self.discoverCallbacks().items():
+            # no callback found: the msg is processed to be on the safe side
+            if callbacks and msgId not in self.ALWAYS_PROCESSED \
+                    and not any(overrides(self.wrapper, name) for name in callbacks):
+                skipped.append(msgId)
+        self.skippedMsgIds = frozenset(skipped)
+        logger.debug("skipping msgs %s", sorted(self.skippedMsgIds))
+
+    @classmethod
+    def discoverCallbacks(cls) -> dict:
+        """Finds the EWrapper methods each msg may call: the wrapped method
+        or the ones named in the process method (and in the Decoder methods
+        it calls)."""
+        if cls.msgCallbacks is not None:
+            return cls.msgCallbacks
+
+        wrapperNames = {name for (name, _) in inspect.getmembers(EWrapper, inspect.isfunction)
+                        if not name.startswith("_")}
+        decoderNames = {name for (name, _) in inspect.getmembers(cls, inspect.isfunction)}
+
+        msgCallbacks = {}
+        for (msgId, handleInfo) in cls.msgId2handleInfo.items():
+            if handleInfo.wrapperMeth is not None:
+                msgCallbacks[msgId] = frozenset((handleInfo.wrapperMeth.__name__, ))
+                continue
+
+            names = set()
+            seen = set()
+            todo = [handleInfo.processMeth]
+            while todo:
+                meth = todo.pop()
+                seen.add(meth.__name__)
+                used = code_names(meth.__code__)
+                names |= used & wrapperNames
+                todo += [getattr(cls, name) for name in (used & decoderNames) - seen]
+            msgCallbacks[msgId] = frozenset(names)
+
+        cls.msgCallbacks = msgCallbacks
+        return msgCallbacks
+
+    def compilePlans(self):
+        self.plans = {}
+        if self.serverVersion is None:
+            return
+
+        for (msgId, handleInfo) in self.msgId2handleInfo.items():
+            if handleInfo.planMeth is not None:
+                key = (msgId, self.serverVersion)
+                plan = Decoder.planCache.get(key, None)
+                if plan is None:
+                    plan = handleInfo.planMeth(self)
+                    Decoder.planCache[key] = plan
+                self.plans[msgId] = plan
+
+    def tickPricePlan(self):
+        # msgId, version, reqId, tickType, price, size (ver 2), attrMask (ver 3)
+        return DecodePlan((None, None, int, int, float, int, int))
+
+    def processTickPriceMsg(self, fields):
+        (reqId, tickType, price, size, attrMask) = self.plans[IN.TICK_PRICE].decode(fields)
 
         attrib = TickAttrib()
 
@@ -66,7 +294,7 @@ class Decoder(Object):
             if self.serverVersion >= MIN_SERVER_VER_PRE_OPEN_BID_ASK:
                 attrib.preOpen = attrMask & 4 != 0
 
-        self.wrapper.tickPrice(reqId, tickType, price, attrib)
+        self.route(reqId).tickPrice(reqId, tickType, price, attrib)
 
         # process ver 2 fields
         sizeTickType = TickTypeEnum.NOT_SET
@@ -84,41 +312,34 @@ class Decoder(Object):
             sizeTickType = TickTypeEnum.DELAYED_LAST_SIZE
 
         if sizeTickType != TickTypeEnum.NOT_SET:
-            self.wrapper.tickSize(reqId, sizeTickType, size)
+            self.route(reqId).tickSize(reqId, sizeTickType, size)
 
-    def processOrderStatusMsg(self, fields):
+    def orderStatusPlan(self):
+        if self.serverVersion >= MIN_SERVER_VER_FRACTIONAL_POSITIONS:
+            qty = float
+        else:
+            qty = int
 
-        next(fields)
+        head = [None]
         if self.serverVersion < MIN_SERVER_VER_MARKET_CAP_PRICE:
-            decode(int, fields)
-        orderId = decode(int, fields)
-        status = decode(str, fields)
+            head.append(None)   # version
 
-        if self.serverVersion >= MIN_SERVER_VER_FRACTIONAL_POSITIONS:
-            filled = decode(float, fields)
-        else:
-            filled = decode(int, fields)
+        # orderId, status, filled, remaining, avgFillPrice, permId (ver 2),
+        # parentId (ver 3), lastFillPrice (ver 4), clientId (ver 5), whyHeld (ver 6)
+        head += [int, str, qty, qty, float, int, int, float, int, str]
 
-        if self.serverVersion >= MIN_SERVER_VER_FRACTIONAL_POSITIONS:
-            remaining = decode(float, fields)
-        else:
-            remaining = decode(int, fields)
+        if self.serverVersion >= MIN_SERVER_VER_MARKET_CAP_PRICE:
+            head.append(float)  # mktCapPrice
 
-        avgFillPrice = decode(float, fields)
+        return DecodePlan(head)
 
-        permId = decode(int, fields)  # ver 2 field
-        parentId = decode(int, fields)  # ver 3 field
-        lastFillPrice = decode(float, fields)  # ver 4 field
-        clientId = decode(int, fields)  # ver 5 field
-        whyHeld = decode(str, fields)  # ver 6 field
+    def processOrderStatusMsg(self, fields):
+        args = self.plans[IN.ORDER_STATUS].decode(fields)
 
-        if self.serverVersion >= MIN_SERVER_VER_MARKET_CAP_PRICE:
-            mktCapPrice = decode(float, fields)
-        else:
-            mktCapPrice = None
+        if self.serverVersion < MIN_SERVER_VER_MARKET_CAP_PRICE:
+            args.append(None)   # mktCapPrice
 
-        self.wrapper.orderStatus(orderId, status, filled, remaining,
-                                 avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice)
+        self.wrapper.orderStatus(*args)
 
     def processOpenOrder(self, fields):
 
@@ -322,7 +543,7 @@ class Decoder(Object):
         if self.serverVersion >= MIN_SERVER_VER_STOCK_TYPE:
             contract.stockType = decode(str, fields)
 
-        self.wrapper.contractDetails(reqId, contract)
+        self.route(reqId).contractDetails(reqId, contract)
 
     def processBondContractDataMsg(self, fields):
 
@@ -382,7 +603,7 @@ class Decoder(Object):
         if self.serverVersion >= MIN_SERVER_VER_MARKET_RULES:
             contract.marketRuleIds = decode(str, fields)
 
-        self.wrapper.bondContractDetails(reqId, contract)
+        self.route(reqId).bondContractDetails(reqId, contract)
 
     def processScannerDataMsg(self, fields):
         next(fields)
@@ -411,10 +632,10 @@ class Decoder(Object):
             data.benchmark = decode(str, fields)
             data.projection = decode(str, fields)
             data.legsStr = decode(str, fields)
-            self.wrapper.scannerData(reqId, data.rank, data.contract,
+            self.route(reqId).scannerData(reqId, data.rank, data.contract,
                                      data.distance, data.benchmark, data.projection, data.legsStr)
 
-        self.wrapper.scannerDataEnd(reqId)
+        self.route(reqId).scannerDataEnd(reqId)
 
     def processExecutionDataMsg(self, fields):
         next(fields)
@@ -479,71 +700,77 @@ class Decoder(Object):
         if self.serverVersion >= MIN_SERVER_VER_LAST_LIQUIDITY:
             execution.lastLiquidity = decode(int, fields)
 
-        self.wrapper.execDetails(reqId, contract, execution)
-
-    def processHistoricalDataMsg(self, fields):
-        next(fields)
+        self.route(reqId).execDetails(reqId, contract, execution)
 
+    def historicalDataPlan(self):
+        head = [None]
         if self.serverVersion < MIN_SERVER_VER_SYNT_REALTIME_BARS:
-            decode(int, fields)
+            head.append(None)   # version
 
-        reqId = decode(int, fields)
-        startDateStr = decode(str, fields)  # ver 2 field
-        endDateStr = decode(str, fields)  # ver 2 field
+        # reqId, startDateStr (ver 2), endDateStr (ver 2), itemCount
+        head += [int, str, str, int]
 
-        itemCount = decode(int, fields)
+        # date, open, high, low, close, volume, average
+        row = [str, float, float, float, float, int, float]
+        if self.serverVersion < MIN_SERVER_VER_SYNT_REALTIME_BARS:
+            row.append(None)    # hasGaps
+        row.append(int)     # barCount (ver 3)
 
-        for _ in range(itemCount):
-            bar = BarData()
-            bar.date = decode(str, fields)
-            bar.open = decode(float, fields)
-            bar.high = decode(float, fields)
-            bar.low = decode(float, fields)
-            bar.close = decode(float, fields)
-            bar.volume = decode(int, fields)
-            bar.average = decode(float, fields)
+        return DecodePlan(head, row)
 
-            if self.serverVersion < MIN_SERVER_VER_SYNT_REALTIME_BARS:
-                decode(str, fields)
+    def processHistoricalDataMsg(self, fields):
+        plan = self.plans[IN.HISTORICAL_DATA]
+        if self.columnar:
+            (reqId, startDateStr, endDateStr, itemCount) = plan.decode(fields)
+            bars = columnar.to_structured_array(plan.rowColumns(fields, itemCount),
+                                                columnar.BAR_COLUMNS)
+            self.route(reqId).historicalDataArray(reqId, bars)
+            self.route(reqId).historicalDataEnd(reqId, startDateStr, endDateStr)
+            return
+
+        ((reqId, startDateStr, endDateStr, _), rows, _) = plan.decodeRows(fields)
 
-            bar.barCount = decode(int, fields)  # ver 3 field
+        for (date, open_, high, low, close, volume, average, barCount) in rows:
+            bar = BarData()
+            bar.date = date
+            bar.open = open_
+            bar.high = high
+            bar.low = low
+            bar.close = close
+            bar.volume = volume
+            bar.average = average
+            bar.barCount = barCount
 
-            self.wrapper.historicalData(reqId, bar)
+            self.route(reqId).historicalData(reqId, bar)
 
         # send end of dataset marker
-        self.wrapper.historicalDataEnd(reqId, startDateStr, endDateStr)
+        self.route(reqId).historicalDataEnd(reqId, startDateStr, endDateStr)
+
+    def historicalDataUpdatePlan(self):
+        # msgId, reqId, barCount, date, open, close, high, low, average, volume
+        return DecodePlan((None, int, int, str, float, float, float, float, float, int))
 
     def processHistoricalDataUpdateMsg(self, fields):
-        next(fields)
-        reqId = decode(int, fields)
+        (reqId, barCount, date, open_, close, high, low, average, volume) = \
+            self.plans[IN.HISTORICAL_DATA_UPDATE].decode(fields)
         bar = BarData()
-        bar.barCount = decode(int, fields)
-        bar.date = decode(str, fields)
-        bar.open = decode(float, fields)
-        bar.close = decode(float, fields)
-        bar.high = decode(float, fields)
-        bar.low = decode(float, fields)
-        bar.average = decode(float, fields)
-        bar.volume = decode(int, fields)
-        self.wrapper.historicalDataUpdate(reqId, bar)
+        bar.barCount = barCount
+        bar.date = date
+        bar.open = open_
+        bar.close = close
+        bar.high = high
+        bar.low = low
+        bar.average = average
+        bar.volume = volume
+        self.route(reqId).historicalDataUpdate(reqId, bar)
+
+    def realTimeBarPlan(self):
+        # msgId, version, reqId, time, open, high, low, close, volume, wap, count
+        return DecodePlan((None, None, int, int, float, float, float, float, int, float, int))
 
     def processRealTimeBarMsg(self, fields):
-        next(fields)
-        decode(int, fields)
-        reqId = decode(int, fields)
-
-        bar = RealTimeBar()
-        bar.time = decode(int, fields)
-        bar.open = decode(float, fields)
-        bar.high = decode(float, fields)
-        bar.low = decode(float, fields)
-        bar.close = decode(float, fields)
-        bar.volume = decode(int, fields)
-        bar.wap = decode(float, fields)
-        bar.count = decode(int, fields)
-
-        self.wrapper.realtimeBar(reqId, bar.time, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.wap,
-                                 bar.count)
+        args = self.plans[IN.REAL_TIME_BARS].decode(fields)
+        self.route(args[0]).realtimeBar(*args)
 
     def processTickOptionComputationMsg(self, fields):
         version = self.serverVersion
@@ -600,7 +827,7 @@ class Decoder(Object):
             if undPrice == -1:  # -1 is the "not computed" indicator
                 undPrice = None
 
-        self.wrapper.tickOptionComputation(reqId, tickTypeInt, tickAttrib, impliedVol,
+        self.route(reqId).tickOptionComputation(reqId, tickTypeInt, tickAttrib, impliedVol,
                                            delta, optPrice, pvDividend, gamma, vega, theta, undPrice)
 
     def processDeltaNeutralValidationMsg(self, fields):
@@ -614,7 +841,7 @@ class Decoder(Object):
         deltaNeutralContract.delta = decode(float, fields)
         deltaNeutralContract.price = decode(float, fields)
 
-        self.wrapper.deltaNeutralValidation(reqId, deltaNeutralContract)
+        self.route(reqId).deltaNeutralValidation(reqId, deltaNeutralContract)
 
     def processMarketDataTypeMsg(self, fields):
         next(fields)
@@ -622,7 +849,7 @@ class Decoder(Object):
         reqId = decode(int, fields)
         marketDataType = decode(int, fields)
 
-        self.wrapper.marketDataType(reqId, marketDataType)
+        self.route(reqId).marketDataType(reqId, marketDataType)
 
     def processCommissionReportMsg(self, fields):
         next(fields)
@@ -693,7 +920,7 @@ class Decoder(Object):
         avgCost = decode(float, fields)
         modelCode = decode(str, fields)
 
-        self.wrapper.positionMulti(reqId, account, modelCode, contract, position, avgCost)
+        self.route(reqId).positionMulti(reqId, account, modelCode, contract, position, avgCost)
 
     def processSecurityDefinitionOptionParameterMsg(self, fields):
         next(fields)
@@ -716,14 +943,14 @@ class Decoder(Object):
             strike = decode(float, fields)
             strikes.add(strike)
 
-        self.wrapper.securityDefinitionOptionParameter(reqId, exchange,
+        self.route(reqId).securityDefinitionOptionParameter(reqId, exchange,
                                                        underlyingConId, tradingClass, multiplier, expirations, strikes)
 
     def processSecurityDefinitionOptionParameterEndMsg(self, fields):
         next(fields)
 
         reqId = decode(int, fields)
-        self.wrapper.securityDefinitionOptionParameterEnd(reqId)
+        self.route(reqId).securityDefinitionOptionParameterEnd(reqId)
 
     def processSoftDollarTiersMsg(self, fields):
         next(fields)
@@ -739,7 +966,7 @@ class Decoder(Object):
             tier.displayName = decode(str, fields)
             tiers.append(tier)
 
-        self.wrapper.softDollarTiers(reqId, tiers)
+        self.route(reqId).softDollarTiers(reqId, tiers)
 
     def processFamilyCodesMsg(self, fields):
         next(fields)
@@ -775,7 +1002,7 @@ class Decoder(Object):
                 conDesc.derivativeSecTypes.append(derivSecType)
             contractDescriptions.append(conDesc)
 
-        self.wrapper.symbolSamples(reqId, contractDescriptions)
+        self.route(reqId).symbolSamples(reqId, contractDescriptions)
 
     def processSmartComponents(self, fields):
         next(fields)
@@ -790,7 +1017,7 @@ class Decoder(Object):
             smartComponent.exchangeLetter = decode(str, fields)
             smartComponentMap.append(smartComponent)
 
-        self.wrapper.smartComponents(reqId, smartComponentMap)
+        self.route(reqId).smartComponents(reqId, smartComponentMap)
 
     def processTickReqParams(self, fields):
         next(fields)
@@ -798,7 +1025,7 @@ class Decoder(Object):
         minTick = decode(float, fields)
         bboExchange = decode(str, fields)
         snapshotPermissions = decode(int, fields)
-        self.wrapper.tickReqParams(tickerId, minTick, bboExchange, snapshotPermissions)
+        self.route(tickerId).tickReqParams(tickerId, minTick, bboExchange, snapshotPermissions)
 
     def processMktDepthExchanges(self, fields):
         next(fields)
@@ -824,7 +1051,7 @@ class Decoder(Object):
         next(fields)
         reqId = decode(int, fields)
         headTimestamp = decode(str, fields)
-        self.wrapper.headTimestamp(reqId, headTimestamp)
+        self.route(reqId).headTimestamp(reqId, headTimestamp)
 
     def processTickNews(self, fields):
         next(fields)
@@ -834,7 +1061,7 @@ class Decoder(Object):
         articleId = decode(str, fields)
         headline = decode(str, fields)
         extraData = decode(str, fields)
-        self.wrapper.tickNews(tickerId, timeStamp, providerCode, articleId, headline, extraData)
+        self.route(tickerId).tickNews(tickerId, timeStamp, providerCode, articleId, headline, extraData)
 
     def processNewsProviders(self, fields):
         next(fields)
@@ -854,7 +1081,7 @@ class Decoder(Object):
         reqId = decode(int, fields)
         articleType = decode(int, fields)
         articleText = decode(str, fields)
-        self.wrapper.newsArticle(reqId, articleType, articleText)
+        self.route(reqId).newsArticle(reqId, articleType, articleText)
 
     def processHistoricalNews(self, fields):
         next(fields)
@@ -863,13 +1090,13 @@ class Decoder(Object):
         providerCode = decode(str, fields)
         articleId = decode(str, fields)
         headline = decode(str, fields)
-        self.wrapper.historicalNews(requestId, time, providerCode, articleId, headline)
+        self.route(requestId).historicalNews(requestId, time, providerCode, articleId, headline)
 
     def processHistoricalNewsEnd(self, fields):
         next(fields)
         reqId = decode(int, fields)
         hasMore = decode(bool, fields)
-        self.wrapper.historicalNewsEnd(reqId, hasMore)
+        self.route(reqId).historicalNewsEnd(reqId, hasMore)
 
     def processHistogramData(self, fields):
         next(fields)
@@ -883,7 +1110,7 @@ class Decoder(Object):
             dataPoint.count = decode(int, fields)
             histogram.append(dataPoint)
 
-        self.wrapper.histogramData(reqId, histogram)
+        self.route(reqId).histogramData(reqId, histogram)
 
     def processRerouteMktDataReq(self, fields):
         next(fields)
@@ -891,7 +1118,7 @@ class Decoder(Object):
         conId = decode(int, fields)
         exchange = decode(str, fields)
 
-        self.wrapper.rerouteMktDataReq(reqId, conId, exchange)
+        self.route(reqId).rerouteMktDataReq(reqId, conId, exchange)
 
     def processRerouteMktDepthReq(self, fields):
         next(fields)
@@ -899,7 +1126,7 @@ class Decoder(Object):
         conId = decode(int, fields)
         exchange = decode(str, fields)
 
-        self.wrapper.rerouteMktDepthReq(reqId, conId, exchange)
+        self.route(reqId).rerouteMktDepthReq(reqId, conId, exchange)
 
     def processMarketRuleMsg(self, fields):
         next(fields)
@@ -930,7 +1157,7 @@ class Decoder(Object):
         if self.serverVersion >= MIN_SERVER_VER_REALIZED_PNL:
             realizedPnL = decode(float, fields)
 
-        self.wrapper.pnl(reqId, dailyPnL, unrealizedPnL, realizedPnL)
+        self.route(reqId).pnl(reqId, dailyPnL, unrealizedPnL, realizedPnL)
 
     def processPnLSingleMsg(self, fields):
         next(fields)
@@ -948,76 +1175,101 @@ class Decoder(Object):
 
         value = decode(float, fields)
 
-        self.wrapper.pnlSingle(reqId, pos, dailyPnL, unrealizedPnL, realizedPnL, value)
+        self.route(reqId).pnlSingle(reqId, pos, dailyPnL, unrealizedPnL, realizedPnL, value)
+
+    def historicalTicksPlan(self):
+        # msgId, reqId, tickCount / time, (unused), price, size / done
+        return DecodePlan((None, int, int), (int, None, float, int), (bool, ))
 
     def processHistoricalTicks(self, fields):
-        next(fields)
-        reqId = decode(int, fields)
-        tickCount = decode(int, fields)
+        if self.columnar:
+            (reqId, ticks, done) = self.decodeHistoricalTicksArray(
+                fields, self.plans[IN.HISTORICAL_TICKS], columnar.TICK_COLUMNS)
+            self.route(reqId).historicalTicksArray(reqId, ticks, done)
+            return
+
+        ((reqId, _), rows, (done, )) = self.plans[IN.HISTORICAL_TICKS].decodeRows(fields)
 
         ticks = []
 
-        for _ in range(tickCount):
+        for (time, price, size) in rows:
             historicalTick = HistoricalTick()
-            historicalTick.time = decode(int, fields)
-            next(fields)  # for consistency
-            historicalTick.price = decode(float, fields)
-            historicalTick.size = decode(int, fields)
+            historicalTick.time = time
+            historicalTick.price = price
+            historicalTick.size = size
             ticks.append(historicalTick)
 
-        done = decode(bool, fields)
+        self.route(reqId).historicalTicks(reqId, ticks, done)
 
-        self.wrapper.historicalTicks(reqId, ticks, done)
+    def historicalTicksBidAskPlan(self):
+        # msgId, reqId, tickCount / time, mask, priceBid, priceAsk, sizeBid, sizeAsk / done
+        return DecodePlan((None, int, int), (int, int, float, float, int, int), (bool, ))
 
     def processHistoricalTicksBidAsk(self, fields):
-        next(fields)
-        reqId = decode(int, fields)
-        tickCount = decode(int, fields)
+        if self.columnar:
+            (reqId, ticks, done) = self.decodeHistoricalTicksArray(
+                fields, self.plans[IN.HISTORICAL_TICKS_BID_ASK], columnar.TICK_BID_ASK_COLUMNS)
+            self.route(reqId).historicalTicksBidAskArray(reqId, ticks, done)
+            return
+
+        ((reqId, _), rows, (done, )) = self.plans[IN.HISTORICAL_TICKS_BID_ASK].decodeRows(fields)
 
         ticks = []
 
-        for _ in range(tickCount):
+        for (time, mask, priceBid, priceAsk, sizeBid, sizeAsk) in rows:
             historicalTickBidAsk = HistoricalTickBidAsk()
-            historicalTickBidAsk.time = decode(int, fields)
-            mask = decode(int, fields)
+            historicalTickBidAsk.time = time
             tickAttribBidAsk = TickAttribBidAsk()
             tickAttribBidAsk.askPastHigh = mask & 1 != 0
             tickAttribBidAsk.bidPastLow = mask & 2 != 0
             historicalTickBidAsk.tickAttribBidAsk = tickAttribBidAsk
-            historicalTickBidAsk.priceBid = decode(float, fields)
-            historicalTickBidAsk.priceAsk = decode(float, fields)
-            historicalTickBidAsk.sizeBid = decode(int, fields)
-            historicalTickBidAsk.sizeAsk = decode(int, fields)
+            historicalTickBidAsk.priceBid = priceBid
+            historicalTickBidAsk.priceAsk = priceAsk
+            historicalTickBidAsk.sizeBid = sizeBid
+            historicalTickBidAsk.sizeAsk = sizeAsk
             ticks.append(historicalTickBidAsk)
 
-        done = decode(bool, fields)
+        self.route(reqId).historicalTicksBidAsk(reqId, ticks, done)
 
-        self.wrapper.historicalTicksBidAsk(reqId, ticks, done)
+    def historicalTicksLastPlan(self):
+        # msgId, reqId, tickCount / time, mask, price, size, exchange, specialConditions / done
+        return DecodePlan((None, int, int), (int, int, float, int, str, str), (bool, ))
 
     def processHistoricalTicksLast(self, fields):
-        next(fields)
-        reqId = decode(int, fields)
-        tickCount = decode(int, fields)
+        if self.columnar:
+            (reqId, ticks, done) = self.decodeHistoricalTicksArray(
+                fields, self.plans[IN.HISTORICAL_TICKS_LAST], columnar.TICK_LAST_COLUMNS)
+            self.route(reqId).historicalTicksLastArray(reqId, ticks, done)
+            return
+
+        ((reqId, _), rows, (done, )) = self.plans[IN.HISTORICAL_TICKS_LAST].decodeRows(fields)
 
         ticks = []
 
-        for _ in range(tickCount):
+        for (time, mask, price, size, exchange, specialConditions) in rows:
             historicalTickLast = HistoricalTickLast()
-            historicalTickLast.time = decode(int, fields)
-            mask = decode(int, fields)
+            historicalTickLast.time = time
             tickAttribLast = TickAttribLast()
             tickAttribLast.pastLimit = mask & 1 != 0
             tickAttribLast.unreported = mask & 2 != 0
             historicalTickLast.tickAttribLast = tickAttribLast
-            historicalTickLast.price = decode(float, fields)
-            historicalTickLast.size = decode(int, fields)
-            historicalTickLast.exchange = decode(str, fields)
-            historicalTickLast.specialConditions = decode(str, fields)
+            historicalTickLast.price = price
+            historicalTickLast.size = size
+            historicalTickLast.exchange = exchange
+            historicalTickLast.specialConditions = specialConditions
             ticks.append(historicalTickLast)
 
-        done = decode(bool, fields)
+        self.route(reqId).historicalTicksLast(reqId, ticks, done)
+
+    def decodeHistoricalTicksArray(self, fields, plan, columns) -> tuple:
+        """ (reqId, ticks, done), the ticks in a structured array; the
+        callbacks are called by name by the callers, so that
+        discoverCallbacks() sees them """
+        (reqId, tickCount) = plan.decode(fields)
+        ticks = columnar.to_structured_array(plan.rowColumns(fields, tickCount), columns)
+        (done, ) = plan.decodeTail(fields, tickCount)
 
-        self.wrapper.historicalTicksLast(reqId, ticks, done)
+        return (reqId, ticks, done)
 
     def processTickByTickMsg(self, fields):
         next(fields)
@@ -1040,7 +1292,7 @@ class Decoder(Object):
             exchange = decode(str, fields)
             specialConditions = decode(str, fields)
 
-            self.wrapper.tickByTickAllLast(reqId, tickType, time, price, size, tickAttribLast,
+            self.route(reqId).tickByTickAllLast(reqId, tickType, time, price, size, tickAttribLast,
                                            exchange, specialConditions)
         elif tickType == 3:
             # BidAsk
@@ -1053,13 +1305,13 @@ class Decoder(Object):
             tickAttribBidAsk.bidPastLow = mask & 1 != 0
             tickAttribBidAsk.askPastHigh = mask & 2 != 0
 
-            self.wrapper.tickByTickBidAsk(reqId, time, bidPrice, askPrice, bidSize,
+            self.route(reqId).tickByTickBidAsk(reqId, time, bidPrice, askPrice, bidSize,
                                           askSize, tickAttribBidAsk)
         elif tickType == 4:
             # MidPoint
             midPoint = decode(float, fields)
 
-            self.wrapper.tickByTickMidPoint(reqId, time, midPoint)
+            self.route(reqId).tickByTickMidPoint(reqId, time, midPoint)
 
     def processOrderBoundMsg(self, fields):
         next(fields)
@@ -1067,26 +1319,22 @@ class Decoder(Object):
         apiClientId = decode(int, fields)
         apiOrderId = decode(int, fields)
 
-        self.wrapper.orderBound(reqId, apiClientId, apiOrderId)
+        self.route(reqId).orderBound(reqId, apiClientId, apiOrderId)
+
+    def marketDepthL2Plan(self):
+        # msgId, version, reqId, position, marketMaker, operation, side, price, size
+        head = [None, None, int, int, str, int, int, float, int]
+        if self.serverVersion >= MIN_SERVER_VER_SMART_DEPTH:
+            head.append(bool)   # isSmartDepth
+        return DecodePlan(head)
 
     def processMarketDepthL2Msg(self, fields):
-        next(fields)
-        decode(int, fields)
-        reqId = decode(int, fields)
+        args = self.plans[IN.MARKET_DEPTH_L2].decode(fields)
 
-        position = decode(int, fields)
-        marketMaker = decode(str, fields)
-        operation = decode(int, fields)
-        side = decode(int, fields)
-        price = decode(float, fields)
-        size = decode(int, fields)
-        isSmartDepth = False
+        if self.serverVersion < MIN_SERVER_VER_SMART_DEPTH:
+            args.append(False)  # isSmartDepth
 
-        if self.serverVersion >= MIN_SERVER_VER_SMART_DEPTH:
-            isSmartDepth = decode(bool, fields)
-
-        self.wrapper.updateMktDepthL2(reqId, position, marketMaker,
-                                      operation, side, price, size, isSmartDepth)
+        self.route(args[0]).updateMktDepthL2(*args)
 
     def processCompletedOrderMsg(self, fields):
         next(fields)
@@ -1174,7 +1422,7 @@ class Decoder(Object):
         reqId = decode(int, fields)
         text = decode(str, fields)
 
-        self.wrapper.replaceFAEnd(reqId, text)
+        self.route(reqId).replaceFAEnd(reqId, text)
 
     ######################################################################
 
@@ -1251,8 +1499,11 @@ class Decoder(Object):
                 args.append(arg)
                 fieldIdx += 1
 
-        method = getattr(self.wrapper, handleInfo.wrapperMeth.__name__)
-        logger.debug("calling %s with %s %s", method, self.wrapper, args)
+        target = self.wrapper
+        if args and list(handleInfo.wrapperParams)[1] in ROUTED_PARAMS:
+            target = self.route(args[0])
+        method = getattr(target, handleInfo.wrapperMeth.__name__)
+        logger.debug("calling %s with %s %s", method, target, args)
         method(*args)
 
     def interpret(self, fields):
@@ -1263,28 +1514,51 @@ class Decoder(Object):
         sMsgId = fields[0]
         nMsgId = int(sMsgId)
 
+        if nMsgId in self.skippedMsgIds:
+            self.nSkipped[nMsgId] += 1
+            return
+
+        dispatch = self.dispatchTable.get(nMsgId, None)
+        if dispatch is not None:
+            (method, converters, nFields, routedName) = dispatch
+            if len(fields) != nFields:
+                logger.error("diff len fields and params %d %d for fields: %s and method: %s",
+                             len(fields), nFields - 1, fields, method)
+                return
+            args = [conv(fields[idx]) for (idx, conv) in converters]
+            if routedName is not None and self.handlers:
+                handler = self.handlers.get(args[0])
+                if handler is not None:
+                    method = getattr(handler, routedName)
+            method(*args)
+            return
+
         handleInfo = self.msgId2handleInfo.get(nMsgId, None)
 
         if handleInfo is None:
-            logger.debug("%s: no handleInfo", fields)
+            if HOT_PATH_LOGGING:
+                logger.debug("%s: no handleInfo", fields)
             return
 
         try:
             if handleInfo.wrapperMeth is not None:
-                logger.debug("In interpret(), handleInfo: %s", handleInfo)
+                if HOT_PATH_LOGGING:
+                    logger.debug("In interpret(), handleInfo: %s", handleInfo)
                 self.interpretWithSignature(fields, handleInfo)
+            elif handleInfo.planMeth is not None:
+                handleInfo.processMeth(self, fields)
             elif handleInfo.processMeth is not None:
                 handleInfo.processMeth(self, iter(fields))
         except BadMessage:
-            theBadMsg = ",".join(fields)
+            theBadMsg = ",".join(map(strFromField, fields))
             self.wrapper.error(NO_VALID_ID, BAD_MESSAGE.code(),
                                BAD_MESSAGE.msg() + theBadMsg)
             raise
 
     msgId2handleInfo = {
-        IN.TICK_PRICE: HandleInfo(proc=processTickPriceMsg),
+        IN.TICK_PRICE: HandleInfo(proc=processTickPriceMsg, plan=tickPricePlan),
         IN.TICK_SIZE: HandleInfo(wrap=EWrapper.tickSize),
-        IN.ORDER_STATUS: HandleInfo(proc=processOrderStatusMsg),
+        IN.ORDER_STATUS: HandleInfo(proc=processOrderStatusMsg, plan=orderStatusPlan),
         IN.ERR_MSG: HandleInfo(wrap=EWrapper.error),
         IN.OPEN_ORDER: HandleInfo(proc=processOpenOrder),
         IN.ACCT_VALUE: HandleInfo(wrap=EWrapper.updateAccountValue),
@@ -1294,12 +1568,12 @@ class Decoder(Object):
         IN.CONTRACT_DATA: HandleInfo(proc=processContractDataMsg),
         IN.EXECUTION_DATA: HandleInfo(proc=processExecutionDataMsg),
         IN.MARKET_DEPTH: HandleInfo(wrap=EWrapper.updateMktDepth),
-        IN.MARKET_DEPTH_L2: HandleInfo(proc=processMarketDepthL2Msg),
+        IN.MARKET_DEPTH_L2: HandleInfo(proc=processMarketDepthL2Msg, plan=marketDepthL2Plan),
         IN.NEWS_BULLETINS: HandleInfo(wrap=EWrapper.updateNewsBulletin),
         IN.MANAGED_ACCTS: HandleInfo(wrap=EWrapper.managedAccounts),
         IN.RECEIVE_FA: HandleInfo(wrap=EWrapper.receiveFA),
-        IN.HISTORICAL_DATA: HandleInfo(proc=processHistoricalDataMsg),
-        IN.HISTORICAL_DATA_UPDATE: HandleInfo(proc=processHistoricalDataUpdateMsg),
+        IN.HISTORICAL_DATA: HandleInfo(proc=processHistoricalDataMsg, plan=historicalDataPlan),
+        IN.HISTORICAL_DATA_UPDATE: HandleInfo(proc=processHistoricalDataUpdateMsg, plan=historicalDataUpdatePlan),
         IN.BOND_CONTRACT_DATA: HandleInfo(proc=processBondContractDataMsg),
         IN.SCANNER_PARAMETERS: HandleInfo(wrap=EWrapper.scannerParameters),
         IN.SCANNER_DATA: HandleInfo(proc=processScannerDataMsg),
@@ -1308,7 +1582,7 @@ class Decoder(Object):
         IN.TICK_STRING: HandleInfo(wrap=EWrapper.tickString),
         IN.TICK_EFP: HandleInfo(wrap=EWrapper.tickEFP),
         IN.CURRENT_TIME: HandleInfo(wrap=EWrapper.currentTime),
-        IN.REAL_TIME_BARS: HandleInfo(proc=processRealTimeBarMsg),
+        IN.REAL_TIME_BARS: HandleInfo(proc=processRealTimeBarMsg, plan=realTimeBarPlan),
         IN.FUNDAMENTAL_DATA: HandleInfo(wrap=EWrapper.fundamentalData),
         IN.CONTRACT_DATA_END: HandleInfo(wrap=EWrapper.contractDetailsEnd),
         IN.OPEN_ORDER_END: HandleInfo(wrap=EWrapper.openOrderEnd),
@@ -1352,9 +1626,9 @@ class Decoder(Object):
         IN.MARKET_RULE: HandleInfo(proc=processMarketRuleMsg),
         IN.PNL: HandleInfo(proc=processPnLMsg),
         IN.PNL_SINGLE: HandleInfo(proc=processPnLSingleMsg),
-        IN.HISTORICAL_TICKS: HandleInfo(proc=processHistoricalTicks),
-        IN.HISTORICAL_TICKS_BID_ASK: HandleInfo(proc=processHistoricalTicksBidAsk),
-        IN.HISTORICAL_TICKS_LAST: HandleInfo(proc=processHistoricalTicksLast),
+        IN.HISTORICAL_TICKS: HandleInfo(proc=processHistoricalTicks, plan=historicalTicksPlan),
+        IN.HISTORICAL_TICKS_BID_ASK: HandleInfo(proc=processHistoricalTicksBidAsk, plan=historicalTicksBidAskPlan),
+        IN.HISTORICAL_TICKS_LAST: HandleInfo(proc=processHistoricalTicksLast, plan=historicalTicksLastPlan),
         IN.TICK_BY_TICK: HandleInfo(proc=processTickByTickMsg),
         IN.ORDER_BOUND: HandleInfo(proc=processOrderBoundMsg),
         IN.COMPLETED_ORDER: HandleInfo(proc=processCompletedOrderMsg),
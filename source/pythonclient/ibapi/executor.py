@@ -0,0 +1,112 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+Runs the EWrapper callbacks on a pool of worker threads instead of the
+thread decoding the msgs (the one running EClient.run()).
+The callbacks are sharded by their 1st arg when it is a request/order id
+(see KEYED_PARAMS): all the callbacks for one id run on the same worker, in
+the order of the msgs, while the callbacks for other ids run in parallel.
+The other callbacks (account, positions, connection, ...) all go to one
+worker, and so do the order and execution callbacks (see ORDER_CALLBACKS):
+the orderStatus() of an orderId and the execDetails() of the reqExecutions()
+reqId cannot be told to be about the same order, so they are kept in the
+order of the msgs on that worker rather than sharded. The errors are sharded
+by their reqId, an order error may then run before or after the callbacks of
+that order. This pays off when the callbacks wait on I/O (DB writes, ...) or
+release the GIL.
+"""
+
+import inspect
+import logging
+import queue
+import threading
+
+from ibapi.wrapper import EWrapper
+
+
+logger = logging.getLogger(__name__)
+
+# names of the 1st arg of the EWrapper methods by which they are sharded
+KEYED_PARAMS = ("reqId", "requestId", "tickerId", "orderId")
+
+# not sharded, whatever their 1st arg
+ORDER_CALLBACKS = frozenset((
+    "orderStatus", "openOrder", "openOrderEnd", "orderBound", "execDetails",
+    "execDetailsEnd", "commissionReport", "completedOrder", "completedOrdersEnd"))
+
+
+def keyed_callbacks() -> dict:
+    """ EWrapper method name -> whether its 1st arg is a sharding key """
+    callbacks = {}
+    for (name, meth) in inspect.getmembers(EWrapper, inspect.isfunction):
+        if not name.startswith("_"):
+            params = list(inspect.signature(meth).parameters)[1:2]
+            callbacks[name] = bool(params) and params[0] in KEYED_PARAMS \
+                and name not in ORDER_CALLBACKS
+    return callbacks
+
+
+class CallbackExecutor:
+    def __init__(self, nWorkers):
+        self.queues = [queue.Queue() for _ in range(nWorkers)]
+        self.workers = [threading.Thread(target=self.runWorker, args=(workerQueue, ),
+                                         name="CallbackWorker-%d" % idx, daemon=True)
+                        for (idx, workerQueue) in enumerate(self.queues)]
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, key, meth, args):
+        self.queues[hash(key) % len(self.queues)].put((meth, args))
+
+    def runWorker(self, workerQueue):
+        while True:
+            item = workerQueue.get()
+            if item is None:
+                break
+            (meth, args) = item
+            try:
+                meth(*args)
+            except:
+                logger.exception('unhandled exception in callback %s', meth.__name__)
+
+    def stop(self):
+        """ the callbacks submitted so far still run; may be called from a
+        callback, which then does not wait for its own worker """
+        for workerQueue in self.queues:
+            workerQueue.put(None)
+        current = threading.current_thread()
+        for worker in self.workers:
+            if worker is not current and worker.is_alive():
+                worker.join()
+
+
+def sharded_call(executor, meth, keyed):
+    if keyed:
+        def call(*args):
+            executor.submit(args[0], meth, args)
+    else:
+        def call(*args):
+            executor.submit(None, meth, args)
+    call.__name__ = meth.__name__
+    return call
+
+
+class ShardedWrapper:
+    """ stands in for target (the wrapper or a handler) in the Decoder: its
+    EWrapper methods (or only the given names) submit the calls to the
+    executor """
+
+    def __init__(self, target, executor, names=None):
+        self.target = target
+        for (name, keyed) in keyed_callbacks().items():
+            if names is not None and name not in names:
+                continue
+            meth = getattr(target, name, None)
+            if meth is not None:
+                setattr(self, name, sharded_call(executor, meth, keyed))
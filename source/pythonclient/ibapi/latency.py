@@ -0,0 +1,242 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+Measures where the time goes between the socket and the callbacks.
+When a LatencyMonitor is set (see EClient.setLatencyMonitor()) each msg is
+stamped (time.monotonic_ns()) along the way:
+    recv        - Connection.recvMsg()/recvMsgInto() got the packet
+    queued      - the EReader put it in the Queue
+    dequeued    - EClient.run() got it from the Queue
+    dispatched  - EClient.run() handed it to the Decoder
+    callback    - the Decoder called the 1st wrapper callback for it
+    done        - the last callback returned
+and the stages are aggregated per msgId in histograms:
+    read        - recv -> queued: framing
+    queue       - queued -> dequeued: time spent in the Queue
+    batch       - dequeued -> dispatched: wait for the msgs ahead in the same
+                  batch (batched mode)
+    decode      - dispatched -> callback
+    callback    - callback -> done: the user code
+    total       - recv -> done
+The depth of the Queue is sampled as the msgs are dequeued. With
+logInterval > 0 a summary line is logged every logInterval seconds.
+With the SessionManager and the AsyncEClient, which have no EReader, only
+the decode and callback stages are measured.
+"""
+
+import collections
+import logging
+import time
+
+from ibapi.message import IN
+from ibapi.wrapper import EWrapper
+
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("read", "queue", "batch", "decode", "callback", "total")
+IN_NAMES = {str(msgId).encode(): name for (name, msgId) in vars(IN).items()
+            if not name.startswith("_")}
+
+
+class Histogram:
+    """HDR style histogram of non negative ints (eg: ns): exact below
+    2**SUB_BITS, then 2**(SUB_BITS-1) buckets per power of 2, ie: the values
+    are kept with a relative error below 1/2**(SUB_BITS-1) (~3%) whatever
+    their magnitude."""
+
+    SUB_BITS = 6
+    SUB_COUNT = 1 << SUB_BITS
+    HALF_COUNT = SUB_COUNT >> 1
+
+    def __init__(self):
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def bucketIndex(cls, value) -> int:
+        if value < cls.SUB_COUNT:
+            return value
+        shift = value.bit_length() - cls.SUB_BITS
+        return cls.SUB_COUNT + (shift - 1) * cls.HALF_COUNT + (value >> shift) - cls.HALF_COUNT
+
+    @classmethod
+    def bucketHigh(cls, idx) -> int:
+        """ the highest value of bucket idx """
+        if idx < cls.SUB_COUNT:
+            return idx
+        (shift, top) = divmod(idx - cls.SUB_COUNT, cls.HALF_COUNT)
+        shift += 1
+        return ((top + cls.HALF_COUNT + 1) << shift) - 1
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        idx = self.bucketIndex(value)
+        counts = self.counts
+        if idx >= len(counts):
+            counts.extend([0] * (idx + 1 - len(counts)))
+        counts[idx] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, pct) -> int:
+        """ the value below which pct % of the values are (to the bucket
+        precision), 0 when empty """
+        if self.count == 0:
+            return 0
+        threshold = self.count * pct / 100.
+        seen = 0
+        for (idx, count) in enumerate(self.counts):
+            seen += count
+            if count and seen >= threshold:
+                return min(self.bucketHigh(idx), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.
+
+    def summary(self) -> dict:
+        return {"count": self.count,
+                "min": self.min or 0,
+                "mean": round(self.mean(), 1),
+                "p50": self.percentile(50),
+                "p90": self.percentile(90),
+                "p99": self.percentile(99),
+                "p999": self.percentile(99.9),
+                "max": self.max or 0}
+
+
+class TimedFrame(bytes):
+    """ a raw msg which carries its recv and queued times """
+
+
+def timed_call(monitor, meth):
+    monotonic_ns = time.monotonic_ns
+
+    def call(*args):
+        if not monitor.callbackStart:
+            monitor.callbackStart = monotonic_ns()
+        try:
+            return meth(*args)
+        finally:
+            monitor.callbackEnd = monotonic_ns()
+    call.__name__ = meth.__name__
+    return call
+
+
+class TimedWrapper:
+    """ stands in for target (the wrapper or a handler) in the Decoder: its
+    EWrapper methods (or only the given names) stamp the monitor around the
+    calls """
+
+    def __init__(self, target, monitor, names=None):
+        self.target = target
+        for (name, _) in vars(EWrapper).items():
+            if name.startswith("_") or (names is not None and name not in names):
+                continue
+            meth = getattr(target, name, None)
+            if callable(meth):
+                setattr(self, name, timed_call(monitor, meth))
+
+
+class LatencyMonitor:
+    def __init__(self, logInterval=0., depthSampleEvery=16):
+        self.logInterval = logInterval
+        self.depthSampleEvery = depthSampleEvery
+        self.msg_queue = None
+        self.reset()
+
+    def reset(self):
+        self.histograms = collections.defaultdict(
+            lambda: {stage: Histogram() for stage in STAGES})
+        self.queueDepth = Histogram()
+        self.startTime = time.monotonic()
+        # for the periodic log line
+        self.interval = Histogram()
+        self.nextLogTime = self.startTime + self.logInterval
+        self.nDequeued = 0
+        self.dequeueTime = 0
+        self.dispatchTime = 0
+        self.callbackStart = 0
+        self.callbackEnd = 0
+
+    def setQueue(self, msg_queue):
+        """ the Queue whose depth is sampled """
+        self.msg_queue = msg_queue
+
+    def stampFrames(self, msgs, recvTime) -> list:
+        """ called by the EReader right before queueing msgs """
+        queueTime = time.monotonic_ns()
+        frames = []
+        for msg in msgs:
+            frame = TimedFrame(msg)
+            frame.recvTime = recvTime or queueTime
+            frame.queueTime = queueTime
+            frames.append(frame)
+        return frames
+
+    def dequeued(self):
+        """ called by EClient.run() right after getting msgs from the Queue """
+        self.dequeueTime = time.monotonic_ns()
+        self.nDequeued += 1
+        if self.msg_queue is not None and self.nDequeued % self.depthSampleEvery == 0:
+            self.queueDepth.record(self.msg_queue.qsize())
+
+    def dispatchStart(self):
+        """ called by EClient.run() right before decoding a msg """
+        self.callbackStart = 0
+        self.dispatchTime = time.monotonic_ns()
+
+    def dispatchEnd(self, msg):
+        """ called by EClient.run() once the Decoder is done with msg """
+        now = time.monotonic_ns()
+        histograms = self.histograms[msg[:msg.find(b"\0")]]
+        recvTime = getattr(msg, "recvTime", None)
+        if recvTime is not None:
+            histograms["read"].record(msg.queueTime - recvTime)
+            histograms["queue"].record(self.dequeueTime - msg.queueTime)
+            histograms["batch"].record(self.dispatchTime - self.dequeueTime)
+            histograms["total"].record(now - recvTime)
+            self.interval.record(now - recvTime)
+        if self.callbackStart:
+            histograms["decode"].record(self.callbackStart - self.dispatchTime)
+            histograms["callback"].record(self.callbackEnd - self.callbackStart)
+        else:
+            # no callback called (eg: skipped msg)
+            histograms["decode"].record(now - self.dispatchTime)
+
+        if self.logInterval > 0. and now / 1e9 >= self.nextLogTime:
+            self.logSummary()
+
+    def logSummary(self):
+        interval = self.interval
+        logger.info("latency: %d msgs in %.1fs, recv to callback done us p50 %.1f "
+                    "p99 %.1f p99.9 %.1f max %.1f, queue depth p50 %d max %d",
+                    interval.count, self.logInterval, interval.percentile(50) / 1e3,
+                    interval.percentile(99) / 1e3, interval.percentile(99.9) / 1e3,
+                    (interval.max or 0) / 1e3, self.queueDepth.percentile(50),
+                    self.queueDepth.max or 0)
+        self.interval = Histogram()
+        self.nextLogTime = time.monotonic() + self.logInterval
+
+    def snapshot(self) -> dict:
+        """ the summaries (see Histogram.summary(), in ns) of each stage of
+        each msg (by msg name), the queue depth summary and the seconds since
+        the start/reset """
+        return {"msgs": {IN_NAMES.get(msgId, msgId.decode()):
+                         {stage: histogram.summary() for (stage, histogram) in histograms.items()}
+                         for (msgId, histograms) in list(self.histograms.items())},
+                "queueDepth": self.queueDepth.summary(),
+                "seconds": time.monotonic() - self.startTime}
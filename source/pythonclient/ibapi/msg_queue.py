@@ -0,0 +1,209 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+Queue between the EReader and EClient.run() which can:
+ - conflate the market data: a market data msg (see CONFLATED_MSGS) still
+   waiting to be processed is replaced by a newer one for the same (msgId,
+   reqId, tickType); the older one is dropped and the newer one is queued
+   last, so it still comes after the msgs which arrived before it, and a
+   slow consumer gets the latest values instead of an ever growing backlog.
+ - dispatch the order related msgs and the errors (see PRIORITY_MSGS) ahead
+   of everything else: they are put in a priority lane which is always
+   emptied first.
+The msgs are kept in order within each lane and the msgs which are neither
+conflated nor prioritized are kept as they are.
+"""
+
+import collections
+import queue
+import threading
+import time
+
+from ibapi.message import IN
+
+
+# msgId field -> (index of the reqId field, tick types to conflate or None
+# for all of them)
+CONFLATED_MSGS = {
+    str(IN.TICK_PRICE).encode(): (2, None),
+    str(IN.TICK_SIZE).encode(): (2, None),
+    str(IN.TICK_GENERIC).encode(): (2, None),
+    str(IN.TICK_BY_TICK).encode(): (1, (b"3", )),  # BidAsk only
+}
+
+# the end markers go along, so they still come after what they end
+PRIORITY_MSGS = frozenset(str(msgId).encode() for msgId in (
+    IN.ORDER_STATUS, IN.OPEN_ORDER, IN.OPEN_ORDER_END, IN.EXECUTION_DATA,
+    IN.EXECUTION_DATA_END, IN.COMMISSION_REPORT, IN.ERR_MSG))
+
+# key of the slots of the msgs dropped by the conflation
+DROPPED = object()
+
+
+def conflation_key(msg):
+    """ (msgId, reqId, tickType) of the raw msg if it can be conflated,
+    None otherwise """
+
+    if not isinstance(msg, bytes):
+        return None
+    msgIdEnd = msg.find(b"\0")
+    rule = CONFLATED_MSGS.get(msg[:msgIdEnd])
+    if rule is None:
+        return None
+
+    (reqIdIdx, tickTypes) = rule
+    fields = msg.split(b"\0", reqIdIdx + 2)
+    if len(fields) < reqIdIdx + 3:
+        return None
+    tickType = fields[reqIdIdx + 1]
+    if tickTypes is not None and tickType not in tickTypes:
+        return None
+
+    return (fields[0], fields[reqIdIdx], tickType)
+
+
+class MsgQueue:
+    """ stands in for the queue.Queue of EClient: put(), get(), get_nowait(),
+    empty() and qsize() behave the same. In batched mode (maxBatchSize > 0)
+    get() returns lists of up to maxBatchSize msgs. """
+
+    def __init__(self, maxBatchSize=0, conflation=True, priorityLanes=False):
+        self.maxBatchSize = maxBatchSize
+        self.conflation = conflation
+        self.priorityMsgIds = PRIORITY_MSGS if priorityLanes else frozenset()
+        self.mutex = threading.Lock()
+        self.notEmpty = threading.Condition(self.mutex)
+        self.priority = collections.deque()
+        # [msg, key] slots in arrival order, the conflated ones are left in
+        # place with a DROPPED key and skipped
+        self.slots = collections.deque()
+        self.nDropped = 0
+        self.latest = {}  # conflation key -> slot
+        self.nPut = 0
+        self.nPriority = 0
+        self.nConflated = 0
+        self.conflatedByMsgId = collections.Counter()
+        self.maxDepth = 0
+
+    def put(self, item, block=True, timeout=None):
+        """ item is a msg or a list of msgs (as queued by the EReader in
+        batched mode); never blocks, the Queue is unbounded """
+
+        msgs = item if type(item) is list else (item, )
+        with self.mutex:
+            for msg in msgs:
+                self.nPut += 1
+                if self.priorityMsgIds and isinstance(msg, bytes) \
+                        and msg[:msg.find(b"\0")] in self.priorityMsgIds:
+                    self.priority.append(msg)
+                    self.nPriority += 1
+                    continue
+                key = conflation_key(msg) if self.conflation else None
+                if key is not None:
+                    slot = self.latest.get(key)
+                    if slot is not None:
+                        slot[0] = None
+                        slot[1] = DROPPED
+                        self.nDropped += 1
+                        self.nConflated += 1
+                        self.conflatedByMsgId[key[0]] += 1
+                    slot = [msg, key]
+                    self.latest[key] = slot
+                else:
+                    slot = [msg, None]
+                self.slots.append(slot)
+            if self.nDropped > len(self.slots) // 2:
+                self.compact()
+            depth = len(self.priority) + len(self.slots) - self.nDropped
+            if depth > self.maxDepth:
+                self.maxDepth = depth
+            self.notEmpty.notify()
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def compact(self):
+        """ removes the dropped slots, so they do not pile up behind a slow
+        consumer """
+        self.slots = collections.deque(slot for slot in self.slots
+                                       if slot[1] is not DROPPED)
+        self.nDropped = 0
+
+    def skipDropped(self):
+        slots = self.slots
+        while slots and slots[0][1] is DROPPED:
+            slots.popleft()
+            self.nDropped -= 1
+
+    def hasMsgs(self):
+        return self.priority or len(self.slots) > self.nDropped
+
+    def popMsg(self):
+        if self.priority:
+            return self.priority.popleft()
+
+        self.skipDropped()
+        (msg, key) = self.slots.popleft()
+        if key is not None:
+            # from now on a msg with that key is a new value
+            del self.latest[key]
+        return msg
+
+    def nextIsEnd(self):
+        """ the None queued by the EReader at the end is always last """
+        if self.priority:
+            return False
+        self.skipDropped()
+        return bool(self.slots) and self.slots[0][0] is None
+
+    def get(self, block=True, timeout=None):
+        with self.notEmpty:
+            if not block:
+                if not self.hasMsgs():
+                    raise queue.Empty
+            elif timeout is None:
+                while not self.hasMsgs():
+                    self.notEmpty.wait()
+            else:
+                endTime = time.monotonic() + timeout
+                while not self.hasMsgs():
+                    remaining = endTime - time.monotonic()
+                    if remaining <= 0.0:
+                        raise queue.Empty
+                    self.notEmpty.wait(remaining)
+
+            if self.maxBatchSize > 0 and not self.nextIsEnd():
+                # the None is returned on its own
+                msgs = []
+                while self.hasMsgs() and len(msgs) < self.maxBatchSize \
+                        and not self.nextIsEnd():
+                    msgs.append(self.popMsg())
+                return msgs
+            return self.popMsg()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def empty(self):
+        with self.mutex:
+            return not self.hasMsgs()
+
+    def qsize(self):
+        with self.mutex:
+            return len(self.priority) + len(self.slots) - self.nDropped
+
+    def stats(self) -> dict:
+        """ counts to size things: msgs put, msgs sent through the priority
+        lane, msgs conflated (total and per msgId), current and max depth """
+        with self.mutex:
+            return {"put": self.nPut,
+                    "priority": self.nPriority,
+                    "conflated": self.nConflated,
+                    "conflatedByMsgId": {int(msgId): count for (msgId, count)
+                                         in self.conflatedByMsgId.items()},
+                    "depth": len(self.priority) + len(self.slots) - self.nDropped,
+                    "maxDepth": self.maxDepth}
@@ -5,6 +5,10 @@ Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is su
 
 
 class Object(object):
+    # no instance dict here, so that the subclasses declaring __slots__ are
+    # really compact; the others get a __dict__ as usual
+    __slots__ = ()
+
     def __str__(self):
         return "Object"
 
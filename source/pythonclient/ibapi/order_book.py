@@ -0,0 +1,224 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+Market depth books kept in preallocated NumPy arrays.
+An OrderBook applies the insert/update/delete operations of updateMktDepth()
+and updateMktDepthL2() to the price, size and market maker arrays of each
+side, in place: an insert or a delete shifts the rows below the position
+with one slice copy per array, an update writes the row. The top of the book
+is row 0 of each side and a snapshot is a copy of the filled rows.
+The market makers (the exchanges for the smart depth) are kept as int codes,
+shared by all the books of an OrderBooks (see marketMakerName()).
+
+OrderBooks holds the book of each reqId and has the depth callbacks, so it
+can be registered as the handler of the reqMktDepth() requests:
+
+    books = OrderBooks(wrapper=app)
+    app.registerHandler(reqId, books)
+    app.reqMktDepth(reqId, contract, 10, True, [])
+    ...
+    (bidPrice, bidSize, askPrice, askSize) = books.book(reqId).top()
+
+As the handler it also gets the errors of these requests: on a depth reset
+(error 317) the book is cleared, as TWS sends the whole book again; the
+other errors go to bookError(), which passes them on to the error() of the
+given wrapper (and only logs them without one).
+
+NumPy is an optional dependency, only needed when this module is used.
+The books are updated from the thread running the callbacks: a snapshot
+taken from another thread may see a half applied operation.
+"""
+
+import logging
+
+from ibapi import columnar
+
+
+logger = logging.getLogger(__name__)
+
+# the side and operation codes of the depth callbacks
+(ASK, BID) = range(2)
+(INSERT, UPDATE, DELETE) = range(3)
+
+# "Market depth data has been RESET. Please empty deep book contents
+# before applying any new entries."
+DEPTH_RESET = 317
+
+NO_MARKET_MAKER = -1
+DEFAULT_CAPACITY = 16
+
+
+class OrderBook:
+    def __init__(self, reqId, capacity=DEFAULT_CAPACITY, marketMakerCodes=None):
+        numpy = columnar.check_numpy("keep the order books")
+        self.reqId = reqId
+        # per side (ASK, BID): the rows, best price first
+        self.prices = [numpy.zeros(capacity, dtype="f8") for _ in range(2)]
+        self.sizes = [numpy.zeros(capacity, dtype="i8") for _ in range(2)]
+        self.marketMakers = [numpy.full(capacity, NO_MARKET_MAKER, dtype="i4")
+                             for _ in range(2)]
+        self.depths = [0, 0]
+        self.marketMakerCodes = marketMakerCodes or MarketMakerCodes()
+        self.marketMakerCode = self.marketMakerCodes.code
+        self.nUpdates = 0
+
+    def grow(self, capacity):
+        import numpy
+        for side in (ASK, BID):
+            for (arrays, fill) in ((self.prices, 0.), (self.sizes, 0),
+                                   (self.marketMakers, NO_MARKET_MAKER)):
+                array = numpy.full(capacity, fill, dtype=arrays[side].dtype)
+                array[:len(arrays[side])] = arrays[side]
+                arrays[side] = array
+        logger.debug("book %s grown to %d rows", self.reqId, capacity)
+
+    def update(self, position, operation, side, price, size, marketMaker=""):
+        """ applies one depth operation """
+        self.nUpdates += 1
+        depth = self.depths[side]
+        prices = self.prices[side]
+        sizes = self.sizes[side]
+        marketMakers = self.marketMakers[side]
+        if operation == UPDATE and position < depth:
+            prices[position] = price
+            sizes[position] = size
+            marketMakers[position] = self.marketMakerCode(marketMaker)
+
+        elif operation == DELETE:
+            if position >= depth:
+                logger.debug("book %s: delete of missing row %d", self.reqId, position)
+                return
+            if position < depth - 1:
+                prices[position:depth - 1] = prices[position + 1:depth]
+                sizes[position:depth - 1] = sizes[position + 1:depth]
+                marketMakers[position:depth - 1] = marketMakers[position + 1:depth]
+            self.depths[side] = depth - 1
+
+        else:
+            # insert, or update of a row not there yet
+            if position > depth:
+                position = depth
+            if depth == len(prices):
+                self.grow(max(1, 2 * depth))
+                prices = self.prices[side]
+                sizes = self.sizes[side]
+                marketMakers = self.marketMakers[side]
+            if position < depth:
+                prices[position + 1:depth + 1] = prices[position:depth]
+                sizes[position + 1:depth + 1] = sizes[position:depth]
+                marketMakers[position + 1:depth + 1] = marketMakers[position:depth]
+            prices[position] = price
+            sizes[position] = size
+            marketMakers[position] = self.marketMakerCode(marketMaker)
+            self.depths[side] = depth + 1
+
+    def top(self) -> tuple:
+        """ (bid price, bid size, ask price, ask size), the prices are NaN and
+        the sizes 0 for an empty side """
+        (askDepth, bidDepth) = self.depths
+        return (float(self.prices[BID][0]) if bidDepth else float("nan"),
+                int(self.sizes[BID][0]) if bidDepth else 0,
+                float(self.prices[ASK][0]) if askDepth else float("nan"),
+                int(self.sizes[ASK][0]) if askDepth else 0)
+
+    def side(self, side):
+        """ a copy of the rows of side: a structured array of price, size and
+        marketMaker (the code) """
+        import numpy
+        depth = self.depths[side]
+        rows = numpy.empty(depth, dtype=[("price", "f8"), ("size", "i8"),
+                                         ("marketMaker", "i4")])
+        rows["price"] = self.prices[side][:depth]
+        rows["size"] = self.sizes[side][:depth]
+        rows["marketMaker"] = self.marketMakers[side][:depth]
+        return rows
+
+    def snapshot(self) -> tuple:
+        """ (bids, asks), see side() """
+        return (self.side(BID), self.side(ASK))
+
+    def marketMakerName(self, code) -> str:
+        return self.marketMakerCodes.name(code)
+
+    def clear(self):
+        self.depths = [0, 0]
+
+
+class MarketMakerCodes:
+    """ market maker name <-> int code """
+
+    def __init__(self):
+        self.codes = {"": NO_MARKET_MAKER}
+        self.names = []
+
+    def code(self, name) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def name(self, code) -> str:
+        return self.names[code] if code != NO_MARKET_MAKER else ""
+
+
+class OrderBooks:
+    """ the OrderBook of each reqId, created on the 1st depth msg """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, wrapper=None):
+        columnar.check_numpy("keep the order books")
+        self.capacity = capacity
+        # gets the errors other than the depth resets
+        self.wrapper = wrapper
+        self.books = {}
+        self.marketMakerCodes = MarketMakerCodes()
+
+    def book(self, reqId) -> OrderBook:
+        book = self.books.get(reqId)
+        if book is None:
+            book = self.books[reqId] = OrderBook(reqId, self.capacity,
+                                                 self.marketMakerCodes)
+        return book
+
+    def marketMakerName(self, code) -> str:
+        return self.marketMakerCodes.name(code)
+
+    def remove(self, reqId):
+        """ to be called once the depth is cancelled """
+        self.books.pop(reqId, None)
+
+    def bookUpdated(self, reqId, book):
+        # intended to be overloaded
+        pass
+
+    def bookError(self, reqId, errorCode, errorString):
+        # may be overloaded
+        if self.wrapper is not None:
+            self.wrapper.error(reqId, errorCode, errorString)
+        else:
+            logger.warning("book %s: error %s %s", reqId, errorCode, errorString)
+
+    def updateMktDepth(self, reqId, position, operation, side, price, size):
+        book = self.book(reqId)
+        book.update(position, operation, side, price, size)
+        self.bookUpdated(reqId, book)
+
+    def updateMktDepthL2(self, reqId, position, marketMaker, operation, side, price,
+                         size, isSmartDepth):
+        book = self.book(reqId)
+        book.update(position, operation, side, price, size, marketMaker)
+        self.bookUpdated(reqId, book)
+
+    def error(self, reqId, errorCode, errorString):
+        if errorCode != DEPTH_RESET:
+            self.bookError(reqId, errorCode, errorString)
+            return
+        book = self.books.get(reqId)
+        if book is not None:
+            logger.debug("book %s reset", reqId)
+            book.clear()
+            self.bookUpdated(reqId, book)
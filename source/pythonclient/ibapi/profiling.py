@@ -0,0 +1,143 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+Profiles Decoder.interpret(): counts the msgs and their bytes and adds up
+the time spent decoding them and the time spent in the callbacks (the
+wrapper's and the registered handlers'), per msgId, eg:
+
+    with DecoderProfiler(app.decoder) as profiler:
+        time.sleep(60)
+    print(profiler.snapshot())
+
+While started the profiler stands in for the interpret() of the decoder
+and for its wrapper (the handlers registered meanwhile are profiled as
+well); once stopped they are restored, so there is no cost at all when not
+profiling. With callback workers (see executor) the callback time is the
+time to submit the callbacks. The executor and the latency monitor cannot
+be set on the decoder while it is profiled.
+"""
+
+import collections
+import time
+
+from ibapi.decoder import HandlerRoute
+from ibapi.latency import IN_NAMES
+from ibapi.wrapper import EWrapper
+
+
+def profiled_call(profiler, meth):
+    perf_counter_ns = time.perf_counter_ns
+
+    def call(*args):
+        startTime = perf_counter_ns()
+        try:
+            return meth(*args)
+        finally:
+            profiler.callbackTime += perf_counter_ns() - startTime
+    call.__name__ = meth.__name__
+    return call
+
+
+class ProfiledWrapper:
+    """ stands in for target (the wrapper or a handler route): its EWrapper
+    methods add their time to the profiler """
+
+    def __init__(self, target, profiler):
+        self.target = target
+        for name in vars(EWrapper):
+            if not name.startswith("_"):
+                meth = getattr(target, name, None)
+                if callable(meth):
+                    setattr(self, name, profiled_call(profiler, meth))
+
+
+class DecoderProfiler:
+    def __init__(self, decoder):
+        self.decoder = decoder
+        self.wrapper = None   # the wrapper of the decoder while profiling
+        self.reset()
+
+    def reset(self):
+        # msgId (bytes) -> [msgs, bytes, decode ns, callback ns]
+        self.stats = collections.defaultdict(lambda: [0, 0, 0, 0])
+        self.callbackTime = 0
+        self.elapsed = 0.
+        self.startTime = time.perf_counter() if self.wrapper is not None else None
+
+    def start(self):
+        decoder = self.decoder
+        if self.wrapper is not None:
+            return
+        if decoder.profiler is not None:
+            raise RuntimeError("the decoder is already profiled")
+        decoder.profiler = self
+        self.wrapper = decoder.wrapper
+        decoder.wrapper = ProfiledWrapper(self.wrapper, self)
+        decoder.compileDispatchTable()
+        for (reqId, route) in decoder.handlers.items():
+            decoder.handlers[reqId] = ProfiledWrapper(route, self)
+        decoder.interpret = self.interpret
+        self.startTime = time.perf_counter()
+
+    def stop(self):
+        decoder = self.decoder
+        if self.wrapper is None:
+            return
+        del decoder.interpret
+        for (reqId, route) in decoder.handlers.items():
+            decoder.handlers[reqId] = route.target
+        decoder.wrapper = self.wrapper
+        decoder.compileDispatchTable()
+        decoder.profiler = None
+        self.wrapper = None
+        self.elapsed += time.perf_counter() - self.startTime
+        self.startTime = None
+
+    def profiledRoute(self, handler):
+        """ the route of a handler registered while profiling """
+        return ProfiledWrapper(HandlerRoute(handler, self.wrapper), self)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def interpret(self, fields):
+        perf_counter_ns = time.perf_counter_ns
+        self.callbackTime = 0
+        startTime = perf_counter_ns()
+        try:
+            type(self.decoder).interpret(self.decoder, fields)
+        finally:
+            elapsed = perf_counter_ns() - startTime
+            if fields:
+                stats = self.stats[fields[0]]
+                stats[0] += 1
+                stats[1] += sum(map(len, fields)) + len(fields)
+                stats[2] += elapsed - self.callbackTime
+                stats[3] += self.callbackTime
+
+    def snapshot(self) -> dict:
+        """ msg name -> msgs, bytes, decode and callback times (total and
+        per msg, in ns), the busiest msgs first; along with the seconds
+        profiled """
+        msgs = {}
+        for (msgId, (nMsgs, nBytes, decodeNs, callbackNs)) in sorted(
+                list(self.stats.items()), key=lambda item: -(item[1][2] + item[1][3])):
+            msgs[IN_NAMES.get(msgId, msgId.decode(errors="backslashreplace"))] = {
+                "msgs": nMsgs,
+                "bytes": nBytes,
+                "decodeNs": decodeNs,
+                "callbackNs": callbackNs,
+                "decodeNsPerMsg": round(decodeNs / nMsgs, 1),
+                "callbackNsPerMsg": round(callbackNs / nMsgs, 1)}
+        seconds = self.elapsed
+        if self.startTime is not None:
+            seconds += time.perf_counter() - self.startTime
+        return {"msgs": msgs, "seconds": seconds}
@@ -9,46 +9,135 @@ The EReader runs in a separate threads and is responsible for receiving the
 incoming messages.
 It will read the packets from the wire, use the low level IB messaging to
 remove the size prefix and put the rest in a Queue.
+In batched mode all the msgs framed from one packet are put in the Queue as
+a list (of at most maxBatchSize msgs) instead of one by one.
+In event driven mode a None is put in the Queue when the reader is done, so
+that the consumer can block on the Queue without a timeout.
+When given a Recorder, the reader also records the msgs (see recorder).
+When given a LatencyMonitor, the msgs are queued stamped (see latency).
 """
 
 import logging
+import struct
 from threading import Thread
 
 from ibapi import comm
+from ibapi.utils import HOT_PATH_LOGGING
 
 
 logger = logging.getLogger(__name__)
 
 
 class EReader(Thread):
-    def __init__(self, conn, msg_queue):
+    def __init__(self, conn, msg_queue, bufSize=0, maxBatchSize=0, eventDriven=False,
+                 recorder=None, latencyMonitor=None):
         super().__init__()
         self.conn = conn
         self.msg_queue = msg_queue
+        # when > 0 the packets are read with recv_into() in a preallocated
+        # buffer of this size instead of being concatenated in bytes
+        self.bufSize = bufSize
+        # when > 0 the msgs are queued as lists of up to this many msgs
+        self.maxBatchSize = maxBatchSize
+        self.eventDriven = eventDriven
+        self.recorder = recorder
+        self.latencyMonitor = latencyMonitor
 
     def run(self):
         try:
             logger.debug("EReader thread started")
-            buf = b""
-            while self.conn.isConnected():
+            if self.bufSize > 0:
+                self.runRecvInto()
+            else:
+                self.runRecv()
+            logger.debug("EReader thread finished")
+        except:
+            logger.exception('unhandled exception in EReader thread')
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+            self.conn.close()
+            if self.eventDriven:
+                self.msg_queue.put(None)
+
+    def runRecv(self):
+        buf = b""
+        while self.conn.isConnected():
 
-                data = self.conn.recvMsg()
+            data = self.conn.recvMsg()
+            if HOT_PATH_LOGGING:
                 logger.debug("reader loop, recvd size %d", len(data))
-                buf += data
+            buf += data
 
-                while len(buf) > 0:
-                    (size, msg, buf) = comm.read_msg(buf)
-                    #logger.debug("resp %s", buf.decode('ascii'))
+            msgs = []
+            while len(buf) > 0:
+                (size, msg, buf) = comm.read_msg(buf)
+                #logger.debug("resp %s", buf.decode('ascii'))
+                if HOT_PATH_LOGGING:
                     logger.debug("size:%d msg.size:%d msg:|%s| buf:%s|", size,
                         len(msg), buf, "|")
 
-                    if msg:
-                        self.msg_queue.put(msg)
-                    else:
+                if msg:
+                    msgs.append(msg)
+                else:
+                    if HOT_PATH_LOGGING:
                         logger.debug("more incoming packet(s) are needed ")
-                        break
+                    break
 
-            logger.debug("EReader thread finished")
-        except:
-            logger.exception('unhandled exception in EReader thread')
+            self.putMsgs(msgs)
+
+    def runRecvInto(self):
+        buf = bytearray(self.bufSize)
+        view = memoryview(buf)
+        start = 0   # first byte not yet consumed
+        end = 0     # first free byte
+        while self.conn.isConnected():
+
+            if end == len(buf):
+                view = self.makeRoom(buf, view, start, end)
+                buf = view.obj
+                end -= start
+                start = 0
+
+            nRecvd = self.conn.recvMsgInto(view[end:])
+            if HOT_PATH_LOGGING:
+                logger.debug("reader loop, recvd size %d", nRecvd)
+            end += nRecvd
+
+            (msgs, start) = comm.read_msgs_from(view, start, end)
+            self.putMsgs(msgs)
+
+            if start == end:
+                # everything consumed, rewind without copying anything
+                start = end = 0
+
+    def putMsgs(self, msgs):
+        if self.recorder is not None and msgs:
+            self.recorder.record(msgs)
+        if self.latencyMonitor is not None and msgs:
+            msgs = self.latencyMonitor.stampFrames(msgs, self.conn.recvTime)
+        if self.maxBatchSize > 0:
+            for idx in range(0, len(msgs), self.maxBatchSize):
+                self.msg_queue.put(msgs[idx:idx + self.maxBatchSize])
+        else:
+            for msg in msgs:
+                self.msg_queue.put(msg)
+
+    @staticmethod
+    def makeRoom(buf, view, start, end):
+        """ called when the buffer is full: moves the pending bytes to the
+        front, or grows the buffer if a single msg does not fit in it """
+        pending = end - start
+        needed = pending
+        if pending >= 4:
+            needed = 4 + struct.unpack_from("!I", view, start)[0]
+
+        if start > 0 and needed <= len(buf):
+            logger.debug("compacting reader buffer, %d pending bytes", pending)
+            view[0:pending] = view[start:end].tobytes()
+            return view
 
+        newBuf = bytearray(max(2 * len(buf), needed))
+        logger.debug("growing reader buffer to %d bytes", len(newBuf))
+        newBuf[0:pending] = view[start:end]
+        return memoryview(newBuf)
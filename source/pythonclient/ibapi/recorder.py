@@ -0,0 +1,110 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+Records the msgs received from TWS and replays them.
+The Recorder is fed by the EReader with the raw msgs (the size prefix
+stripped) as they are framed, and appends them to a file along with their
+receive time. The file starts with the server version negotiated by the
+handshake, so that a Replay can feed the msgs to a Decoder set up the same
+way, at the original pace, at a scaled pace or as fast as possible.
+
+File layout (big endian):
+    header: MAGIC, serverVersion (uint32), start time (uint64, ns since epoch)
+    then for each msg: receive time (uint64, ns since epoch), size (uint32), msg
+"""
+
+import mmap
+import struct
+import time
+
+from ibapi import comm
+from ibapi.decoder import Decoder
+
+
+MAGIC = b"IBAPIREC"
+HEADER = struct.Struct("!8sIQ")
+RECORD = struct.Struct("!QI")
+
+
+class Recorder:
+    def __init__(self, path, serverVersion):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, serverVersion, time.time_ns()))
+        self.nMsgs = 0
+
+    def record(self, msgs, recvTime=None):
+        """ appends the msgs received at recvTime (now by default) """
+        if recvTime is None:
+            recvTime = time.time_ns()
+        pack = RECORD.pack
+        self.file.write(b"".join(pack(recvTime, len(msg)) + msg for msg in msgs))
+        self.nMsgs += len(msgs)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Replay:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.serverVersion, self.startTime) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a recording" % path)
+
+    def frames(self):
+        """ yields the (receive time, msg) of each recorded msg; stops at a
+        truncated last record (eg: recording interrupted) """
+        mm = self.mm
+        unpack_from = RECORD.unpack_from
+        offset = HEADER.size
+        end = len(mm)
+        while offset + RECORD.size <= end:
+            (recvTime, size) = unpack_from(mm, offset)
+            offset += RECORD.size
+            if offset + size > end:
+                break
+            yield (recvTime, mm[offset:offset + size])
+            offset += size
+
+    def makeDecoder(self, wrapper) -> Decoder:
+        return Decoder(wrapper, self.serverVersion)
+
+    def run(self, decoder, speed=0.) -> dict:
+        """Feeds the recorded msgs to decoder.interpret(), as fast as
+        possible when speed is 0, otherwise at the original pace divided by
+        speed (eg: 2. replays twice as fast). Returns the number of msgs,
+        the time taken and the msgs per second."""
+
+        if decoder.serverVersion != self.serverVersion:
+            decoder.setServerVersion(self.serverVersion)
+
+        nMsgs = 0
+        startTime = time.perf_counter()
+        firstRecvTime = None
+        for (recvTime, msg) in self.frames():
+            if speed > 0.:
+                if firstRecvTime is None:
+                    firstRecvTime = recvTime
+                delay = (recvTime - firstRecvTime) / 1e9 / speed \
+                        - (time.perf_counter() - startTime)
+                if delay > 0.:
+                    time.sleep(delay)
+            decoder.interpret(comm.read_fields(msg))
+            nMsgs += 1
+        elapsed = time.perf_counter() - startTime
+
+        return {"msgs": nMsgs,
+                "seconds": elapsed,
+                "msgsPerSec": nMsgs / elapsed if elapsed > 0. else 0.}
+
+    def close(self):
+        self.mm.close()
@@ -0,0 +1,196 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+The SessionManager hosts many EClient connections with a fixed number of
+threads: one thread waits on all the sockets with a single selector, frames
+the msgs of each readable socket and hands them to a small pool of workers
+which run the Decoder (and so the EWrapper callbacks) of each session.
+A session is pinned to one worker so its msgs are processed in order.
+
+    manager = SessionManager(nWorkers=2)
+    manager.start()
+    for clientId in range(40):
+        app = App()     # EWrapper + EClient
+        app.setSessionManager(manager)
+        app.connect("127.0.0.1", 4002, clientId)
+    ...
+    manager.stop()
+
+There is no EReader thread per session and EClient.run() must not be called.
+"""
+
+import logging
+import queue
+import selectors
+import socket
+import threading
+
+from ibapi import comm
+from ibapi.reader import EReader
+
+
+logger = logging.getLogger(__name__)
+
+
+class Session:
+    """ one connection of the SessionManager and its receive buffer """
+
+    def __init__(self, client, worker, bufSize):
+        self.client = client
+        self.conn = client.conn
+        # kept as the Connection drops its socket when it gets closed
+        self.sock = client.conn.socket
+        self.worker = worker
+        self.buf = bytearray(bufSize)
+        self.view = memoryview(self.buf)
+        self.start = 0   # first byte not yet consumed
+        self.end = 0     # first free byte
+
+    def read(self) -> list:
+        """ reads what is available on the socket and returns the complete
+        msgs, as EReader.runRecvInto() does """
+
+        if self.end == len(self.buf):
+            self.view = EReader.makeRoom(self.buf, self.view, self.start, self.end)
+            self.buf = self.view.obj
+            self.end -= self.start
+            self.start = 0
+
+        self.end += self.conn.recvMsgInto(self.view[self.end:])
+        (msgs, self.start) = comm.read_msgs_from(self.view, self.start, self.end)
+        if self.start == self.end:
+            self.start = self.end = 0
+
+        return msgs
+
+
+class SessionManager(threading.Thread):
+    def __init__(self, nWorkers=1, bufSize=1 << 16):
+        super().__init__(name="SessionManager", daemon=True)
+        self.bufSize = bufSize
+        self.selector = selectors.DefaultSelector()
+        # guards the registrations, which are done from the client threads
+        self.lock = threading.Lock()
+        self.sessions = {}  # client -> Session
+        self.done = False
+        (self.wakeupRecv, self.wakeupSend) = socket.socketpair()
+        self.wakeupRecv.setblocking(False)
+        self.selector.register(self.wakeupRecv, selectors.EVENT_READ)
+
+        self.workerQueues = [queue.Queue() for _ in range(nWorkers)]
+        self.workers = [threading.Thread(target=self.runWorker, args=(workerQueue, ),
+                                         name="SessionWorker-%d" % idx, daemon=True)
+                        for (idx, workerQueue) in enumerate(self.workerQueues)]
+        self.workerLoads = [0] * nWorkers
+
+    def addSession(self, client):
+        """ called by EClient.connect() once the handshake is done, instead
+        of starting an EReader """
+
+        with self.lock:
+            worker = self.workerLoads.index(min(self.workerLoads))
+            self.workerLoads[worker] += 1
+            session = Session(client, worker, self.bufSize)
+            self.sessions[client] = session
+            self.selector.register(session.sock, selectors.EVENT_READ, session)
+        logger.debug("session of client %s on worker %d", client.clientId, worker)
+        # a select() already waiting may not see the new socket otherwise
+        # (eg: SelectSelector)
+        self.wakeup()
+
+    def wakeup(self):
+        try:
+            self.wakeupSend.send(b"\0")
+        except OSError:
+            # closed by stop(), or the pair is full and a wakeup is pending anyway
+            pass
+
+    def drainWakeups(self):
+        try:
+            while self.wakeupRecv.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def removeSession(self, client):
+        """ called by EClient.disconnect(), before the socket is closed """
+
+        with self.lock:
+            session = self.sessions.pop(client, None)
+            if session is None:
+                return
+            self.workerLoads[session.worker] -= 1
+            try:
+                self.selector.unregister(session.sock)
+            except (KeyError, ValueError):
+                pass
+
+    def run(self):
+        try:
+            logger.debug("SessionManager thread started")
+            for worker in self.workers:
+                worker.start()
+            while not self.done:
+                for (key, _) in self.selector.select():
+                    if key.data is None:
+                        self.drainWakeups()
+                    else:
+                        self.readSession(key.data)
+            logger.debug("SessionManager thread finished")
+        except:
+            logger.exception('unhandled exception in SessionManager thread')
+        finally:
+            for workerQueue in self.workerQueues:
+                workerQueue.put(None)
+
+    def readSession(self, session):
+        if session.client not in self.sessions:
+            # removed while the selector was waiting
+            return
+
+        try:
+            msgs = session.read()
+        except Exception:
+            # only this session is dropped, eg: socket closed by a
+            # disconnect() racing with the read
+            logger.exception("error reading the session of client %s, disconnecting",
+                             session.client.clientId)
+            self.removeSession(session.client)
+            self.workerQueues[session.worker].put((session.client, None))
+            return
+
+        if msgs:
+            self.workerQueues[session.worker].put((session.client, msgs))
+        if not session.conn.isConnected():
+            # the Connection saw the socket closed/broken
+            self.removeSession(session.client)
+            self.workerQueues[session.worker].put((session.client, None))
+
+    def runWorker(self, workerQueue):
+        while True:
+            item = workerQueue.get()
+            if item is None:
+                break
+            (client, msgs) = item
+            try:
+                if msgs is None or not client.processMsgs(msgs):
+                    client.disconnect()
+            except:
+                logger.exception('unhandled exception in SessionManager worker')
+
+    def stop(self):
+        """ stops the threads, the sessions are left as they are """
+        self.done = True
+        self.wakeup()
+        if self.is_alive():
+            self.join()
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.join()
+        self.selector.close()
+        self.wakeupRecv.close()
+        self.wakeupSend.close()
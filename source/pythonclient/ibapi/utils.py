@@ -9,6 +9,7 @@ Collection of misc tools
 """
 
 
+import os
 import sys
 import logging
 import inspect
@@ -19,6 +20,16 @@ from ibapi.common import UNSET_INTEGER, UNSET_DOUBLE, UNSET_LONG
 logger = logging.getLogger(__name__)
 
 
+"""
+The logging done for every msg (reading, framing, sending, decoding) is
+compiled out at import time when the IBAPI_HOT_PATH_LOGGING environment
+variable is 0: the log calls, the formatting of their arguments and the
+current_fn_name() frame walks are then skipped altogether, whatever the
+logging level.
+"""
+HOT_PATH_LOGGING = os.environ.get("IBAPI_HOT_PATH_LOGGING", "1") != "0"
+
+
 # I use this just to visually emphasize it's a wrapper overridden method
 def iswrapper(fn):
     return fn
@@ -70,7 +81,8 @@ def decode(the_type, fields, show_unset = False):
     except StopIteration:
         raise BadMessage("no more fields")
 
-    logger.debug("decode %s %s", the_type, s)
+    if HOT_PATH_LOGGING:
+        logger.debug("decode %s %s", the_type, s)
 
     if the_type is str:
         if type(s) is str:
@@ -103,6 +115,37 @@ def decode(the_type, fields, show_unset = False):
     return n
 
 
+"""
+Single field converters with the same semantics as decode() (show_unset
+off) for the callers that index the fields instead of iterating them.
+"""
+
+def strFromField(s):
+    if type(s) is bytes:
+        return s.decode(errors='backslashreplace')
+    return s
+
+
+def intFromField(s):
+    return int(s or 0)
+
+
+def floatFromField(s):
+    return float(s or 0)
+
+
+def boolFromField(s):
+    return int(s or 0) != 0
+
+
+FIELD_CONVERTERS = {
+    str: strFromField,
+    int: intFromField,
+    float: floatFromField,
+    bool: boolFromField
+}
+
+
 def ExerciseStaticMethods(klass):
 
     import types
@@ -717,3 +717,31 @@ class EWrapper:
         """This is called at the end of a replace FA."""
 
         self.logAnswer(current_fn_name(), vars())
+
+    def historicalDataArray(self, reqId: int, bars):
+        """Replaces historicalData() when the columnar mode is on
+        (EClient.setColumnarHistoricalData): all the bars of the answer
+        in one NumPy structured array with the date, open, high, low, close,
+        volume, average and barCount fields. historicalDataEnd() follows."""
+
+        self.logAnswer(current_fn_name(), vars())
+
+    def historicalTicksArray(self, reqId: int, ticks, done: bool):
+        """Replaces historicalTicks() in columnar mode: NumPy structured
+        array with the time, price and size fields."""
+
+        self.logAnswer(current_fn_name(), vars())
+
+    def historicalTicksBidAskArray(self, reqId: int, ticks, done: bool):
+        """Replaces historicalTicksBidAsk() in columnar mode: NumPy structured
+        array with the time, mask (1: askPastHigh, 2: bidPastLow), priceBid,
+        priceAsk, sizeBid and sizeAsk fields."""
+
+        self.logAnswer(current_fn_name(), vars())
+
+    def historicalTicksLastArray(self, reqId: int, ticks, done: bool):
+        """Replaces historicalTicksLast() in columnar mode: NumPy structured
+        array with the time, mask (1: pastLimit, 2: unreported), price, size,
+        exchange and specialConditions fields."""
+
+        self.logAnswer(current_fn_name(), vars())
@@ -0,0 +1,77 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+The EWriter runs in a separate thread and is responsible for sending the
+outgoing messages.
+The requests made from any thread just append their framed msgs to a deque
+(which is cheaper than a Queue: no lock, the writer is only woken up when it
+is idle); the EWriter takes all the msgs queued so far (up to maxBatchSize)
+and writes them with a single sendmsg() call, so a burst of requests costs a
+few syscalls and lock acquisitions instead of one per request.
+"""
+
+import collections
+import logging
+import socket
+from threading import Thread, Event
+
+from ibapi.utils import HOT_PATH_LOGGING
+
+
+logger = logging.getLogger(__name__)
+
+
+class EWriter(Thread):
+    def __init__(self, conn, maxBatchSize=1024):
+        super().__init__(name="EWriter", daemon=True)
+        self.conn = conn
+        self.pending = collections.deque()
+        self.wakeup = Event()
+        self.done = False
+        # set once run() is over, the msgs can't be sent anymore
+        self.stopped = False
+        self.maxBatchSize = maxBatchSize
+
+    def sendMsg(self, msg: bytes):
+        if self.stopped:
+            raise ConnectionError("EWriter thread not running, msg not sent")
+        self.pending.append(msg)
+        if not self.wakeup.is_set():
+            self.wakeup.set()
+
+    def stop(self):
+        """ the msgs queued so far are still sent """
+        self.done = True
+        self.wakeup.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        try:
+            logger.debug("EWriter thread started")
+            popleft = self.pending.popleft
+            while True:
+                self.wakeup.wait()
+                # cleared before draining: a msg appended from now on sets it again
+                self.wakeup.clear()
+                done = self.done
+                while self.pending:
+                    msgs = [popleft() for _ in range(min(len(self.pending), self.maxBatchSize))]
+                    if HOT_PATH_LOGGING:
+                        logger.debug("writer loop, sending %d msgs", len(msgs))
+                    self.conn.sendMsgs(msgs)
+                if done:
+                    break
+            logger.debug("EWriter thread finished")
+        except socket.error:
+            logger.debug("socket broken, disconnecting")
+            self.conn.disconnect()
+        except:
+            logger.exception('unhandled exception in EWriter thread, disconnecting')
+            self.conn.disconnect()
+        finally:
+            self.stopped = True
@@ -0,0 +1,251 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+
+"""
+A TWS/IBGW stand-in for the protocol level tests and load tests, no network
+or real TWS needed.
+It does the API\\0 v100 handshake and answers startApi with nextValidId and
+managedAccounts, then answers the requests with synthetic traffic:
+    reqMktData          -> TICK_PRICE stream
+    reqTickByTickData   -> TICK_BY_TICK (BidAsk) stream
+    reqMktDepth         -> MARKET_DEPTH_L2 stream
+    reqHistoricalData   -> one HISTORICAL_DATA msg of nBars bars
+    placeOrder          -> ORDER_STATUS Submitted then Filled
+The streams send rate msgs/s each (as fast as possible if rate is 0), up to
+nMsgs msgs each when given; the cancel requests stop them.
+The msgs use the layouts of the latest server version (MAX_CLIENT_VER).
+
+Standalone, eg: python tests/mock_tws.py --port 7497 --rate 50000
+"""
+
+import argparse
+import logging
+import socketserver
+import struct
+import threading
+import time
+
+from ibapi import comm
+from ibapi.message import IN, OUT
+from ibapi.server_versions import MAX_CLIENT_VER
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_msg(*vals) -> bytes:
+    return comm.make_msg("".join(comm.make_field(val) for val in vals))
+
+
+class Stream:
+    """ one market data subscription of a session """
+
+    def __init__(self, reqId, makeMsg, nMsgs):
+        self.reqId = reqId
+        self.makeMsg = makeMsg
+        self.nMsgs = nMsgs
+        self.nSent = 0
+
+    def next(self) -> bytes:
+        self.nSent += 1
+        return self.makeMsg(self.reqId, self.nSent)
+
+    def done(self) -> bool:
+        return self.nMsgs is not None and self.nSent >= self.nMsgs
+
+
+class MockSession(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.tws = self.server.tws
+        self.streams = {}   # (OUT msgId of the request, reqId) -> Stream
+        self.lock = threading.Lock()
+        self.done = False
+
+    def recvExactly(self, size) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise EOFError
+            data += chunk
+        return data
+
+    def recvFields(self) -> list:
+        size = struct.unpack("!I", self.recvExactly(4))[0]
+        return [field.decode() for field in comm.read_fields(self.recvExactly(size))]
+
+    def send(self, data: bytes):
+        with self.lock:
+            self.request.sendall(data)
+
+    def handle(self):
+        try:
+            if self.recvExactly(4) != b"API\0":
+                logger.error("no API prefix")
+                return
+            self.recvFields()   # the "v100..MAX" version range
+            self.send(make_msg(self.tws.serverVersion, "20190101 00:00:00 EST"))
+
+            fields = self.recvFields()
+            if int(fields[0]) != OUT.START_API:
+                logger.error("startApi expected, got %s", fields)
+                return
+            self.send(make_msg(IN.NEXT_VALID_ID, 1, 1)
+                      + make_msg(IN.MANAGED_ACCTS, 1, "DU123456"))
+
+            streamer = threading.Thread(target=self.runStreams, daemon=True)
+            streamer.start()
+            while True:
+                self.onRequest(self.recvFields())
+        except (EOFError, OSError):
+            pass
+        finally:
+            self.done = True
+
+    def onRequest(self, fields):
+        tws = self.tws
+        msgId = int(fields[0])
+        tws.requests.append(fields)
+        if msgId == OUT.REQ_MKT_DATA:
+            self.addStream(msgId, int(fields[2]), tws.makeTickPrice)
+        elif msgId == OUT.REQ_TICK_BY_TICK_DATA:
+            self.addStream(msgId, int(fields[1]), tws.makeTickByTick)
+        elif msgId == OUT.REQ_MKT_DEPTH:
+            self.addStream(msgId, int(fields[2]), tws.makeMarketDepthL2)
+        elif msgId == OUT.CANCEL_MKT_DATA:
+            self.removeStream(OUT.REQ_MKT_DATA, int(fields[2]))
+        elif msgId == OUT.CANCEL_TICK_BY_TICK_DATA:
+            self.removeStream(OUT.REQ_TICK_BY_TICK_DATA, int(fields[1]))
+        elif msgId == OUT.CANCEL_MKT_DEPTH:
+            self.removeStream(OUT.REQ_MKT_DEPTH, int(fields[2]))
+        elif msgId == OUT.REQ_HISTORICAL_DATA:
+            self.send(tws.makeHistoricalData(int(fields[1])))
+        elif msgId == OUT.PLACE_ORDER:
+            orderId = int(fields[1])
+            self.send(tws.makeOrderStatus(orderId, "Submitted", 0)
+                      + tws.makeOrderStatus(orderId, "Filled", 100))
+
+    def addStream(self, msgId, reqId, makeMsg):
+        with self.lock:
+            self.streams[(msgId, reqId)] = Stream(reqId, makeMsg, self.tws.nMsgs)
+
+    def removeStream(self, msgId, reqId):
+        with self.lock:
+            self.streams.pop((msgId, reqId), None)
+
+    def runStreams(self):
+        """ sends one msg per stream per round, each round paced by rate and
+        the msgs of about 1ms worth of rounds written at once """
+        rate = self.tws.rate
+        startTime = time.perf_counter()
+        nRounds = 0
+        while not self.done:
+            with self.lock:
+                streams = [stream for stream in self.streams.values() if not stream.done()]
+            if not streams:
+                time.sleep(0.001)
+                startTime = time.perf_counter()
+                nRounds = 0
+                continue
+
+            nBatchRounds = max(1, rate // 1000) if rate > 0 else 100
+            data = b"".join(stream.next() for _ in range(nBatchRounds)
+                            for stream in streams if not stream.done())
+            nRounds += nBatchRounds
+            try:
+                self.send(data)
+            except OSError:
+                break
+            if rate > 0:
+                delay = startTime + nRounds / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+
+class MockServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class MockTWS:
+    def __init__(self, host="127.0.0.1", port=0, serverVersion=MAX_CLIENT_VER,
+                 rate=0, nMsgs=None, nBars=100, timestampsNs=False):
+        self.serverVersion = serverVersion
+        self.rate = rate
+        self.nMsgs = nMsgs
+        self.nBars = nBars
+        # the TICK_BY_TICK time is the send time in ns instead of s, for the
+        # latency measurements
+        self.timestampsNs = timestampsNs
+        self.requests = []   # the fields of all the requests received
+        self.server = MockServer((host, port), MockSession)
+        self.server.tws = self
+        self.host = host
+        self.port = self.server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def makeTickPrice(self, reqId, seq):
+        # tickType 1 (bid), attrMask 0
+        return make_msg(IN.TICK_PRICE, 6, reqId, 1, 100. + (seq % 100) / 100., 100 + seq % 7, 0)
+
+    def makeTickByTick(self, reqId, seq):
+        stamp = time.time_ns() if self.timestampsNs else int(time.time())
+        bid = 100. + (seq % 100) / 100.
+        return make_msg(IN.TICK_BY_TICK, reqId, 3, stamp, bid, bid + 0.01, 100, 200, 0)
+
+    def makeMarketDepthL2(self, reqId, seq):
+        # operation 0 (insert) for the first 10 levels of each side, 1 (update) after
+        position = seq % 10
+        operation = 0 if seq <= 20 else 1
+        side = (seq // 10) % 2
+        price = 100. + (position + 1) / 100. * (1 if side == 0 else -1)
+        return make_msg(IN.MARKET_DEPTH_L2, 1, reqId, position, "MM%d" % (seq % 3),
+                        operation, side, price, 100 + seq % 50, False)
+
+    def makeHistoricalData(self, reqId):
+        vals = [IN.HISTORICAL_DATA, reqId, "20190101 00:00:00", "20190102 00:00:00", self.nBars]
+        for idx in range(self.nBars):
+            vals += [str(1546300800 + 60 * idx), 100., 101., 99., 100.5, 1000 + idx, 100.2, 10]
+        return make_msg(*vals)
+
+    def makeOrderStatus(self, orderId, status, filled):
+        return make_msg(IN.ORDER_STATUS, orderId, status, filled, 100 - filled,
+                        100. if filled else 0., 1000 + orderId, 0,
+                        100. if filled else 0., 0, "", 0.)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TWS stand-in serving synthetic traffic")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7497)
+    parser.add_argument("--rate", type=int, default=1000,
+                        help="msgs/s per subscription, 0 for as fast as possible")
+    parser.add_argument("--nMsgs", type=int, default=None,
+                        help="msgs per subscription, no limit by default")
+    parser.add_argument("--nBars", type=int, default=100, help="bars per historical data answer")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    tws = MockTWS(args.host, args.port, rate=args.rate, nMsgs=args.nMsgs, nBars=args.nBars)
+    logger.info("mock TWS listening on %s:%d", tws.host, tws.port)
+    tws.server.serve_forever()
+
+
+if "__main__" == __name__:
+    main()
@@ -0,0 +1,93 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import asyncio
+import struct
+
+from ibapi import comm
+from ibapi.async_client import AsyncEClient
+from ibapi.message import IN, OUT
+from ibapi.server_versions import MAX_CLIENT_VER
+from ibapi.wrapper import EWrapper
+from ibapi.connection import SocketOptions
+
+
+class RecordingWrapper(EWrapper):
+    def __init__(self):
+        EWrapper.__init__(self)
+        self.answers = []
+
+    def connectAck(self):
+        self.answers.append(("connectAck", ))
+
+    def tickSize(self, reqId, tickType, size):
+        self.answers.append(("tickSize", reqId, tickType, size))
+
+    def connectionClosed(self):
+        self.answers.append(("connectionClosed", ))
+
+
+async def readMsg(reader):
+    size = struct.unpack("!I", await reader.readexactly(4))[0]
+    return comm.read_fields(await reader.readexactly(size))
+
+
+async def serve(reader, writer):
+    """ the bare minimum of TWS: handshake, startApi then one tick """
+    assert await reader.readexactly(4) == b"API\0"
+    await readMsg(reader)
+    writer.write(comm.make_msg(comm.make_field(MAX_CLIENT_VER)
+                               + comm.make_field("20190101 00:00:00 EST")))
+
+    fields = await readMsg(reader)
+    assert int(fields[0]) == OUT.START_API
+    writer.write(comm.make_msg("".join(comm.make_field(val) for val in
+                                       (IN.TICK_SIZE, 6, 1001, 0, 300))))
+    await writer.drain()
+    writer.close()
+
+
+class AsyncClientTestCase(unittest.TestCase):
+    async def session(self, socketOptions=None):
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        wrapper = RecordingWrapper()
+        client = AsyncEClient(wrapper)
+        await client.connect("127.0.0.1", port, 0, socketOptions)
+        self.assertEqual(client.serverVersion(), MAX_CLIENT_VER)
+        await asyncio.wait_for(client.run(), 5)
+
+        server.close()
+        await server.wait_closed()
+        return wrapper.answers
+
+    def test_session(self):
+        answers = asyncio.run(self.session())
+        self.assertEqual(answers, [("connectAck", ), ("tickSize", 1001, 0, 300),
+                                   ("connectionClosed", )])
+
+    def test_unsupported_options(self):
+        client = AsyncEClient(RecordingWrapper())
+        for (setter, val) in (("setReaderBufferSize", 1 << 16), ("setMsgBatchSize", 64),
+                              ("setEventDriven", True), ("setUseWriter", True),
+                              ("setConflation", True), ("setPriorityLanes", True),
+                              ("setSessionManager", object()), ("setRecordFile", "msgs.rec")):
+            self.assertRaises(ValueError, getattr(client, setter), val)
+        # the defaults are fine
+        client.setUseWriter(False)
+        client.setRecordFile(None)
+        self.assertFalse(client.useWriter)
+        self.assertIsNone(client.recordFile)
+
+    def test_session_socket_options(self):
+        answers = asyncio.run(self.session(SocketOptions(rcvBuf=1 << 16, noDelay=True)))
+        self.assertEqual(answers, [("connectAck", ), ("tickSize", 1001, 0, 300),
+                                   ("connectionClosed", )])
+
+
+if "__main__" == __name__:
+    unittest.main()
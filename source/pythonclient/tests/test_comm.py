@@ -6,6 +6,8 @@ Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is su
 import unittest
 import struct
 from ibapi import comm
+from ibapi.common import UNSET_INTEGER, UNSET_DOUBLE
+from ibapi.utils import ClientException
 
 
 class CommTestCase(unittest.TestCase):
@@ -61,6 +63,61 @@ class CommTestCase(unittest.TestCase):
         self.assertEqual(fields[1].decode(), text2)        
 
 
+    def test_read_fields_batch(self):
+        msgs = [comm.make_field("ABCD") + comm.make_field(""), "",
+                comm.make_field(123)]
+
+        batch = comm.read_fields_batch([msg.encode() for msg in msgs])
+
+        self.assertEqual(batch, [comm.read_fields(msg) for msg in msgs])
+        self.assertEqual(batch, [[b"ABCD", b""], [], [b"123"]])
+        self.assertEqual(comm.read_fields_batch(msgs), batch, "str msgs not split")
+
+
+    def test_read_msgs_from(self):
+        buf = bytearray(comm.make_msg("ABCD") + comm.make_msg("EF") + comm.make_msg("GHI")[:5])
+        view = memoryview(buf)
+
+        (msgs, start) = comm.read_msgs_from(view, 0, len(buf))
+
+        self.assertEqual(msgs, [b"ABCD", b"EF"], "msgs not good")
+        self.assertEqual(start, 14, "incomplete msg should not be consumed")
+
+
+    def test_out_message(self):
+        vals = (1, 11, 123456789, "SMART", "AAPL", "", 1.25, True, False,
+                UNSET_INTEGER, UNSET_DOUBLE)
+        text = "".join(comm.make_field(val) for val in vals) \
+               + comm.make_field_handle_empty(UNSET_DOUBLE)
+
+        msg = comm.OutMessage()
+        for val in vals:
+            msg.addField(val)
+        msg.addFieldHandleEmpty(UNSET_DOUBLE)
+
+        self.assertEqual(msg.toBytes(), comm.make_msg(text), "msg not good")
+
+        msg.reset()
+        msg.addField("ABCD")
+        self.assertEqual(msg.toBytes(), comm.make_msg("ABCD\0"), "reset msg not good")
+
+
+    def test_out_message_signed_zero(self):
+        msg = comm.OutMessage()
+        for val in (0.0, -0.0, 0, 0.0):
+            msg.addField(val)
+
+        self.assertEqual(msg.toBytes(), comm.make_msg("0.0\0-0.0\0" "0\0" "0.0\0"))
+        self.assertEqual(comm.encode_field(-0.0), b"-0.0\0")
+
+
+    def test_out_message_invalid_symbol(self):
+        msg = comm.OutMessage()
+
+        self.assertRaises(ClientException, msg.addField, "AB\u00e9")
+        self.assertRaises(ValueError, msg.addField, None)
+
+
 if "__main__" == __name__:
     unittest.main()
         
@@ -0,0 +1,42 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import pickle
+
+from ibapi.common import *  # @UnusedWildImport
+
+
+class CommonTestCase(unittest.TestCase):
+    slotted = (BarData, RealTimeBar, HistoricalTick, HistoricalTickBidAsk,
+               HistoricalTickLast, TickAttrib, TickAttribBidAsk, TickAttribLast)
+
+    def test_slots(self):
+        for cls in self.slotted:
+            obj = cls()
+            self.assertFalse(hasattr(obj, "__dict__"), cls.__name__)
+            with self.assertRaises(AttributeError):
+                obj.notAnAttribute = 1
+            str(obj)
+
+    def test_pickle(self):
+        tick = HistoricalTickLast()
+        tick.price = 10.25
+        tick.tickAttribLast.unreported = True
+
+        tick2 = pickle.loads(pickle.dumps(tick))
+
+        self.assertEqual(tick2.price, 10.25)
+        self.assertTrue(tick2.tickAttribLast.unreported)
+
+    def test_not_slotted(self):
+        # the other value types keep their instance dict
+        obj = NewsProvider()
+        obj.extra = 1
+        self.assertEqual(obj.extra, 1)
+
+
+if "__main__" == __name__:
+    unittest.main()
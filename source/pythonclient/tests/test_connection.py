@@ -0,0 +1,138 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import socket
+import threading
+import time
+from unittest import mock
+
+import queue
+
+from ibapi import connection
+from ibapi.connection import Connection, SocketOptions
+from ibapi.reader import EReader
+
+
+class ConnectionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+
+
+    def tearDown(self):
+        self.server.close()
+
+
+    def connect(self, socketOptions=None, eventDriven=False):
+        conn = Connection("127.0.0.1", self.server.getsockname()[1], socketOptions, eventDriven)
+        conn.connect()
+        (peer, _) = self.server.accept()
+        self.addCleanup(peer.close)
+        return (conn, peer)
+
+
+    def test_socket_options(self):
+        (conn, _) = self.connect(SocketOptions(rcvBuf=1 << 16, sndBuf=1 << 16, noDelay=True))
+
+        self.assertTrue(conn.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        self.assertGreaterEqual(conn.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF), 1 << 16)
+        conn.disconnect()
+
+
+    def test_recv_msg_read_size(self):
+        (conn, peer) = self.connect(SocketOptions(readSize=7))
+        data = bytes(range(40))
+        peer.sendall(data)
+
+        buf = b""
+        while len(buf) < len(data):
+            buf += conn.recvMsg()
+
+        self.assertEqual(buf, data)
+        conn.disconnect()
+
+
+    def test_event_driven_recv(self):
+        (conn, peer) = self.connect(SocketOptions(readSize=8), eventDriven=True)
+        data = bytes(range(16))   # exactly twice the read size
+        peer.sendall(data)
+
+        buf = b""
+        while len(buf) < len(data):
+            buf += conn.recvMsg()
+
+        self.assertEqual(buf, data)
+        conn.disconnect()
+
+
+    def test_event_driven_disconnect_wakes_reader(self):
+        (conn, _) = self.connect(eventDriven=True)
+        received = []
+        reader = threading.Thread(target=lambda: received.append(conn.recvMsg()))
+        reader.start()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        conn.disconnect()
+        reader.join(1)
+
+        self.assertFalse(reader.is_alive(), "reader still blocked")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(received, [b""])
+        self.assertIsNone(conn.selector)
+
+
+    def test_event_driven_peer_close(self):
+        (conn, peer) = self.connect(eventDriven=True)
+        (selector, wakeupRecv, wakeupSend) = (conn.selector, conn.wakeupRecv, conn.wakeupSend)
+        msg_queue = queue.Queue()
+        reader = EReader(conn, msg_queue, eventDriven=True)
+        reader.start()
+        peer.close()
+        reader.join(5)
+
+        self.assertFalse(reader.is_alive(), "reader still running")
+        self.assertIsNone(msg_queue.get_nowait())
+        self.assertFalse(conn.isConnected())
+        self.assertIsNone(conn.selector)
+        self.assertIsNone(selector.get_map(), "selector left open")
+        self.assertEqual((wakeupRecv.fileno(), wakeupSend.fileno()), (-1, -1),
+                         "wakeup socket pair left open")
+
+
+    def test_send_msgs(self):
+        (conn, peer) = self.connect(SocketOptions(sndBuf=4096))
+        msgs = [bytes([idx]) * 1000 for idx in range(200)]
+        received = []
+
+        def read():
+            total = sum(len(msg) for msg in msgs)
+            while sum(map(len, received)) < total:
+                received.append(peer.recv(total))
+        reader = threading.Thread(target=read)
+        reader.start()
+
+        self.assertEqual(conn.sendMsgs(msgs), 200 * 1000)
+        reader.join(5)
+        self.assertEqual(b"".join(received), b"".join(msgs))
+        conn.disconnect()
+
+
+    def test_send_msgs_without_sendmsg(self):
+        (conn, peer) = self.connect()
+        msgs = [bytes([idx]) * 100 for idx in range(20)]
+        with mock.patch.object(connection, "HAS_SENDMSG", False):
+            self.assertEqual(conn.sendMsgs(msgs), 20 * 100)
+        received = b""
+        while len(received) < 20 * 100:
+            received += peer.recv(4096)
+        self.assertEqual(received, b"".join(msgs))
+        conn.disconnect()
+
+
+if "__main__" == __name__:
+    unittest.main()
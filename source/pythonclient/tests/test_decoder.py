@@ -0,0 +1,232 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import ibapi
+from ibapi import comm
+from ibapi import columnar
+from ibapi.decoder import Decoder
+from ibapi.message import IN
+from ibapi.server_versions import *  # @UnusedWildImport
+from ibapi.utils import BadMessage
+from ibapi.wrapper import EWrapper
+
+
+class RecordingWrapper(EWrapper):
+    """ records the wrapper methods called by the decoder """
+    def __init__(self):
+        EWrapper.__init__(self)
+        self.answers = []
+
+    def __getattribute__(self, name):
+        if name in ("answers", "__dict__") or not hasattr(EWrapper, name):
+            return object.__getattribute__(self, name)
+        return lambda *args: self.answers.append((name, ) + args)
+
+
+def make_fields(*vals):
+    return comm.read_fields(comm.make_msg("".join(comm.make_field(val) for val in vals))[4:])
+
+
+class DecoderTestCase(unittest.TestCase):
+    def interpret(self, serverVersion, *vals, columnar=False):
+        wrapper = RecordingWrapper()
+        decoder = Decoder(wrapper, None)
+        decoder.columnar = columnar
+        decoder.setServerVersion(serverVersion)
+        decoder.interpret(make_fields(*vals))
+        return wrapper.answers
+
+    def test_tick_price(self):
+        answers = self.interpret(MAX_CLIENT_VER, IN.TICK_PRICE, 6, 1, 1, 9.5, 300, 3)
+        self.assertEqual(answers[0][0:4], ("tickPrice", 1, 1, 9.5))
+        self.assertTrue(answers[0][4].canAutoExecute)
+        self.assertTrue(answers[0][4].pastLimit)
+        self.assertEqual(answers[1], ("tickSize", 1, 0, 300))
+
+    def test_order_status(self):
+        answers = self.interpret(MAX_CLIENT_VER, IN.ORDER_STATUS, 7, "Filled", 100, 0,
+                                 9.5, 1234, 0, 9.5, 3, "", 0.)
+        self.assertEqual(answers, [("orderStatus", 7, "Filled", 100., 0., 9.5, 1234,
+                                    0, 9.5, 3, "", 0.)])
+
+        answers = self.interpret(MIN_SERVER_VER_MARKET_CAP_PRICE - 1, IN.ORDER_STATUS, 6, 7,
+                                 "Filled", 100, 0, 9.5, 1234, 0, 9.5, 3, "")
+        self.assertEqual(answers[0][-1], None)
+
+    def test_historical_data(self):
+        bars = (("20190102", 1.5, 2.5, 0.5, 2, 100, 1.75, 10),
+                ("20190103", 2, 3, 1, 2.5, "", 2.25, 20))
+        answers = self.interpret(MAX_CLIENT_VER, IN.HISTORICAL_DATA, 5, "start", "end",
+                                 len(bars), *[val for bar in bars for val in bar])
+        self.assertEqual([answer[0:2] for answer in answers[:-1]],
+                         [("historicalData", 5)] * 2)
+        self.assertEqual(answers[0][2].date, "20190102")
+        self.assertEqual(answers[0][2].high, 2.5)
+        self.assertEqual(answers[1][2].volume, 0)
+        self.assertEqual(answers[1][2].barCount, 20)
+        self.assertEqual(answers[-1], ("historicalDataEnd", 5, "start", "end"))
+
+        # before synthetic real time bars there is a version and a hasGaps per bar
+        answers = self.interpret(MIN_SERVER_VER_SYNT_REALTIME_BARS - 1, IN.HISTORICAL_DATA,
+                                 3, 5, "start", "end", 1,
+                                 "20190102", 1.5, 2.5, 0.5, 2, 100, 1.75, "false", 10)
+        self.assertEqual(answers[0][2].barCount, 10)
+
+    def test_historical_ticks_last(self):
+        answers = self.interpret(MAX_CLIENT_VER, IN.HISTORICAL_TICKS_LAST, 9, 2,
+                                 1546300800, 2, 10.25, 100, "ARCA", "",
+                                 1546300801, 1, 10.5, 200, "NYSE", "I", 1)
+        (name, reqId, ticks, done) = answers[0]
+        self.assertEqual((name, reqId, done), ("historicalTicksLast", 9, True))
+        self.assertEqual([(tick.time, tick.price, tick.size, tick.exchange) for tick in ticks],
+                         [(1546300800, 10.25, 100, "ARCA"), (1546300801, 10.5, 200, "NYSE")])
+        self.assertTrue(ticks[0].tickAttribLast.unreported)
+        self.assertTrue(ticks[1].tickAttribLast.pastLimit)
+
+    def test_market_depth_l2(self):
+        answers = self.interpret(MAX_CLIENT_VER, IN.MARKET_DEPTH_L2, 1, 4, 0, "MM1", 0, 1, 9.5, 100, 1)
+        self.assertEqual(answers, [("updateMktDepthL2", 4, 0, "MM1", 0, 1, 9.5, 100, True)])
+
+    def test_signature_dispatch(self):
+        self.assertEqual(self.interpret(MAX_CLIENT_VER, IN.TICK_SIZE, 6, 1, 8, 300),
+                         [("tickSize", 1, 8, 300)])
+        self.assertEqual(self.interpret(MAX_CLIENT_VER, IN.TICK_STRING, 6, 1, 45, "caf\\xe9"),
+                         [("tickString", 1, 45, "caf\xe9")])
+        self.assertEqual(self.interpret(MAX_CLIENT_VER, IN.ERR_MSG, 2, 1, 200, "No security"),
+                         [("error", 1, 200, "No security")])
+        self.assertEqual(self.interpret(MAX_CLIENT_VER, IN.MARKET_DEPTH, 1, 4, 0, 1, 0, 9.5, 100),
+                         [("updateMktDepth", 4, 0, 1, 0, 9.5, 100)])
+        # a field too many: dropped
+        self.assertEqual(self.interpret(MAX_CLIENT_VER, IN.TICK_SIZE, 6, 1, 8, 300, 1), [])
+
+    def test_bad_message(self):
+        with self.assertRaises(BadMessage):
+            self.interpret(MAX_CLIENT_VER, IN.HISTORICAL_TICKS, 9, 2, 1546300800, 0, 10.25)
+
+    @unittest.skipIf(not columnar.HAS_NUMPY, "needs numpy")
+    def test_columnar_historical_data(self):
+        bars = (("20190102", 1.5, 2.5, 0.5, 2, 100, 1.75, 10),
+                ("20190103", 2, 3, 1, 2.5, "", 2.25, 20))
+        answers = self.interpret(MAX_CLIENT_VER, IN.HISTORICAL_DATA, 5, "start", "end",
+                                 len(bars), *[val for bar in bars for val in bar], columnar=True)
+        (name, reqId, array) = answers[0]
+        self.assertEqual((name, reqId), ("historicalDataArray", 5))
+        self.assertEqual(list(array["date"]), ["20190102", "20190103"])
+        self.assertEqual(list(array["high"]), [2.5, 3.])
+        self.assertEqual(list(array["volume"]), [100, 0])
+        self.assertEqual(answers[1], ("historicalDataEnd", 5, "start", "end"))
+
+    @unittest.skipIf(not columnar.HAS_NUMPY, "needs numpy")
+    def test_columnar_historical_ticks_last(self):
+        answers = self.interpret(MAX_CLIENT_VER, IN.HISTORICAL_TICKS_LAST, 9, 2,
+                                 1546300800, 2, 10.25, 100, "ARCA", "",
+                                 1546300801, 1, 10.5, 200, "NYSE", "I", 1, columnar=True)
+        (name, reqId, ticks, done) = answers[0]
+        self.assertEqual((name, reqId, done), ("historicalTicksLastArray", 9, True))
+        self.assertEqual(list(ticks["time"]), [1546300800, 1546300801])
+        self.assertEqual(list(ticks["mask"]), [2, 1])
+        self.assertEqual(list(ticks["exchange"]), ["ARCA", "NYSE"])
+        self.assertEqual(list(ticks["specialConditions"]), ["", "I"])
+
+    def test_skip_unhandled(self):
+        class TickSizeWrapper(EWrapper):
+            def __init__(self):
+                EWrapper.__init__(self)
+                self.answers = []
+
+            def tickSize(self, reqId, tickType, size):
+                self.answers.append(("tickSize", reqId, tickType, size))
+
+        wrapper = TickSizeWrapper()
+        decoder = Decoder(wrapper, MAX_CLIENT_VER)
+        decoder.setSkipUnhandled(True)
+        self.assertIn(IN.TICK_STRING, decoder.skippedMsgIds, "tickString is not handled")
+        self.assertNotIn(IN.TICK_PRICE, decoder.skippedMsgIds, "it may call tickSize")
+        self.assertNotIn(IN.ERR_MSG, decoder.skippedMsgIds, "errors are always processed")
+
+        decoder.interpret(make_fields(IN.NEWS_BULLETINS, 1, 7, 1, "news", "NYSE"))
+        decoder.interpret(make_fields(IN.TICK_SIZE, 6, 1, 0, 300))
+        decoder.interpret(make_fields(IN.NEWS_BULLETINS, 1, 8, 1, "news", "NYSE"))
+        self.assertEqual(wrapper.answers, [("tickSize", 1, 0, 300)])
+        self.assertEqual(decoder.nSkipped, {IN.NEWS_BULLETINS: 2})
+
+    def test_numpy_imported_on_use(self):
+        code = ("import sys; import ibapi.client, ibapi.decoder; "
+                "print('numpy' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True,
+                             text=True, cwd=os.path.dirname(os.path.dirname(ibapi.__file__)))
+        self.assertEqual(out.stdout.strip(), "False", "numpy imported by the client")
+
+    @unittest.skipIf(not columnar.HAS_NUMPY, "needs numpy")
+    def test_skip_unhandled_columnar(self):
+        class TicksArrayWrapper(EWrapper):
+            def __init__(self):
+                EWrapper.__init__(self)
+                self.answers = []
+
+            def historicalTicksArray(self, reqId, ticks, done):
+                self.answers.append(("historicalTicksArray", reqId, len(ticks), done))
+
+            def historicalTicksBidAskArray(self, reqId, ticks, done):
+                self.answers.append(("historicalTicksBidAskArray", reqId, len(ticks), done))
+
+            def historicalTicksLastArray(self, reqId, ticks, done):
+                self.answers.append(("historicalTicksLastArray", reqId, len(ticks), done))
+
+        wrapper = TicksArrayWrapper()
+        decoder = Decoder(wrapper, MAX_CLIENT_VER)
+        decoder.columnar = True
+        decoder.setSkipUnhandled(True)
+        for msgId in (IN.HISTORICAL_TICKS, IN.HISTORICAL_TICKS_BID_ASK, IN.HISTORICAL_TICKS_LAST):
+            self.assertNotIn(msgId, decoder.skippedMsgIds)
+
+        decoder.interpret(make_fields(IN.HISTORICAL_TICKS, 1, 1, 1546300800, 0, 9.5, 100, 1))
+        decoder.interpret(make_fields(IN.HISTORICAL_TICKS_BID_ASK, 2, 1, 1546300800, 0,
+                                      9.5, 9.6, 100, 200, 1))
+        decoder.interpret(make_fields(IN.HISTORICAL_TICKS_LAST, 3, 1, 1546300800, 0, 9.5, 100,
+                                      "ARCA", "", 1))
+        self.assertEqual(wrapper.answers, [("historicalTicksArray", 1, 1, True),
+                                           ("historicalTicksBidAskArray", 2, 1, True),
+                                           ("historicalTicksLastArray", 3, 1, True)])
+        self.assertEqual(decoder.nSkipped, {})
+
+    def test_handlers(self):
+        class BarsHandler:
+            def __init__(self):
+                self.answers = []
+
+            def tickSize(self, reqId, tickType, size):
+                self.answers.append(("tickSize", reqId, tickType, size))
+
+            def historicalDataUpdate(self, reqId, bar):
+                self.answers.append(("historicalDataUpdate", reqId, bar.close))
+
+        wrapper = RecordingWrapper()
+        handler = BarsHandler()
+        decoder = Decoder(wrapper, MAX_CLIENT_VER)
+        decoder.registerHandler(2, handler)
+
+        decoder.interpret(make_fields(IN.TICK_SIZE, 6, 1, 0, 300))
+        decoder.interpret(make_fields(IN.TICK_SIZE, 6, 2, 0, 400))
+        decoder.interpret(make_fields(IN.HISTORICAL_DATA_UPDATE, 2, -1, "20190102",
+                                      1.5, 2, 2.5, 0.5, 1.75, 100))
+        decoder.interpret(make_fields(IN.ERR_MSG, 2, 2, 162, "pacing"))
+        decoder.unregisterHandler(2)
+        decoder.interpret(make_fields(IN.TICK_SIZE, 6, 2, 0, 500))
+
+        self.assertEqual(handler.answers, [("tickSize", 2, 0, 400),
+                                           ("historicalDataUpdate", 2, 2.)])
+        self.assertEqual(wrapper.answers, [("tickSize", 1, 0, 300),
+                                           ("error", 2, 162, "pacing"),
+                                           ("tickSize", 2, 0, 500)])
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import socketserver
+import threading
+
+from ibapi import comm
+from ibapi.client import EClient
+from ibapi.decoder import Decoder
+from ibapi.executor import CallbackExecutor, ShardedWrapper
+from ibapi.message import IN
+from ibapi.server_versions import MAX_CLIENT_VER
+from ibapi.wrapper import EWrapper
+
+
+def make_fields(*vals):
+    return comm.read_fields("".join(comm.make_field(val) for val in vals).encode())
+
+
+class ThreadsWrapper(EWrapper):
+    def __init__(self):
+        EWrapper.__init__(self)
+        self.lock = threading.Lock()
+        self.answers = []
+
+    def tickSize(self, reqId, tickType, size):
+        with self.lock:
+            self.answers.append((threading.current_thread().name, reqId, size))
+
+    def updateAccountTime(self, timeStamp):
+        with self.lock:
+            self.answers.append((threading.current_thread().name, None, timeStamp))
+
+    def orderStatus(self, orderId, status, *args):
+        with self.lock:
+            self.answers.append((threading.current_thread().name, orderId, status))
+
+    def execDetails(self, reqId, contract, execution):
+        with self.lock:
+            self.answers.append((threading.current_thread().name, reqId, execution))
+
+
+class HangUp(socketserver.BaseRequestHandler):
+    """ closes the connection right after the API prefix """
+
+    def handle(self):
+        self.request.recv(4)
+
+
+class ExecutorTestCase(unittest.TestCase):
+    def test_sharding(self):
+        wrapper = ThreadsWrapper()
+        decoder = Decoder(wrapper, None)
+        executor = CallbackExecutor(2)
+        executor.start()
+        decoder.setExecutor(executor)
+        decoder.setServerVersion(MAX_CLIENT_VER)
+
+        for size in range(100):
+            for reqId in (1, 2, 3):
+                decoder.interpret(make_fields(IN.TICK_SIZE, 6, reqId, 0, size))
+        decoder.interpret(make_fields(IN.ACCT_UPDATE_TIME, 1, "12:00"))
+        executor.stop()
+
+        self.assertEqual(len(wrapper.answers), 301)
+        for reqId in (1, 2, 3):
+            answers = [answer for answer in wrapper.answers if answer[1] == reqId]
+            self.assertEqual([size for (_, _, size) in answers], list(range(100)),
+                             "order lost for reqId %d" % reqId)
+            self.assertEqual(len({thread for (thread, _, _) in answers}), 1,
+                             "reqId %d not pinned to one worker" % reqId)
+        threads = {reqId: thread for (thread, reqId, _) in wrapper.answers}
+        self.assertNotEqual(threads[1], threads[2])
+        self.assertNotEqual(threads[1], threading.current_thread().name)
+
+
+    def test_order_callbacks(self):
+        wrapper = ThreadsWrapper()
+        executor = CallbackExecutor(4)
+        executor.start()
+        sharded = ShardedWrapper(wrapper, executor)
+        for idx in range(20):
+            # the orderId and the reqExecutions() reqId of the same order
+            sharded.orderStatus(idx, "Submitted")
+            sharded.execDetails(1000 + idx, None, idx)
+            sharded.orderStatus(idx, "Filled")
+        executor.stop()
+
+        self.assertEqual([status for (_, _, status) in wrapper.answers],
+                         [status for idx in range(20) for status in ("Submitted", idx, "Filled")],
+                         "order lost between the order and execution callbacks")
+        self.assertEqual(len({thread for (thread, _, _) in wrapper.answers}), 1)
+
+
+    def test_failed_handshake(self):
+        server = socketserver.TCPServer(("127.0.0.1", 0), HangUp)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = EClient(EWrapper())
+            client.setCallbackWorkers(4)
+            for _ in range(3):
+                client.connect("127.0.0.1", server.server_address[1], 0)
+                self.assertFalse(client.isConnected())
+                self.assertIsNone(client.executor)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual([thread.name for thread in threading.enumerate()
+                          if thread.name.startswith("CallbackWorker")], [],
+                         "callback workers left running")
+
+
+if "__main__" == __name__:
+    unittest.main()
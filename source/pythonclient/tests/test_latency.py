@@ -0,0 +1,86 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import threading
+import time
+import unittest
+
+from ibapi.client import EClient
+from ibapi.latency import Histogram, LatencyMonitor, STAGES
+from ibapi.wrapper import EWrapper
+
+from mock_tws import MockTWS
+from test_mock_tws import make_contract
+
+
+class App(EWrapper, EClient):
+    def __init__(self, nTicks):
+        EWrapper.__init__(self)
+        EClient.__init__(self, wrapper=self)
+        self.nTicks = nTicks
+        self.nReceived = 0
+        self.started = threading.Event()
+        self.allReceived = threading.Event()
+
+    def nextValidId(self, orderId):
+        self.started.set()
+
+    def tickPrice(self, reqId, tickType, price, attrib):
+        time.sleep(0.0001)
+        self.nReceived += 1
+        if self.nReceived == self.nTicks:
+            self.allReceived.set()
+
+
+class LatencyTestCase(unittest.TestCase):
+    def test_histogram(self):
+        histogram = Histogram()
+        for value in range(1, 100001):
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 100000)
+        self.assertEqual((histogram.min, histogram.max), (1, 100000))
+        self.assertAlmostEqual(histogram.mean(), 50000.5)
+        for pct in (50, 90, 99, 99.9):
+            expected = 100000 * pct / 100
+            self.assertLessEqual(abs(histogram.percentile(pct) - expected) / expected, 0.04)
+        self.assertEqual(histogram.percentile(100), 100000)
+
+        for value in (0, 1, 63, 64, 65, 1000, 123456789):
+            idx = Histogram.bucketIndex(value)
+            self.assertGreaterEqual(Histogram.bucketHigh(idx), value)
+            if idx > 0:
+                self.assertLess(Histogram.bucketHigh(idx - 1), value)
+
+
+    def test_monitor(self):
+        nTicks = 500
+        monitor = LatencyMonitor(depthSampleEvery=1)
+        with MockTWS(nMsgs=nTicks) as tws:
+            app = App(nTicks)
+            app.setLatencyMonitor(monitor)
+            app.connect("127.0.0.1", tws.port, 0)
+            thread = threading.Thread(target=app.run, daemon=True)
+            thread.start()
+            self.assertTrue(app.started.wait(5), "nextValidId not received")
+            app.reqMktData(1, make_contract(), "", False, False, [])
+            self.assertTrue(app.allReceived.wait(10), "missing ticks")
+            app.disconnect()
+            thread.join(5)
+
+        snapshot = monitor.snapshot()
+        ticks = snapshot["msgs"]["TICK_PRICE"]
+        self.assertEqual(set(ticks), set(STAGES))
+        for stage in STAGES:
+            self.assertEqual(ticks[stage]["count"], nTicks, stage)
+        # the callback sleeps 100us
+        self.assertGreaterEqual(ticks["callback"]["p50"], 100000)
+        self.assertGreaterEqual(ticks["total"]["max"], ticks["callback"]["max"])
+        self.assertGreater(snapshot["queueDepth"]["count"], 0)
+        self.assertIn("NEXT_VALID_ID", snapshot["msgs"])
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import collections
+import threading
+import unittest
+
+from ibapi.client import EClient
+from ibapi.contract import Contract
+from ibapi.message import OUT
+from ibapi.order import Order
+from ibapi.wrapper import EWrapper
+
+from mock_tws import MockTWS
+
+
+class App(EWrapper, EClient):
+    def __init__(self, nExpected):
+        EWrapper.__init__(self)
+        EClient.__init__(self, wrapper=self)
+        self.nExpected = nExpected
+        self.counts = collections.Counter()
+        self.bars = []
+        self.orderStatuses = []
+        self.started = threading.Event()
+        self.allReceived = threading.Event()
+
+    def count(self, name):
+        self.counts[name] += 1
+        if all(self.counts[name] >= nMsgs for (name, nMsgs) in self.nExpected.items()):
+            self.allReceived.set()
+
+    def nextValidId(self, orderId):
+        self.started.set()
+
+    def tickPrice(self, reqId, tickType, price, attrib):
+        self.count("tickPrice")
+
+    def tickByTickBidAsk(self, reqId, time, bidPrice, askPrice, bidSize, askSize, attrib):
+        self.count("tickByTickBidAsk")
+
+    def updateMktDepthL2(self, reqId, position, marketMaker, operation, side, price,
+                         size, isSmartDepth):
+        self.count("updateMktDepthL2")
+
+    def historicalData(self, reqId, bar):
+        self.bars.append(bar)
+
+    def historicalDataEnd(self, reqId, start, end):
+        self.count("historicalDataEnd")
+
+    def orderStatus(self, orderId, status, filled, remaining, avgFillPrice, permId,
+                    parentId, lastFillPrice, clientId, whyHeld, mktCapPrice):
+        self.orderStatuses.append((orderId, status, filled))
+        self.count("orderStatus")
+
+
+def make_contract():
+    contract = Contract()
+    contract.symbol = "IBM"
+    contract.secType = "STK"
+    contract.exchange = "SMART"
+    contract.currency = "USD"
+    return contract
+
+
+class MockTWSTestCase(unittest.TestCase):
+    nMsgs = 2000
+
+    def setUp(self):
+        self.tws = MockTWS(nMsgs=self.nMsgs, nBars=10).start()
+
+
+    def tearDown(self):
+        self.tws.stop()
+
+
+    def test_traffic(self):
+        app = App({"tickPrice": self.nMsgs, "tickByTickBidAsk": self.nMsgs,
+                   "updateMktDepthL2": self.nMsgs, "historicalDataEnd": 1, "orderStatus": 2})
+        app.connect("127.0.0.1", self.tws.port, 0)
+        thread = threading.Thread(target=app.run, daemon=True)
+        thread.start()
+        self.assertTrue(app.started.wait(5), "nextValidId not received")
+
+        contract = make_contract()
+        order = Order()
+        order.action = "BUY"
+        order.orderType = "LMT"
+        order.totalQuantity = 100
+        order.lmtPrice = 100.
+
+        app.reqMktData(1, contract, "", False, False, [])
+        app.reqTickByTickData(2, contract, "BidAsk", 0, False)
+        app.reqMktDepth(3, contract, 10, False, [])
+        app.reqHistoricalData(4, contract, "", "1 D", "1 min", "TRADES", 1, 2, False, [])
+        app.placeOrder(5, contract, order)
+        self.assertTrue(app.allReceived.wait(10), "missing msgs: %s" % app.counts)
+
+        app.cancelMktData(1)
+        app.disconnect()
+        thread.join(5)
+
+        self.assertEqual(len(app.bars), 10)
+        self.assertEqual(app.orderStatuses, [(5, "Submitted", 0), (5, "Filled", 100)])
+        self.assertEqual([int(fields[0]) for fields in self.tws.requests[:5]],
+                         [OUT.REQ_MKT_DATA, OUT.REQ_TICK_BY_TICK_DATA, OUT.REQ_MKT_DEPTH,
+                          OUT.REQ_HISTORICAL_DATA, OUT.PLACE_ORDER])
+
+
+if "__main__" == __name__:
+    unittest.main()
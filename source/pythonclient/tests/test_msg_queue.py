@@ -0,0 +1,102 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import queue
+
+from ibapi import comm
+from ibapi.message import IN
+from ibapi.msg_queue import MsgQueue
+
+
+def make_text(*vals) -> bytes:
+    return "".join(comm.make_field(val) for val in vals).encode()
+
+
+class MsgQueueTestCase(unittest.TestCase):
+    def test_conflation(self):
+        msg_queue = MsgQueue()
+        msgs = [make_text(IN.TICK_PRICE, 6, 1, 1, 10.0, 100, 0),
+                make_text(IN.TICK_SIZE, 6, 1, 0, 100),
+                make_text(IN.ORDER_STATUS, 1, "Submitted"),
+                make_text(IN.TICK_PRICE, 6, 1, 1, 10.5, 100, 0),   # replaces the 1st
+                make_text(IN.TICK_PRICE, 6, 2, 1, 20.0, 100, 0),   # other reqId
+                make_text(IN.TICK_BY_TICK, 1, 3, 0, 1.0, 1.1, 1, 1, 0),
+                make_text(IN.TICK_BY_TICK, 1, 3, 0, 1.1, 1.2, 1, 1, 0),   # replaces
+                make_text(IN.TICK_BY_TICK, 1, 1, 0, 1.0, 1, 0, "", ""),
+                make_text(IN.TICK_BY_TICK, 1, 1, 0, 1.0, 2, 0, "", ""),  # trades are kept
+                make_text(IN.ORDER_STATUS, 1, "Filled"),
+                make_text(IN.TICK_SIZE, 6, 1, 0, 200)]   # replaces the 2nd
+        for msg in msgs:
+            msg_queue.put(msg)
+
+        self.assertEqual([msg_queue.get_nowait() for _ in range(msg_queue.qsize())],
+                         [msgs[2], msgs[3], msgs[4], msgs[6], msgs[7], msgs[8],
+                          msgs[9], msgs[10]])
+        self.assertRaises(queue.Empty, msg_queue.get, True, 0.01)
+
+        # processed msgs are not conflated anymore
+        msg_queue.put(msgs[0])
+        self.assertEqual(msg_queue.get_nowait(), msgs[0])
+
+        stats = msg_queue.stats()
+        self.assertEqual(stats["put"], 12)
+        self.assertEqual(stats["conflated"], 3)
+        self.assertEqual(stats["conflatedByMsgId"], {IN.TICK_PRICE: 1, IN.TICK_SIZE: 1,
+                                                     IN.TICK_BY_TICK: 1})
+        self.assertEqual(stats["maxDepth"], 8)
+        self.assertEqual(stats["depth"], 0)
+
+    def test_conflation_order(self):
+        msg_queue = MsgQueue()
+        prices = [make_text(IN.TICK_PRICE, 6, 1, 1, 10.0 + idx, 100, 0) for idx in range(3)]
+        orders = [make_text(IN.ORDER_STATUS, orderId, "Filled") for orderId in range(2)]
+        msg_queue.put([prices[0], orders[0], prices[1], orders[1], prices[2]])
+        msg_queue.put(None)
+
+        # the latest price still comes after the order msgs before it
+        self.assertEqual([msg_queue.get_nowait() for _ in range(msg_queue.qsize())],
+                         orders + [prices[2], None])
+        self.assertTrue(msg_queue.empty())
+
+        for idx in range(1000):
+            msg_queue.put(make_text(IN.TICK_SIZE, 6, 1, 0, idx))
+        self.assertEqual(msg_queue.qsize(), 1)
+        self.assertLessEqual(len(msg_queue.slots), 2, "dropped slots not compacted")
+        self.assertEqual(msg_queue.get_nowait(), make_text(IN.TICK_SIZE, 6, 1, 0, 999))
+        self.assertRaises(queue.Empty, msg_queue.get_nowait)
+
+    def test_priority_lanes(self):
+        msg_queue = MsgQueue(maxBatchSize=3, conflation=False, priorityLanes=True)
+        ticks = [make_text(IN.TICK_SIZE, 6, 1, 0, size) for size in range(4)]
+        orders = [make_text(IN.ORDER_STATUS, 1, "Submitted"),
+                  make_text(IN.ERR_MSG, 2, 1, 201, "Order rejected"),
+                  make_text(IN.EXECUTION_DATA, 3, 1),
+                  make_text(IN.EXECUTION_DATA_END, 1, 3)]
+        msg_queue.put([ticks[0], orders[0], ticks[1], orders[1], ticks[2]])
+        msg_queue.put([orders[2], ticks[3], orders[3]])
+        msg_queue.put(None)
+
+        self.assertEqual(msg_queue.get(), orders[0:3])
+        self.assertEqual(msg_queue.get(), orders[3:] + ticks[0:2])
+        self.assertEqual(msg_queue.get(), ticks[2:])
+        self.assertIsNone(msg_queue.get())
+        self.assertEqual(msg_queue.stats()["priority"], 4)
+        self.assertEqual(msg_queue.stats()["conflated"], 0)
+
+    def test_batches(self):
+        msg_queue = MsgQueue(maxBatchSize=2)
+        msgs = [make_text(IN.TICK_SIZE, 6, reqId, 0, 100) for reqId in range(3)]
+        msg_queue.put(msgs)
+        msg_queue.put(None)   # end of msgs mark of the EReader
+
+        self.assertEqual(msg_queue.get(), msgs[0:2])
+        self.assertEqual(msg_queue.get(), msgs[2:3])
+        self.assertIsNone(msg_queue.get())
+        self.assertTrue(msg_queue.empty())
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import math
+import threading
+import unittest
+
+from ibapi import columnar
+from ibapi.client import EClient
+from ibapi.decoder import Decoder
+from ibapi.message import IN
+from ibapi.order_book import (OrderBook, OrderBooks, ASK, BID, INSERT, UPDATE, DELETE,
+                              DEPTH_RESET)
+from ibapi.server_versions import MAX_CLIENT_VER
+from ibapi.wrapper import EWrapper
+
+from mock_tws import MockTWS
+from test_decoder import make_fields
+from test_mock_tws import make_contract
+
+
+class App(EWrapper, EClient):
+    def __init__(self):
+        EWrapper.__init__(self)
+        EClient.__init__(self, wrapper=self)
+        self.started = threading.Event()
+        self.nDepthMsgs = 0
+
+    def nextValidId(self, orderId):
+        self.started.set()
+
+    def updateMktDepthL2(self, reqId, position, marketMaker, operation, side, price,
+                         size, isSmartDepth):
+        self.nDepthMsgs += 1
+
+
+class ErrorWrapper(EWrapper):
+    def __init__(self):
+        EWrapper.__init__(self)
+        self.errors = []
+
+    def error(self, reqId, errorCode, errorString):
+        self.errors.append((reqId, errorCode))
+
+
+class CountingBooks(OrderBooks):
+    def __init__(self, nUpdates):
+        super().__init__(capacity=4)
+        self.nUpdates = nUpdates
+        self.done = threading.Event()
+
+    def bookUpdated(self, reqId, book):
+        if book.nUpdates == self.nUpdates:
+            self.done.set()
+
+
+@unittest.skipIf(not columnar.HAS_NUMPY, "needs numpy")
+class OrderBookTestCase(unittest.TestCase):
+    def rows(self, book, side):
+        return [(float(row["price"]), int(row["size"]), book.marketMakerName(row["marketMaker"]))
+                for row in book.side(side)]
+
+
+    def test_operations(self):
+        book = OrderBook(1, capacity=2)
+        self.assertTrue(math.isnan(book.top()[0]))
+        book.update(0, INSERT, BID, 10.0, 100, "ARCA")
+        book.update(1, INSERT, BID, 9.9, 200, "NSDQ")
+        book.update(0, INSERT, BID, 10.1, 300, "ARCA")     # grows the arrays
+        book.update(0, INSERT, ASK, 10.2, 400)
+        self.assertEqual(self.rows(book, BID), [(10.1, 300, "ARCA"), (10.0, 100, "ARCA"),
+                                                (9.9, 200, "NSDQ")])
+        self.assertEqual(book.top(), (10.1, 300, 10.2, 400))
+
+        book.update(1, UPDATE, BID, 10.0, 150, "NSDQ")
+        book.update(0, DELETE, BID, 0., 0)
+        book.update(5, DELETE, BID, 0., 0)                 # not there, ignored
+        self.assertEqual(self.rows(book, BID), [(10.0, 150, "NSDQ"), (9.9, 200, "NSDQ")])
+        book.update(7, UPDATE, BID, 9.8, 50)               # appended
+        self.assertEqual(self.rows(book, BID)[-1], (9.8, 50, ""))
+
+        (bids, asks) = book.snapshot()
+        book.update(0, DELETE, ASK, 0., 0)
+        self.assertEqual(len(bids), 3)
+        self.assertEqual(asks["price"].tolist(), [10.2], "snapshots are copies")
+        self.assertEqual(book.depths, [0, 3])
+        self.assertEqual(book.nUpdates, 9)
+
+
+    def test_depth_reset(self):
+        wrapper = ErrorWrapper()
+        books = OrderBooks(wrapper=wrapper)
+        decoder = Decoder(wrapper, MAX_CLIENT_VER)
+        decoder.registerHandler(7, books)
+        decoder.registerHandler(8, books)
+        for reqId in (7, 8):
+            decoder.interpret(make_fields(IN.MARKET_DEPTH_L2, 1, reqId, 0, "ARCA", INSERT, BID,
+                                          10.0, 100, 1))
+
+        decoder.interpret(make_fields(IN.ERR_MSG, 2, 7, 309, "Max number of depth requests"))
+        self.assertEqual(books.book(7).depths, [0, 1])
+        decoder.interpret(make_fields(IN.ERR_MSG, 2, 7, DEPTH_RESET, "Market depth data "
+                                      "has been RESET"))
+        decoder.interpret(make_fields(IN.ERR_MSG, 2, 9, DEPTH_RESET, "not a book"))
+        # the other errors still get to the wrapper
+        self.assertEqual(wrapper.errors, [(7, 309), (9, DEPTH_RESET)])
+        self.assertEqual(books.book(7).depths, [0, 0])
+        self.assertEqual(books.book(8).depths, [0, 1], "other books kept")
+        self.assertNotIn(9, books.books)
+
+        decoder.interpret(make_fields(IN.MARKET_DEPTH_L2, 1, 7, 0, "NSDQ", INSERT, ASK,
+                                      10.1, 200, 1))
+        self.assertEqual(books.book(7).top()[2:], (10.1, 200))
+
+
+    def test_registered_handler(self):
+        nMsgs = 300
+        books = CountingBooks(nMsgs)
+        with MockTWS(nMsgs=nMsgs) as tws:
+            app = App()
+            app.connect("127.0.0.1", tws.port, 0)
+            thread = threading.Thread(target=app.run, daemon=True)
+            thread.start()
+            self.assertTrue(app.started.wait(5), "nextValidId not received")
+            app.registerHandler(7, books)
+            app.reqMktDepth(7, make_contract(), 10, True, [])
+            self.assertTrue(books.done.wait(10), "missing depth msgs")
+            app.disconnect()
+            thread.join(5)
+
+        self.assertEqual(app.nDepthMsgs, 0, "all handled by the books")
+        book = books.book(7)
+        self.assertEqual(book.depths, [10, 10])
+        (bidPrice, _, askPrice, _) = book.top()
+        self.assertLess(bidPrice, askPrice)
+        self.assertEqual({books.marketMakerName(code) for code in book.side(BID)["marketMaker"]},
+                         {"MM0", "MM1", "MM2"})
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import time
+import unittest
+
+from ibapi.decoder import Decoder
+from ibapi.latency import LatencyMonitor
+from ibapi.message import IN
+from ibapi.profiling import DecoderProfiler
+from ibapi.server_versions import MAX_CLIENT_VER
+from ibapi.wrapper import EWrapper
+
+from test_decoder import make_fields
+
+
+class SlowWrapper(EWrapper):
+    def __init__(self):
+        EWrapper.__init__(self)
+        self.calls = []
+
+    def tickPrice(self, reqId, tickType, price, attrib):
+        time.sleep(0.001)
+        self.calls.append(("tickPrice", reqId))
+
+    def tickSize(self, reqId, tickType, size):
+        self.calls.append(("tickSize", reqId))
+
+
+class Handler:
+    def __init__(self):
+        self.calls = []
+
+    def tickSize(self, reqId, tickType, size):
+        self.calls.append(("tickSize", reqId))
+
+
+class ProfilingTestCase(unittest.TestCase):
+    def test_profiler(self):
+        wrapper = SlowWrapper()
+        decoder = Decoder(wrapper, MAX_CLIENT_VER)
+        handler = Handler()
+        decoder.registerHandler(2, handler)
+        tickPrice = make_fields(IN.TICK_PRICE, 6, 1, 1, 9.5, 300, 0)
+        tickSize = make_fields(IN.TICK_SIZE, 6, 2, 0, 400)
+
+        with DecoderProfiler(decoder) as profiler:
+            for _ in range(5):
+                decoder.interpret(tickPrice)
+                decoder.interpret(tickSize)
+            decoder.registerHandler(3, Handler())
+            self.assertRaises(RuntimeError, decoder.setLatencyMonitor, LatencyMonitor())
+            self.assertRaises(RuntimeError, DecoderProfiler(decoder).start)
+        decoder.interpret(tickPrice)
+
+        snapshot = profiler.snapshot()
+        self.assertEqual(list(snapshot["msgs"]), ["TICK_PRICE", "TICK_SIZE"])
+        prices = snapshot["msgs"]["TICK_PRICE"]
+        self.assertEqual(prices["msgs"], 5)
+        self.assertEqual(prices["bytes"], 5 * (sum(map(len, tickPrice)) + len(tickPrice)))
+        self.assertGreaterEqual(prices["callbackNs"], 5 * 1000000)
+        self.assertLess(prices["decodeNs"], prices["callbackNs"])
+        self.assertEqual(snapshot["msgs"]["TICK_SIZE"]["msgs"], 5)
+        self.assertGreater(snapshot["msgs"]["TICK_SIZE"]["callbackNs"], 0)
+        self.assertGreater(snapshot["seconds"], 0.)
+
+        # all restored
+        self.assertNotIn("interpret", vars(decoder))
+        self.assertIs(decoder.wrapper, wrapper)
+        self.assertEqual(decoder.dispatchTable[IN.TICK_SIZE][0], wrapper.tickSize)
+        self.assertEqual(decoder.handlers[2].tickSize, handler.tickSize)
+        self.assertEqual(decoder.handlers[3].tickPrice, wrapper.tickPrice)
+        self.assertEqual(len(wrapper.calls), 12)
+        self.assertEqual(handler.calls, [("tickSize", 2)] * 5)
+        self.assertIsNone(decoder.profiler)
+
+
+    def test_handler_registered_while_profiling(self):
+        wrapper = SlowWrapper()
+        decoder = Decoder(wrapper, MAX_CLIENT_VER)
+        handler = Handler()
+        with DecoderProfiler(decoder) as profiler:
+            decoder.registerHandler(2, handler)
+            decoder.interpret(make_fields(IN.TICK_SIZE, 6, 2, 0, 400))
+            decoder.interpret(make_fields(IN.TICK_PRICE, 6, 2, 1, 9.5, 300, 0))
+            # timed once: the route is bound to the wrapper, not to the profiled one
+            self.assertEqual(decoder.handlers[2].target.tickPrice, wrapper.tickPrice)
+
+        msgs = profiler.snapshot()["msgs"]
+        self.assertGreater(msgs["TICK_SIZE"]["callbackNs"], 0)
+        self.assertGreaterEqual(msgs["TICK_PRICE"]["callbackNs"], 1000000)
+        self.assertEqual(handler.calls, [("tickSize", 2)] * 2)
+        self.assertEqual(decoder.handlers[2].tickPrice, wrapper.tickPrice)
+        self.assertEqual(decoder.handlers[2].tickSize, handler.tickSize)
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import queue
+
+from ibapi import comm
+from ibapi.reader import EReader
+
+
+class FakeConnection:
+    """ hands out the given packets, then behaves as a closed socket """
+    def __init__(self, packets):
+        self.packets = list(packets)
+        self.closed = False
+
+    def isConnected(self):
+        return len(self.packets) > 0
+
+    def recvMsg(self):
+        return self.packets.pop(0)
+
+    def recvMsgInto(self, buf):
+        packet = self.packets[0]
+        n = min(len(buf), len(packet))
+        buf[0:n] = packet[0:n]
+        if n < len(packet):
+            self.packets[0] = packet[n:]
+        else:
+            self.packets.pop(0)
+        return n
+
+    def close(self):
+        self.closed = True
+
+
+class ReaderTestCase(unittest.TestCase):
+    texts = ["1\0" * n for n in (3, 40, 1, 7, 100, 2)]
+
+    def packets(self, size):
+        data = b"".join(comm.make_msg(text) for text in self.texts)
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def readAll(self, packets, bufSize):
+        msg_queue = queue.Queue()
+        EReader(FakeConnection(packets), msg_queue, bufSize).run()
+        return [msg_queue.get_nowait().decode() for _ in range(msg_queue.qsize())]
+
+    def readBatches(self, packets, bufSize, maxBatchSize):
+        msg_queue = queue.Queue()
+        EReader(FakeConnection(packets), msg_queue, bufSize, maxBatchSize).run()
+        return [msg_queue.get_nowait() for _ in range(msg_queue.qsize())]
+
+    def test_recv(self):
+        self.assertEqual(self.readAll(self.packets(5), 0), self.texts)
+
+    def test_recv_into(self):
+        for packetSize in (1, 5, 64, 1000):
+            self.assertEqual(self.readAll(self.packets(packetSize), 4096), self.texts)
+
+    def test_recv_into_compact_and_grow(self):
+        # a tiny buffer forces both the compaction and the growth paths
+        for packetSize in (3, 16, 1000):
+            self.assertEqual(self.readAll(self.packets(packetSize), 8), self.texts)
+
+    def test_batches(self):
+        for bufSize in (0, 4096):
+            batches = self.readBatches(self.packets(10000), bufSize, 4)
+            self.assertEqual([len(batch) for batch in batches], [4, 2])
+            self.assertEqual([msg.decode() for batch in batches for msg in batch], self.texts)
+
+    def test_event_driven_end_of_msgs(self):
+        msg_queue = queue.Queue()
+        conn = FakeConnection(self.packets(64))
+        EReader(conn, msg_queue, eventDriven=True).run()
+        msgs = [msg_queue.get_nowait() for _ in range(msg_queue.qsize())]
+
+        self.assertEqual([msg.decode() for msg in msgs[:-1]], self.texts)
+        self.assertIsNone(msgs[-1], "the end of the msgs is not queued")
+        self.assertTrue(conn.closed, "connection resources not released")
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import os
+import queue
+import tempfile
+
+from ibapi import comm
+from ibapi.message import IN
+from ibapi.reader import EReader
+from ibapi.recorder import Recorder, Replay
+from ibapi.server_versions import MAX_CLIENT_VER
+from ibapi.wrapper import EWrapper
+
+
+class FakeConnection:
+    def __init__(self, packets):
+        self.packets = list(packets)
+
+    def isConnected(self):
+        return len(self.packets) > 0
+
+    def recvMsg(self):
+        return self.packets.pop(0)
+
+    def close(self):
+        pass
+
+
+class TicksWrapper(EWrapper):
+    def __init__(self):
+        EWrapper.__init__(self)
+        self.answers = []
+
+    def tickSize(self, reqId, tickType, size):
+        self.answers.append((reqId, tickType, size))
+
+
+def make_msg(*vals):
+    return comm.make_msg("".join(comm.make_field(val) for val in vals))
+
+
+class RecorderTestCase(unittest.TestCase):
+    def setUp(self):
+        (fd, self.path) = tempfile.mkstemp(suffix=".rec")
+        os.close(fd)
+
+
+    def tearDown(self):
+        os.remove(self.path)
+
+
+    def test_record_and_replay(self):
+        msgs = [make_msg(IN.TICK_SIZE, 6, 1, 0, size) for size in range(10)]
+        data = b"".join(msgs)
+        packets = [data[0:50], data[50:51], data[51:]]
+        reader = EReader(FakeConnection(packets), queue.Queue(),
+                         recorder=Recorder(self.path, MAX_CLIENT_VER))
+        reader.run()
+
+        replay = Replay(self.path)
+        self.assertEqual(replay.serverVersion, MAX_CLIENT_VER)
+        self.assertEqual([msg for (_, msg) in replay.frames()], [msg[4:] for msg in msgs])
+
+        wrapper = TicksWrapper()
+        stats = replay.run(replay.makeDecoder(wrapper))
+        replay.close()
+
+        self.assertEqual(wrapper.answers, [(1, 0, size) for size in range(10)])
+        self.assertEqual(stats["msgs"], 10)
+
+
+    def test_replay_pace(self):
+        recorder = Recorder(self.path, MAX_CLIENT_VER)
+        for idx in range(3):
+            recorder.record([make_msg(IN.TICK_SIZE, 6, 1, 0, idx)[4:]], idx * 50000000)
+        # interrupted while writing the last record
+        recorder.file.write(b"\0\0\0")
+        recorder.close()
+
+        replay = Replay(self.path)
+        wrapper = TicksWrapper()
+        self.assertGreaterEqual(replay.run(replay.makeDecoder(wrapper), 1.)["seconds"], 0.1)
+        self.assertLess(replay.run(replay.makeDecoder(wrapper), 10.)["seconds"], 0.1)
+        replay.close()
+        self.assertEqual(len(wrapper.answers), 6)
+
+
+if "__main__" == __name__:
+    unittest.main()
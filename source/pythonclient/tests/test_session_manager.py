@@ -0,0 +1,134 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import socketserver
+import struct
+import threading
+from unittest import mock
+
+from ibapi import comm, session_manager
+from ibapi.client import EClient
+from ibapi.message import IN, OUT
+from ibapi.server_versions import MAX_CLIENT_VER
+from ibapi.session_manager import Session, SessionManager
+from ibapi.wrapper import EWrapper
+
+
+class App(EWrapper, EClient):
+    def __init__(self):
+        EWrapper.__init__(self)
+        EClient.__init__(self, wrapper=self)
+        self.ticks = []
+        self.closed = threading.Event()
+
+    def tickSize(self, reqId, tickType, size):
+        self.ticks.append((reqId, size))
+
+    def connectionClosed(self):
+        self.closed.set()
+
+
+class FakeTWS(socketserver.BaseRequestHandler):
+    """ handshake, startApi then a few ticks tagged with the client id """
+    nTicks = 50
+
+    def readMsg(self):
+        size = struct.unpack("!I", self.readExactly(4))[0]
+        return comm.read_fields(self.readExactly(size))
+
+    def readExactly(self, size):
+        data = b""
+        while len(data) < size:
+            data += self.request.recv(size - len(data))
+        return data
+
+    def handle(self):
+        assert self.readExactly(4) == b"API\0"
+        self.readMsg()
+        self.request.sendall(comm.make_msg(comm.make_field(MAX_CLIENT_VER)
+                                           + comm.make_field("20190101 00:00:00 EST")))
+        fields = self.readMsg()
+        assert int(fields[0]) == OUT.START_API
+        clientId = int(fields[2])
+        self.request.sendall(b"".join(
+            comm.make_msg("".join(comm.make_field(val) for val in
+                                  (IN.TICK_SIZE, 6, clientId, 0, size)))
+            for size in range(self.nTicks)))
+
+
+class SessionManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeTWS)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+    def test_sessions(self):
+        manager = SessionManager(nWorkers=2, bufSize=64)
+        manager.start()
+        apps = [App() for _ in range(6)]
+        for (clientId, app) in enumerate(apps):
+            app.setSessionManager(manager)
+            app.connect("127.0.0.1", self.server.server_address[1], clientId)
+
+        for app in apps:
+            self.assertTrue(app.closed.wait(5), "connection not closed")
+        manager.stop()
+
+        for (clientId, app) in enumerate(apps):
+            self.assertEqual(app.ticks, [(clientId, size) for size in range(FakeTWS.nTicks)])
+            self.assertIsNone(app.reader, "no EReader expected")
+        self.assertEqual(manager.sessions, {})
+        self.assertEqual(manager.workerLoads, [0, 0])
+
+
+    def test_broken_session(self):
+        class BrokenSession(Session):
+            def read(self):
+                if self.client.clientId == 1:
+                    raise OSError("broken")
+                return super().read()
+
+        manager = SessionManager(nWorkers=2, bufSize=64)
+        manager.start()
+        apps = [App() for _ in range(3)]
+        with mock.patch.object(session_manager, "Session", BrokenSession):
+            for (clientId, app) in enumerate(apps):
+                app.setSessionManager(manager)
+                app.connect("127.0.0.1", self.server.server_address[1], clientId)
+
+        for app in apps:
+            self.assertTrue(app.closed.wait(5), "connection not closed")
+        self.assertTrue(manager.is_alive(), "other sessions still served")
+        manager.stop()
+
+        self.assertEqual(apps[1].ticks, [])
+        for clientId in (0, 2):
+            self.assertEqual(apps[clientId].ticks,
+                             [(clientId, size) for size in range(FakeTWS.nTicks)])
+        self.assertEqual(manager.sessions, {})
+
+
+    def test_wakeup(self):
+        manager = SessionManager(nWorkers=1)
+        app = App()
+        app.setSessionManager(manager)
+        app.connect("127.0.0.1", self.server.server_address[1], 0)
+        self.assertEqual(manager.wakeupRecv.recv(16), b"\0", "selector not woken up")
+        manager.drainWakeups()
+        manager.start()
+        self.assertTrue(app.closed.wait(5), "connection not closed")
+        manager.stop()
+        self.assertEqual(len(app.ticks), FakeTWS.nTicks)
+
+
+if "__main__" == __name__:
+    unittest.main()
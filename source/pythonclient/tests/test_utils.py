@@ -4,6 +4,9 @@ Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is su
 """
 
 import unittest
+import os
+import subprocess
+import sys
 
 from ibapi.enum_implem import Enum
 from ibapi.utils import setattr_log
@@ -49,6 +52,16 @@ class UtilsTestCase(unittest.TestCase):
         o = B()
         #import code; code.interact(local=locals())
 
+
+    def test_hot_path_logging_switch(self):
+        # decided once, at import time, from the environment
+        for (value, expected) in (("0", "False"), ("1", "True")):
+            env = dict(os.environ, IBAPI_HOT_PATH_LOGGING=value)
+            out = subprocess.check_output(
+                [sys.executable, "-c", "from ibapi import utils; print(utils.HOT_PATH_LOGGING)"],
+                env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            self.assertEqual(out.decode().strip(), expected)
+
  
 if "__main__" == __name__:
     unittest.main()
@@ -0,0 +1,69 @@
+"""
+Copyright (C) 2019 Interactive Brokers LLC. All rights reserved. This code is subject to the terms
+ and conditions of the IB API Non-Commercial License or the IB API Commercial License, as applicable.
+"""
+
+import unittest
+import threading
+
+from ibapi import comm
+from ibapi.writer import EWriter
+
+
+class FakeConnection:
+    """ records the batches, the first one is held until release is set """
+    def __init__(self):
+        self.batches = []
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.disconnected = False
+
+    def sendMsgs(self, msgs):
+        self.sending.set()
+        self.release.wait(5)
+        self.batches.append(msgs)
+        return sum(len(msg) for msg in msgs)
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class BrokenConnection(FakeConnection):
+    def sendMsgs(self, msgs):
+        raise AttributeError("no sendmsg")
+
+
+class WriterTestCase(unittest.TestCase):
+    def test_coalescing(self):
+        conn = FakeConnection()
+        writer = EWriter(conn, maxBatchSize=8)
+        writer.start()
+        msgs = [comm.make_msg(comm.make_field(idx)) for idx in range(20)]
+
+        writer.sendMsg(msgs[0])
+        # the first msg is being sent, the others pile up meanwhile
+        self.assertTrue(conn.sending.wait(5))
+        for msg in msgs[1:]:
+            writer.sendMsg(msg)
+        conn.release.set()
+        writer.stop()
+
+        self.assertFalse(writer.is_alive())
+        self.assertEqual([len(batch) for batch in conn.batches], [1, 8, 8, 3])
+        self.assertEqual([msg for batch in conn.batches for msg in batch], msgs)
+
+    def test_dead_writer(self):
+        conn = BrokenConnection()
+        writer = EWriter(conn)
+        writer.start()
+        writer.sendMsg(b"msg")
+        writer.join(5)
+
+        self.assertFalse(writer.is_alive())
+        self.assertTrue(conn.disconnected)
+        with self.assertRaises(ConnectionError):
+            writer.sendMsg(b"msg")
+
+
+if "__main__" == __name__:
+    unittest.main()